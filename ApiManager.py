@@ -11,10 +11,12 @@
 # ##################################################################
 
 
+import threading
+
 # source: https://stackoverflow.com/questions/31875/is-there-a-simple-elegant-way-to-define-singletons
 class Singleton:
     """
-    A non-thread-safe helper class to ease implementing singletons.
+    A helper class to ease implementing singletons.
     This should be used as a decorator -- not a metaclass -- to the
     class that should be a singleton.
     
@@ -30,19 +32,26 @@ class Singleton:
     
     def __init__(self, decorated):
         self._decorated = decorated
+        self._lock = threading.RLock()
     
     def instance(self):
         """
         Returns the singleton instance. Upon its first call, it creates a
         new instance of the decorated class and calls its `__init__` method.
         On all subsequent calls, the already created instance is returned.
+        Creation is guarded by a lock, so concurrent first calls from
+        several threads still create only one instance.
         
         """
         try:
             return self._instance
         except AttributeError:
-            self._instance = self._decorated()
-            return self._instance
+            with self._lock:
+                try:
+                    return self._instance
+                except AttributeError:
+                    self._instance = self._decorated()
+                    return self._instance
     
     def __call__(self):
         raise TypeError('Singletons must be accessed through `instance()`.')
@@ -73,18 +82,64 @@ apitoken_template = """
 
 # libs
 import os
-import shutil
 import ntpath
+import re
 import json
 import time
 import random
+import hashlib
+import tempfile
+import functools
+import atexit
+import sqlite3
 import urllib.parse
+import email.utils
+from collections import OrderedDict
+import importlib
 import requests
-from bs4 import BeautifulSoup
-# api libs
-from pixivpy3 import *
-import tweepy
-from pixiv_auth import refresh_returnDict
+from requests.adapters import HTTPAdapter
+
+
+# lazy imports
+# Site backends import their heavy dependencies (bs4 & lxml, pixivpy3, tweepy) on first use,
+# so importing webpicapi stays cheap for workers that only use some sites.
+# Check it with: python -X importtime -c "import webpicapi"
+
+class LazyModule:
+    """Proxy of a module, the module is imported on first attribute access"""
+    
+    # private members
+    __module_name: str = None
+    __module = None
+    
+    # constructor
+    def __init__(self, module_name: str):
+        self.__module_name = module_name
+        self.__module = None
+    
+    def __getattr__(self, attr: str):
+        if self.__module is None:
+            self.__module = importlib.import_module(self.__module_name)
+        return getattr(self.__module, attr)
+    
+    def isLoaded(self) -> bool:
+        return self.__module is not None
+
+bs4 = LazyModule("bs4")
+pixivpy3 = LazyModule("pixivpy3")
+tweepy = LazyModule("tweepy")
+
+# names that used to be imported with "from pixivpy3 import *", kept as lazy attributes of ApiManager
+_PIXIVPY3_NAMES = ("AppPixivAPI", "ByPassSniApi", "PixivError")
+
+def __getattr__(name: str):
+    if name in _PIXIVPY3_NAMES:
+        return getattr(pixivpy3, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def BeautifulSoup(markup, features: str = None, **kwargs):
+    """bs4.BeautifulSoup, bs4 is imported on first call"""
+    return bs4.BeautifulSoup(markup, features, **kwargs)
 
 
 # public const
@@ -94,34 +149,1116 @@ HEADERS = {
     'Refer': 'https://www.google.com'
 }
 
+# status codes that mean server is asking us to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+MAX_THROTTLE_RETRIES = 3
+
+
+# http transport
+
+@Singleton
+class HttpTransport:
+    """Singleton class to share keep-alive connection pools for all HTTP requests"""
+    
+    # private members
+    __pool_connections: int = 16
+    __pool_maxsize: int = 8
+    __adapter: HTTPAdapter = None
+    __generation: int = 0
+    __local: threading.local = None
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__adapter = self.__newAdapter()
+    
+    # api features
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send HTTP request through pooled session of current thread"""
+        return self.session().request(method=method, url=url, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+    
+    def session(self) -> requests.Session:
+        """
+        Get requests.Session of current thread.
+        requests.Session is not thread-safe, so each thread gets its own session,
+        but all sessions mount the same HTTPAdapter and share its per-host connection pools.
+        """
+        sess = getattr(self.__local, "session", None)
+        if sess is None or self.__local.generation != self.__generation:
+            sess = requests.Session()
+            sess.headers.update(HEADERS)
+            self.mount(sess)
+            self.__local.session = sess
+            self.__local.generation = self.__generation
+        return sess
+    
+    def mount(self, session: requests.Session) -> None:
+        """Mount shared connection pools to a foreign requests.Session (e.g. the one inside pixivpy3 or tweepy)"""
+        if not isinstance(session, requests.Session):
+            return
+        session.mount("https://", self.__adapter)
+        session.mount("http://", self.__adapter)
+    
+    def close(self) -> None:
+        """Close all pooled connections, sessions will reconnect on next request"""
+        with self.__lock:
+            old_adapter = self.__adapter
+            self.__adapter = self.__newAdapter()
+            self.__generation += 1
+        old_adapter.close()
+    
+    
+    # getters
+    def getPoolConnections(self) -> int:
+        return self.__pool_connections
+    
+    def getPoolMaxSize(self) -> int:
+        return self.__pool_maxsize
+    
+    
+    # setters
+    def setPoolSize(self, pool_connections: int = None, pool_maxsize: int = None) -> None:
+        """
+        Set number of hosts to keep pools for (pool_connections) and
+        number of connections kept in each host pool (pool_maxsize).
+        Existing pools are closed and rebuilt with new sizes.
+        """
+        with self.__lock:
+            if pool_connections is not None:
+                self.__pool_connections = max(1, int(pool_connections))
+            if pool_maxsize is not None:
+                self.__pool_maxsize = max(1, int(pool_maxsize))
+        self.close()
+    
+    
+    # helper functions
+    def __newAdapter(self) -> HTTPAdapter:
+        return HTTPAdapter(
+            pool_connections=self.__pool_connections,
+            pool_maxsize=self.__pool_maxsize
+        )
+
+
+# rate limiter
+
+class TokenBucket:
+    """Thread-safe token bucket, refills rate tokens per second up to burst tokens"""
+    
+    # private members
+    __rate: float = 1.0
+    __burst: float = 1.0
+    __tokens: float = 1.0
+    __last_refill: float = 0.0
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.__lock = threading.Lock()
+        self.__rate = float(rate)
+        self.__burst = float(burst)
+        self.__tokens = self.__burst
+        self.__last_refill = time.monotonic()
+    
+    # api features
+    def acquire(self, tokens: float = 1.0, block: bool = True) -> float:
+        """
+        Take tokens from bucket, return seconds waited.
+        With block=False, tokens are charged without waiting and next caller pays for it.
+        """
+        wait = self.reserve(tokens)
+        if block and wait > 0:
+            time.sleep(wait)
+            return wait
+        return 0.0
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from bucket without waiting, return seconds caller should wait before sending request.
+        Tokens are reserved before waiting, so bucket can go into debt and
+        concurrent callers line up behind each other instead of waking up together.
+        """
+        with self.__lock:
+            self.__refill()
+            self.__tokens -= tokens
+            return 0.0 if self.__tokens >= 0 else (-self.__tokens / self.__rate)
+    
+    
+    # getters
+    def getRate(self) -> float:
+        return self.__rate
+    
+    def getBurst(self) -> float:
+        return self.__burst
+    
+    def getTokens(self) -> float:
+        with self.__lock:
+            self.__refill()
+            return self.__tokens
+    
+    
+    # setters
+    def setRate(self, rate: float, burst: float = None) -> None:
+        with self.__lock:
+            self.__refill()
+            self.__rate = float(rate)
+            if burst is not None:
+                self.__burst = float(burst)
+            self.__tokens = min(self.__tokens, self.__burst)
+    
+    
+    # helper functions
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(self.__burst, self.__tokens + (now - self.__last_refill) * self.__rate)
+        self.__last_refill = now
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    TokenBucket that adapts its rate to server feedback.
+    Rate grows slowly toward max_rate while responses are healthy, and is halved (down to min_rate)
+    on every throttled response, which also blocks the bucket for an exponential backoff with jitter
+    or for the server's Retry-After, whichever is longer.
+    """
+    
+    # private members
+    __min_rate: float = 0.0
+    __max_rate: float = 1.0
+    __blocked_until: float = 0.0
+    __failures: int = 0
+    __successes: int = 0
+    __lock: threading.Lock = None
+    
+    # const
+    INCREASE_EVERY: int = 10
+    INCREASE_FACTOR: float = 1.25
+    MAX_BACKOFF: float = 600.0
+    
+    # constructor
+    def __init__(self, rate: float, burst: float = 1.0, max_rate: float = None, min_rate: float = None):
+        super(AdaptiveTokenBucket, self).__init__(rate, burst)
+        self.__lock = threading.Lock()
+        self.__max_rate = float(max_rate) if max_rate is not None else float(rate)
+        self.__min_rate = float(min_rate) if min_rate is not None else float(rate) / 16.0
+    
+    # api features
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens from bucket without waiting, return seconds caller should wait (including backoff)"""
+        wait = super(AdaptiveTokenBucket, self).reserve(tokens)
+        return max(wait, self.__blocked_until - time.monotonic())
+    
+    def reportSuccess(self) -> None:
+        """Server answered normally, speed up a bit every INCREASE_EVERY healthy responses"""
+        with self.__lock:
+            self.__failures = 0
+            self.__successes += 1
+            if self.__successes < self.INCREASE_EVERY:
+                return
+            self.__successes = 0
+            new_rate = min(self.__max_rate, self.getRate() * self.INCREASE_FACTOR)
+        if new_rate != self.getRate():
+            super(AdaptiveTokenBucket, self).setRate(new_rate)
+    
+    def reportThrottle(self, retry_after: float = None) -> float:
+        """Server pushed back (429/503/ban page), slow down & block bucket, return seconds blocked"""
+        with self.__lock:
+            self.__failures += 1
+            self.__successes = 0
+            new_rate = max(self.__min_rate, self.getRate() / 2.0)
+            # exponential backoff from current delay, with jitter
+            backoff = (1.0 / new_rate) * (2 ** (self.__failures - 1))
+            backoff = min(self.MAX_BACKOFF, backoff) * random.uniform(0.75, 1.25)
+            if retry_after is not None:
+                backoff = max(backoff, float(retry_after))
+            self.__blocked_until = max(self.__blocked_until, time.monotonic() + backoff)
+        super(AdaptiveTokenBucket, self).setRate(new_rate)
+        return backoff
+    
+    
+    # getters
+    def getEffectiveRate(self) -> float:
+        """Get current request rate, 0.0 while bucket is blocked by a backoff"""
+        if self.__blocked_until > time.monotonic():
+            return 0.0
+        return self.getRate()
+    
+    def getMaxRate(self) -> float:
+        return self.__max_rate
+    
+    def getMinRate(self) -> float:
+        return self.__min_rate
+    
+    def getBlockedSeconds(self) -> float:
+        """Get seconds left until backoff is over"""
+        return max(0.0, self.__blocked_until - time.monotonic())
+    
+    
+    # setters
+    def setRate(self, rate: float, burst: float = None, max_rate: float = None, min_rate: float = None) -> None:
+        """Set starting rate and the range it can adapt in, max_rate defaults to rate"""
+        with self.__lock:
+            self.__max_rate = float(max_rate) if max_rate is not None else float(rate)
+            self.__min_rate = float(min_rate) if min_rate is not None else float(rate) / 16.0
+            self.__failures = 0
+            self.__successes = 0
+        super(AdaptiveTokenBucket, self).setRate(rate, burst)
+
+
+@Singleton
+class RateLimiter:
+    """
+    Singleton class to pace requests per domain with AdaptiveTokenBucket.
+    Each domain has its own bucket, so requests to different sites never wait for each other.
+    Subdomains share bucket of their domain (e.g. "api.e-hentai.org" uses "e-hentai.org").
+    """
+    
+    # private members
+    __default_rate: float = 1.0
+    __default_burst: float = 2.0
+    __buckets: dict = None
+    __default_buckets: dict = None
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__buckets = {}
+        self.__default_buckets = {}
+    
+    # api features
+    def acquire(self, url: str, tokens: float = 1.0) -> float:
+        """Wait until a request to url (or domain) is allowed, return seconds waited"""
+        return self.getBucket(url).acquire(tokens)
+    
+    def charge(self, url: str, tokens: float = 1.0) -> None:
+        """Charge a request to url (or domain) that was already sent, without waiting"""
+        self.getBucket(url).acquire(tokens, block=False)
+    
+    def reportSuccess(self, url: str) -> None:
+        """Report a healthy response from url (or domain)"""
+        self.getBucket(url).reportSuccess()
+    
+    def reportThrottle(self, url: str, retry_after: float = None) -> float:
+        """Report url (or domain) is pushing back, return seconds its domain is blocked"""
+        return self.getBucket(url).reportThrottle(retry_after)
+    
+    def getEffectiveRate(self, url: str) -> float:
+        """Get current request rate of url (or domain), 0.0 while it is backing off"""
+        return self.getBucket(url).getEffectiveRate()
+    
+    def getBucket(self, url: str) -> AdaptiveTokenBucket:
+        """Get TokenBucket of url (or domain), create one with default rate if domain has none"""
+        host = self.__host(url)
+        with self.__lock:
+            # match the most specific configured domain
+            cur = host
+            while True:
+                if cur in self.__buckets:
+                    return self.__buckets[cur]
+                dot = cur.find('.')
+                if dot == -1 or cur.count('.') <= 1:
+                    break
+                cur = cur[dot+1:]
+            # fallback to default bucket of this host
+            if host not in self.__default_buckets:
+                self.__default_buckets[host] = AdaptiveTokenBucket(self.__default_rate, self.__default_burst)
+            return self.__default_buckets[host]
+    
+    
+    # getters
+    def getDefaultRate(self) -> tuple:
+        """Get (rate, burst) used for domains without setRate()"""
+        return (self.__default_rate, self.__default_burst)
+    
+    
+    # setters
+    def setRate(self, domain: str, rate: float, burst: float = 1.0, max_rate: float = None, min_rate: float = None) -> None:
+        """
+        Set request rate (requests per second) and burst for domain (or url).
+        Rate adapts between min_rate (default rate/16) and max_rate (default rate) with server feedback.
+        """
+        host = self.__host(domain)
+        with self.__lock:
+            if host in self.__default_buckets:
+                self.__buckets[host] = self.__default_buckets.pop(host)
+            if host in self.__buckets:
+                self.__buckets[host].setRate(rate, burst, max_rate, min_rate)
+            else:
+                self.__buckets[host] = AdaptiveTokenBucket(rate, burst, max_rate, min_rate)
+    
+    def setDefaultRate(self, rate: float, burst: float = 1.0) -> None:
+        """Set request rate and burst for domains without setRate(), only affects domains seen later"""
+        self.__default_rate = float(rate)
+        self.__default_burst = float(burst)
+    
+    
+    # helper functions
+    def __host(self, url: str) -> str:
+        """Get host of url without "www.", url can also be a plain domain"""
+        if "://" in url:
+            host = urllib.parse.urlparse(url).hostname or ""
+        else:
+            host = url.split('/')[0].split(':')[0]
+        host = host.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        return host
+
+
+# response cache
+
+@Singleton
+class ResponseCache:
+    """
+    Singleton class of an opt-in on-disk HTTP cache used by getUrlSrc() & getUrlJson().
+    Responses are stored with their ETag/Last-Modified and revalidated with conditional GET
+    once their TTL runs out. Total cache size is bounded, least recently used entries are evicted first.
+    """
+    
+    # private members
+    __enabled: bool = False
+    __cache_dir: str = None
+    __max_size: int = 256 * 1024 * 1024
+    __default_ttl: float = 0.0
+    __domain_ttls: dict = None
+    __entries: OrderedDict = None
+    __total_size: int = 0
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__domain_ttls = {}
+        self.__entries = OrderedDict()
+    
+    # api features
+    def enable(self, cache_dir: str = "./webpic_cache", max_size: int = None, default_ttl: float = None) -> None:
+        """Enable cache with cache_dir, max_size in bytes, and default_ttl in seconds for domains without setTTL()"""
+        with self.__lock:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.__cache_dir = cache_dir
+            if max_size is not None:
+                self.__max_size = int(max_size)
+            if default_ttl is not None:
+                self.__default_ttl = float(default_ttl)
+            self.__loadEntries()
+            self.__enabled = True
+            self.__evict()
+    
+    def disable(self) -> None:
+        """Disable cache, stored entries are kept on disk"""
+        with self.__lock:
+            self.__enabled = False
+    
+    def clear(self) -> None:
+        """Remove all stored entries"""
+        with self.__lock:
+            for key in list(self.__entries.keys()):
+                self.__removeEntry(key)
+    
+    def discard(self, url: str) -> None:
+        """Remove stored entry of url if there is one"""
+        if not self.__enabled:
+            return
+        key = self.__key(url)
+        with self.__lock:
+            if key in self.__entries:
+                self.__removeEntry(key)
+    
+    def lookup(self, url: str) -> dict:
+        """Get stored entry of url as dict, return None if not found"""
+        if not self.__enabled:
+            return None
+        key = self.__key(url)
+        with self.__lock:
+            if key not in self.__entries:
+                return None
+            try:
+                with open(self.__path(key, ".json"), 'r') as file:
+                    entry = json.load(file)
+                with open(self.__path(key, ".body"), 'rb') as file:
+                    entry["content"] = file.read()
+            except (OSError, ValueError): # broken entry
+                self.__removeEntry(key)
+                return None
+            self.__entries.move_to_end(key)
+        return entry
+    
+    def store(self, url: str, content: bytes, headers: dict, encoding: str) -> dict:
+        """Store body & headers of a 200 response of url, return stored entry as dict"""
+        entry = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "encoding": encoding,
+            "stored_at": time.time()
+        }
+        if not self.__enabled:
+            entry["content"] = content
+            return entry
+        key = self.__key(url)
+        with self.__lock:
+            _atomicWrite(self.__path(key, ".body"), content)
+            _atomicWrite(self.__path(key, ".json"), json.dumps(entry).encode())
+            if key in self.__entries:
+                self.__total_size -= self.__entries[key]
+            self.__entries[key] = len(content)
+            self.__entries.move_to_end(key)
+            self.__total_size += len(content)
+            self.__evict()
+        entry["content"] = content
+        return entry
+    
+    def refresh(self, entry: dict) -> None:
+        """Restart TTL of an entry after server confirmed it is still valid (304)"""
+        entry["stored_at"] = time.time()
+        if not self.__enabled:
+            return
+        key = self.__key(entry["url"])
+        meta = {k: v for k, v in entry.items() if k != "content"}
+        with self.__lock:
+            if key in self.__entries:
+                _atomicWrite(self.__path(key, ".json"), json.dumps(meta).encode())
+    
+    def isFresh(self, entry: dict) -> bool:
+        """Whether entry is still within TTL of its domain and can be used without revalidation"""
+        return (time.time() - entry["stored_at"]) < self.getTTL(entry["url"])
+    
+    
+    # getters
+    def isEnabled(self) -> bool:
+        return self.__enabled
+    
+    def getCacheDir(self) -> str:
+        return self.__cache_dir
+    
+    def getMaxSize(self) -> int:
+        return self.__max_size
+    
+    def getTotalSize(self) -> int:
+        return self.__total_size
+    
+    def getTTL(self, url: str) -> float:
+        """Get TTL in seconds for url, the most specific domain set by setTTL() wins"""
+        netloc = urllib.parse.urlparse(url).hostname or ""
+        ttl = self.__default_ttl
+        matched_len = -1
+        for domain, domain_ttl in self.__domain_ttls.items():
+            if (netloc == domain or netloc.endswith('.'+domain)) and len(domain) > matched_len:
+                ttl = domain_ttl
+                matched_len = len(domain)
+        return ttl
+    
+    
+    # setters
+    def setTTL(self, domain: str, ttl: float) -> None:
+        """Set TTL in seconds for a domain (e.g. "danbooru.donmai.us"), subdomains are included"""
+        self.__domain_ttls[domain] = float(ttl)
+    
+    def setMaxSize(self, max_size: int) -> None:
+        """Set max total size of stored bodies in bytes"""
+        with self.__lock:
+            self.__max_size = int(max_size)
+            self.__evict()
+    
+    
+    # helper functions
+    def __key(self, url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+    
+    def __path(self, key: str, ext: str) -> str:
+        return os.path.join(self.__cache_dir, key + ext)
+    
+    def __loadEntries(self) -> None:
+        """Rebuild LRU order from body files in cache_dir, oldest access first"""
+        self.__entries.clear()
+        self.__total_size = 0
+        found = []
+        for name in os.listdir(self.__cache_dir):
+            if not name.endswith(".body"):
+                continue
+            stat = os.stat(os.path.join(self.__cache_dir, name))
+            found.append((stat.st_mtime, name[:-5], stat.st_size))
+        for mtime, key, size in sorted(found):
+            self.__entries[key] = size
+            self.__total_size += size
+    
+    def __removeEntry(self, key: str) -> None:
+        self.__total_size -= self.__entries.pop(key, 0)
+        for ext in (".body", ".json"):
+            if os.path.isfile(self.__path(key, ext)):
+                os.remove(self.__path(key, ext))
+    
+    def __evict(self) -> None:
+        while self.__total_size > self.__max_size and len(self.__entries) > 0:
+            key = next(iter(self.__entries))
+            self.__removeEntry(key)
+
+
+# result cache
+
+@Singleton
+class ResultCache:
+    """
+    Singleton class of an opt-in persistent cache of analyzed results (e.g. WebPic snapshots),
+    stored in a SQLite database in WAL mode and keyed by canonical url.
+    Every entry belongs to a site, and expires after TTL of its site.
+    Recently used entries are also kept in memory, so repeated lookups do not touch the database.
+    """
+    
+    # private members
+    __enabled: bool = False
+    __db_path: str = None
+    __conn: sqlite3.Connection = None
+    __default_ttl: float = 86400.0
+    __site_ttls: dict = None
+    __memory: OrderedDict = None
+    __max_memory: int = 4096
+    __hits: int = 0
+    __misses: int = 0
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__site_ttls = {}
+        self.__memory = OrderedDict()
+    
+    # api features
+    def enable(self, db_path: str = "./webpic_cache/results.sqlite3", default_ttl: float = None, max_memory: int = None) -> None:
+        """
+        Enable cache with database file db_path, default_ttl in seconds for sites without setTTL(),
+        and max_memory entries kept in memory
+        """
+        with self.__lock:
+            if len(os.path.dirname(db_path)) > 0:
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self.__closeConn()
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, site TEXT NOT NULL, stored_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_site ON results (site)")
+            self.__conn = conn
+            self.__db_path = db_path
+            if default_ttl is not None:
+                self.__default_ttl = float(default_ttl)
+            if max_memory is not None:
+                self.__max_memory = int(max_memory)
+            self.__memory.clear()
+            self.__enabled = True
+    
+    def disable(self) -> None:
+        """Disable cache and close database, stored entries are kept on disk"""
+        with self.__lock:
+            self.__enabled = False
+            self.__closeConn()
+            self.__memory.clear()
+    
+    def clear(self, site: str = None) -> None:
+        """Remove all stored entries, or only entries of site"""
+        with self.__lock:
+            if site is None:
+                self.__memory.clear()
+            else:
+                for key in [k for k, v in self.__memory.items() if v[0] == site]:
+                    del self.__memory[key]
+            if self.__conn is None:
+                return
+            if site is None:
+                self.__conn.execute("DELETE FROM results")
+            else:
+                self.__conn.execute("DELETE FROM results WHERE site = ?", (site,))
+    
+    def discard(self, key: str) -> None:
+        """Remove stored entry of key if there is one"""
+        if not self.__enabled:
+            return
+        with self.__lock:
+            self.__memory.pop(key, None)
+            self.__conn.execute("DELETE FROM results WHERE key = ?", (key,))
+    
+    def purge(self) -> int:
+        """Remove all expired entries from database, return number of removed entries"""
+        if not self.__enabled:
+            return 0
+        now = time.time()
+        removed = 0
+        with self.__lock:
+            sites = [row[0] for row in self.__conn.execute("SELECT DISTINCT site FROM results")]
+            for site in sites:
+                cursor = self.__conn.execute(
+                    "DELETE FROM results WHERE site = ? AND stored_at <= ?",
+                    (site, now - self.getTTL(site))
+                )
+                removed += cursor.rowcount
+            for key in [k for k, v in self.__memory.items() if not self.__isFresh(v[0], v[1], now)]:
+                del self.__memory[key]
+        return removed
+    
+    def lookup(self, key: str, site: str = None) -> dict:
+        """Get stored data of key as a new dict, return None if not found, expired, or not stored under site (if given)"""
+        if not self.__enabled:
+            return None
+        now = time.time()
+        with self.__lock:
+            entry = self.__memory.get(key)
+            if entry is not None:
+                self.__memory.move_to_end(key)
+            else:
+                row = self.__conn.execute(
+                    "SELECT site, stored_at, data FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = tuple(row)
+                    self.__remember(key, entry)
+            if entry is None or (site is not None and entry[0] != site) or not self.__isFresh(entry[0], entry[1], now):
+                self.__misses += 1
+                return None
+            self.__hits += 1
+        return json.loads(entry[2])
+    
+    def store(self, key: str, site: str, data: dict) -> None:
+        """Store json serializable data of key under site, nothing is stored if TTL of site is 0"""
+        self.storeMany([(key, site, data)])
+    
+    def storeMany(self, items) -> int:
+        """
+        Store many (key, site, data) tuples in one transaction,
+        return number of stored entries
+        """
+        if not self.__enabled:
+            return 0
+        now = time.time()
+        rows = [
+            (key, site, now, json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+            for key, site, data in items
+            if self.getTTL(site) > 0
+        ]
+        if len(rows) <= 0:
+            return 0
+        with self.__lock:
+            with self.__conn:
+                self.__conn.execute("BEGIN")
+                self.__conn.executemany(
+                    "INSERT OR REPLACE INTO results (key, site, stored_at, data) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            for key, site, stored_at, data in rows:
+                self.__remember(key, (site, stored_at, data))
+        return len(rows)
+    
+    def warmUp(self, keys = None, site: str = None) -> int:
+        """
+        Load fresh entries of keys (default all keys, or all keys of site) from database into memory
+        in one pass, return number of loaded entries. Only up to max_memory latest entries stay in memory.
+        """
+        if not self.__enabled:
+            return 0
+        now = time.time()
+        loaded = 0
+        with self.__lock:
+            if keys is not None:
+                keys = list(keys)
+                rows = []
+                for idx in range(0, len(keys), 500): # stay below sqlite variable limit
+                    chunk = keys[idx:idx+500]
+                    rows += self.__conn.execute(
+                        "SELECT key, site, stored_at, data FROM results WHERE key IN (%s)" % ','.join('?'*len(chunk)),
+                        chunk
+                    ).fetchall()
+            elif site is not None:
+                rows = self.__conn.execute(
+                    "SELECT key, site, stored_at, data FROM results WHERE site = ? ORDER BY stored_at", (site,)
+                ).fetchall()
+            else:
+                rows = self.__conn.execute(
+                    "SELECT key, site, stored_at, data FROM results ORDER BY stored_at"
+                ).fetchall()
+            for key, entry_site, stored_at, data in rows:
+                if self.__isFresh(entry_site, stored_at, now):
+                    self.__remember(key, (entry_site, stored_at, data))
+                    loaded += 1
+        return loaded
+    
+    
+    # getters
+    def isEnabled(self) -> bool:
+        return self.__enabled
+    
+    def getDBPath(self) -> str:
+        return self.__db_path
+    
+    def getTTL(self, site: str) -> float:
+        """Get TTL in seconds of site, default_ttl if it is not set by setTTL()"""
+        return self.__site_ttls.get(site, self.__default_ttl)
+    
+    def getStats(self) -> dict:
+        """Get hit & miss counters of lookup() and number of entries in memory"""
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "memory_entries": len(self.__memory)
+            }
+    
+    
+    # setters
+    def setTTL(self, site: str, ttl: float) -> None:
+        """Set TTL in seconds of site, 0 means results of site are never cached"""
+        self.__site_ttls[site] = float(ttl)
+    
+    def setMaxMemory(self, max_memory: int) -> None:
+        """Set max number of entries kept in memory"""
+        with self.__lock:
+            self.__max_memory = int(max_memory)
+            while len(self.__memory) > self.__max_memory:
+                self.__memory.popitem(last=False)
+    
+    
+    # helper functions
+    def __isFresh(self, site: str, stored_at: float, now: float) -> bool:
+        return (now - stored_at) < self.getTTL(site)
+    
+    def __remember(self, key: str, entry: tuple) -> None:
+        self.__memory[key] = entry
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.__max_memory:
+            self.__memory.popitem(last=False)
+    
+    def __closeConn(self) -> None:
+        if self.__conn is not None:
+            self.__conn.close()
+            self.__conn = None
+
+
+# memo cache
+
+class MemoCache:
+    """
+    Thread-safe in-memory cache with TTL & LRU eviction, used to memoize api calls.
+    Loading is single-flight: concurrent get() of the same missing key run loader only once,
+    other callers wait for its result instead of sending identical requests.
+    """
+    
+    # private members
+    __ttl: float = 600.0
+    __max_entries: int = 1024
+    __entries: OrderedDict = None
+    __inflight: dict = None
+    __hits: int = 0
+    __misses: int = 0
+    __coalesced: int = 0
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self, ttl: float = 600.0, max_entries: int = 1024):
+        self.__lock = threading.Lock()
+        self.__ttl = float(ttl)
+        self.__max_entries = int(max_entries)
+        self.__entries = OrderedDict()
+        self.__inflight = {}
+    
+    # api features
+    def get(self, key, loader, cacheable = None):
+        """
+        Get value of key, call loader() to load it if it is missing or expired.
+        Value is only stored if cacheable(value) is True (default always),
+        an exception from loader is raised to every waiting caller and never stored.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return entry[1]
+            flight = self.__inflight.get(key)
+            is_loader = flight is None
+            if is_loader:
+                flight = {"event": threading.Event(), "value": None, "error": None}
+                self.__inflight[key] = flight
+                self.__misses += 1
+            else:
+                self.__coalesced += 1
+        
+        # someone else is loading key, wait for its result
+        if not is_loader:
+            flight["event"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            return flight["value"]
+        
+        try:
+            value = loader()
+            flight["value"] = value
+            if cacheable is None or cacheable(value):
+                with self.__lock:
+                    self.__entries[key] = (time.monotonic() + self.__ttl, value)
+                    self.__entries.move_to_end(key)
+                    self.__evict()
+            return value
+        except BaseException as err:
+            flight["error"] = err
+            raise err
+        finally:
+            with self.__lock:
+                self.__inflight.pop(key, None)
+            flight["event"].set()
+    
+    def lookup(self, key):
+        """Get stored value of key without loading it, None if it is missing or expired"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return entry[1]
+            self.__misses += 1
+            return None
+    
+    def store(self, key, value) -> None:
+        """Store value of key, for values loaded outside of get() (e.g. by a generator)"""
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            self.__evict()
+    
+    def discard(self, key) -> None:
+        """Remove stored value of key if there is one"""
+        with self.__lock:
+            self.__entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all stored values"""
+        with self.__lock:
+            self.__entries.clear()
+    
+    
+    # getters
+    def getStats(self) -> dict:
+        """Get hits, misses (loader calls), coalesced (callers that waited for another loader) & size"""
+        with self.__lock:
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "coalesced": self.__coalesced,
+                "size": len(self.__entries)
+            }
+    
+    def getTTL(self) -> float:
+        return self.__ttl
+    
+    def getMaxEntries(self) -> int:
+        return self.__max_entries
+    
+    
+    # setters
+    def setTTL(self, ttl: float) -> None:
+        """Set TTL in seconds, only affects values stored afterward"""
+        self.__ttl = float(ttl)
+    
+    def setMaxEntries(self, max_entries: int) -> None:
+        with self.__lock:
+            self.__max_entries = int(max_entries)
+            self.__evict()
+    
+    
+    # helper functions
+    def __evict(self) -> None:
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+
 # public functions
 
 def getUrlSrc(url: str) -> str:
-    """get url source as string"""
+    """get url source as string, request is paced by RateLimiter"""
     
     if len(url) <= 0:
         return
     
-    resp = requests.get(url=url, headers=HEADERS)
-    resp.encoding = resp.apparent_encoding
-    return resp.text
+    content, encoding = _fetchUrl(url)
+    return str(content, encoding or "utf-8", errors="replace")
 
 def getUrlJson(url: str) -> str:
-    """get json data form url"""
+    """get json data form url, request is paced by RateLimiter"""
     
     if len(url) <= 0:
         return
     
-    resp = requests.get(url=url, headers=HEADERS)
-    resp.encoding = resp.apparent_encoding
-    return resp.json()
+    content, encoding = _fetchUrl(url)
+    return json.loads(str(content, encoding or "utf-8", errors="replace"))
+
+def pacedRequest(method: str, url: str, acquire: bool = True, **kwargs) -> requests.Response:
+    """
+    send request through HttpTransport, paced by RateLimiter.
+    A 429/503 response is reported to RateLimiter, which backs off url's domain
+    (honouring Retry-After), and request is retried up to MAX_THROTTLE_RETRIES times.
+    With acquire=False, first attempt is sent without waiting for a token (e.g. a cheap conditional GET).
+    """
+    limiter = RateLimiter.instance()
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        if acquire or attempt > 0:
+            limiter.acquire(url)
+        resp = HttpTransport.instance().request(method, url, **kwargs)
+        if resp.status_code not in THROTTLE_STATUS_CODES:
+            limiter.reportSuccess(url)
+            return resp
+        limiter.reportThrottle(url, _parseRetryAfter(resp))
+        if attempt < MAX_THROTTLE_RETRIES:
+            resp.close()
+    return resp
+
+def _fetchUrl(url: str) -> tuple:
+    """
+    fetch url through ResponseCache (if enabled), return (content, encoding).
+    Only requests serving a full page are charged to RateLimiter,
+    a fresh cache hit or a 304 revalidation is free.
+    """
+    cache = ResponseCache.instance()
+    entry = cache.lookup(url)
+    
+    # fresh cache hit, no request needed
+    if entry is not None and cache.isFresh(entry):
+        return (entry["content"], entry["encoding"])
+    
+    # build conditional request from stale entry
+    cond_headers = {}
+    if entry is not None and entry["etag"] is not None:
+        cond_headers["If-None-Match"] = entry["etag"]
+    if entry is not None and entry["last_modified"] is not None:
+        cond_headers["If-Modified-Since"] = entry["last_modified"]
+    
+    if len(cond_headers) <= 0: # plain request, wait for rate limit
+        resp = pacedRequest("GET", url)
+    else: # revalidate first, only charge rate limit if server serves a full page
+        resp = pacedRequest("GET", url, acquire=False, headers=cond_headers)
+        if resp.status_code == 304:
+            cache.refresh(entry)
+            return (entry["content"], entry["encoding"])
+        RateLimiter.instance().charge(url)
+    
+    if resp.status_code == 200 and cache.isEnabled():
+        entry = cache.store(url, resp.content, resp.headers, resp.apparent_encoding)
+        return (entry["content"], entry["encoding"])
+    return (resp.content, resp.apparent_encoding)
+
+def _parseRetryAfter(resp) -> float:
+    """get seconds from Retry-After header (delay-seconds or HTTP-date), None if not found"""
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, date.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
-def downloadUrl(url, dest_filepath = os.path.curdir):
-    """download url to dest_filepath"""
+def downloadUrl(url, dest_filepath = os.path.curdir, headers: dict = None, chunk_size: int = 65536, resume: bool = True) -> dict:
+    """
+    download url to dest_filepath, return download stats as dict.
+    File is streamed in chunks into a temporary file next to dest_filepath
+    and renamed into place once complete, so memory usage is bounded by chunk_size
+    and an interrupted download never leaves a half-written file behind.
+    
+    With resume=True, the temporary file is kept as "{dest_filepath}.part" along with
+    the server's ETag/Last-Modified, and next call will continue it with a Range request.
+    With resume=False, or if server gives neither ETag nor Last-Modified, a throwaway temp file
+    is used. A download starting from offset 0 preallocates its file from Content-Length.
+    Requests are paced by RateLimiter.
+    """
     
-    # check url
+    # check url & dest_filepath
     if len(url) <= 0:
         return
+    filepath = _downloadFilepath(url, dest_filepath)
+    if filepath is None:
+        return
+    part_path = filepath + ".part"
+    
+    # resume from unfinished part file
+    req_headers = dict(headers) if headers is not None else {}
+    offset = 0
+    if resume:
+        offset, validator = _loadPartInfo(url, part_path)
+        if offset > 0:
+            req_headers["Range"] = f"bytes={offset}-"
+            req_headers["If-Range"] = validator
+    
+    start_time = time.perf_counter()
+    resp = pacedRequest("GET", url, headers=req_headers, stream=True)
+    if offset > 0 and (
+        resp.status_code == 416 or
+        (resp.status_code == 206 and (_contentRangeStart(resp) != offset or _isContentEncoded(resp)))
+        ): # part file cannot be continued, fetch whole file instead
+        resp.close()
+        offset = 0
+        req_headers.pop("Range")
+        req_headers.pop("If-Range")
+        resp = pacedRequest("GET", url, headers=req_headers, stream=True)
+    try:
+        resp.raise_for_status()
+        first_byte_time = time.perf_counter()
+        # server ignored Range or file changed on server, start over
+        if resp.status_code != 206:
+            offset = 0
+        content_length = int(resp.headers.get("Content-Length", -1))
+        # body is decoded while streaming, Content-Length of an encoded body (e.g. gzip) says nothing
+        # about decoded size, and Range of it cannot be appended to decoded part file
+        encoded = _isContentEncoded(resp)
+        expected_length = -1 if encoded else content_length
+        
+        # open file to stream into
+        tmp_path, file = _openDownloadFile(url, filepath, resp, offset, resume and not encoded, expected_length)
+        
+        try:
+            size = 0
+            try:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        file.write(chunk)
+                        size += len(chunk)
+            finally:
+                _closeDownloadFile(file, offset + size)
+            if expected_length >= 0 and size != expected_length:
+                raise IOError(f"Incomplete download, got {size} of {expected_length} bytes from url: {url}")
+            _commitDownloadFile(tmp_path, filepath, resume)
+        except BaseException as err:
+            # keep part file for next attempt, but never leave temp file behind
+            if tmp_path != part_path and os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            raise err
+    finally:
+        resp.close()
+    end_time = time.perf_counter()
+    
+    return {
+        "url": url,
+        "filepath": filepath,
+        "bytes": size,
+        "resumed_from": offset,
+        "content_length": content_length,
+        "first_byte_latency": round(first_byte_time - start_time, 4),
+        "elapsed": round(end_time - start_time, 4)
+    }
+
+def _downloadFilepath(url: str, dest_filepath: str) -> str:
+    """get file path to download url to from dest_filepath, None if dest_filepath is invalid"""
     
     # get dir & filename from dest_filepath
     dir, filename = ntpath.split(dest_filepath)
@@ -133,15 +1270,120 @@ def downloadUrl(url, dest_filepath = os.path.curdir):
         filename = u_filename
     # has filename but no dir
     elif dir == None or len(dir) <= 0:
-        return
+        return None
     
-    # has filename & dir, download file
+    # has filename & dir
     if dir[-1] != '/':
         dir += '/'
-    resp = requests.get(url=url, headers=HEADERS)
-    file = open(dir+filename, "wb")
-    file.write(resp.content)
-    file.close()
+    return dir + filename
+
+def _openDownloadFile(url: str, filepath: str, resp, offset: int, resume: bool, length: int) -> tuple:
+    """
+    open file to stream resp of url into, return (tmp_path, file).
+    Part file of filepath is used if resume is True and resp has a validator, otherwise a throwaway temp file.
+    A file starting from offset 0 is preallocated to length.
+    """
+    dir, filename = ntpath.split(filepath)
+    part_path = filepath + ".part"
+    if resume and _savePartInfo(url, part_path, resp):
+        file = open(part_path, "ab" if offset > 0 else "wb")
+        if offset == 0:
+            _preallocateFile(file, length)
+        return (part_path, file)
+    # nothing to validate a part file with on next attempt, do not keep one
+    if resume:
+        _discardPart(part_path)
+    fd, tmp_path = tempfile.mkstemp(prefix='.'+filename+'.', suffix=".tmp", dir=dir)
+    file = os.fdopen(fd, "wb")
+    _preallocateFile(file, length)
+    return (tmp_path, file)
+
+def _closeDownloadFile(file, size: int) -> None:
+    """close file of _openDownloadFile() at size"""
+    with file:
+        # drop preallocated space we did not use, size of a part file is its resume offset
+        file.truncate(size)
+
+def _commitDownloadFile(tmp_path: str, filepath: str, resume: bool) -> None:
+    """move complete tmp_path into filepath, and forget its part file"""
+    os.replace(tmp_path, filepath)
+    if resume and os.path.isfile(filepath + ".part.json"):
+        os.remove(filepath + ".part.json")
+
+def _preallocateFile(file, length: int) -> None:
+    """reserve length bytes for file on disk if platform supports it"""
+    if length <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(file.fileno(), 0, length)
+    except OSError: # filesystem does not support it, just stream as normal
+        pass
+
+def _atomicWrite(filepath: str, data: bytes) -> None:
+    """write data to a temp file and rename it to filepath"""
+    dir, filename = ntpath.split(filepath)
+    fd, tmp_path = tempfile.mkstemp(prefix='.'+filename+'.', suffix=".tmp", dir=dir)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException as err:
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+        raise err
+
+def _loadPartInfo(url: str, part_path: str) -> tuple:
+    """get (offset, validator) of an unfinished download, offset is 0 if it cannot be resumed"""
+    meta_path = part_path + ".json"
+    if not os.path.isfile(part_path) or not os.path.isfile(meta_path):
+        return (0, None)
+    try:
+        with open(meta_path, 'r') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return (0, None)
+    # part file belongs to another url or cannot be validated
+    if meta.get("url") != url or not meta.get("validator"):
+        return (0, None)
+    return (os.path.getsize(part_path), meta["validator"])
+
+def _savePartInfo(url: str, part_path: str, resp) -> bool:
+    """store validator of resp next to part file, so it can be resumed safely. Return False if resp has no validator"""
+    meta_path = part_path + ".json"
+    # If-Range only accepts strong ETag, use Last-Modified otherwise
+    etag = resp.headers.get("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        validator = etag
+    else:
+        validator = resp.headers.get("Last-Modified")
+    if validator is None: # server gives no validator, part file cannot be resumed
+        if os.path.isfile(meta_path):
+            os.remove(meta_path)
+        return False
+    with open(meta_path, 'w') as file:
+        json.dump({"url": url, "validator": validator}, file)
+    return True
+
+def _discardPart(part_path: str) -> None:
+    """remove part file and its validator"""
+    for path in (part_path, part_path + ".json"):
+        if os.path.isfile(path):
+            os.remove(path)
+
+def _isContentEncoded(resp) -> bool:
+    """whether body of resp is sent with a Content-Encoding (e.g. gzip) other than identity"""
+    encoding = resp.headers.get("Content-Encoding", "").strip().lower()
+    return len(encoding) > 0 and encoding != "identity"
+
+def _contentRangeStart(resp) -> int:
+    """get first byte position from Content-Range header ("bytes {start}-{end}/{total}"), -1 if not found"""
+    content_range = resp.headers.get("Content-Range", "")
+    if not content_range.startswith("bytes "):
+        return -1
+    try:
+        return int(content_range[6:content_range.find('-')])
+    except ValueError:
+        return -1
 
 def randDelay(min: float, max: float) -> None:
     """generate random delay in seconds"""
@@ -154,123 +1396,600 @@ def isValidUrl(url: str) -> bool:
     else: return False
 
 
-# API Classes
+# io requests
+# Site analysis code is written as generators that yield IORequest instead of doing I/O by itself,
+# so the same code can be driven with blocking I/O by runIO(),
+# or with asyncio by asyncRunIO() in asyncwebpicapi.py.
+# Inside a generator, write "src = yield ioUrlSrc(url)" where you would write "src = getUrlSrc(url)",
+# and "result = yield from other_generator" to call another generator.
+
+class IORequest:
+    """Describe one I/O operation yielded by an analysis generator"""
+    
+    # kinds of I/O
+    URL_SRC: str = "url_src"
+    URL_JSON: str = "url_json"
+    POST_JSON: str = "post_json"
+    RESOLVE_URL: str = "resolve_url"
+    DOWNLOAD: str = "download"
+    PACE: str = "pace"
+    CALL: str = "call"
+    
+    # constructor
+    def __init__(self, kind: str, *args, **kwargs):
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+
+def ioUrlSrc(url: str) -> IORequest:
+    """I/O of getUrlSrc(url), result is url source as string"""
+    return IORequest(IORequest.URL_SRC, url)
+
+def ioUrlJson(url: str) -> IORequest:
+    """I/O of getUrlJson(url), result is json data"""
+    return IORequest(IORequest.URL_JSON, url)
+
+def ioPostJson(url: str, data) -> IORequest:
+    """I/O of posting json data to url, result is json data of response"""
+    return IORequest(IORequest.POST_JSON, url, data)
+
+def ioResolveUrl(url: str) -> IORequest:
+    """I/O of following redirects of url, result is final url"""
+    return IORequest(IORequest.RESOLVE_URL, url)
+
+def ioDownload(url: str, dest_filepath: str, headers: dict = None) -> IORequest:
+    """I/O of downloadUrl(url, dest_filepath, headers), result is download stats"""
+    return IORequest(IORequest.DOWNLOAD, url, dest_filepath, headers=headers)
+
+def ioPace(url: str) -> IORequest:
+    """Wait for RateLimiter of url (or domain), result is seconds waited"""
+    return IORequest(IORequest.PACE, url)
+
+def ioCall(func, *args, **kwargs) -> IORequest:
+    """I/O of calling a blocking function (e.g. pixivpy3 & tweepy apis), result is its return value"""
+    return IORequest(IORequest.CALL, func, *args, **kwargs)
+
+def runIO(gen):
+    """Drive an analysis generator with blocking I/O, return its return value"""
+    result = None
+    error = None
+    while True:
+        try:
+            if error is not None:
+                req = gen.throw(error)
+            else:
+                req = gen.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result = None
+        error = None
+        try:
+            result = _doIO(req)
+        except Exception as err: # hand error back to generator
+            error = err
+
+def _doIO(req: IORequest):
+    """do blocking I/O of req, return its result"""
+    if req.kind == IORequest.URL_SRC:
+        return getUrlSrc(*req.args)
+    elif req.kind == IORequest.URL_JSON:
+        return getUrlJson(*req.args)
+    elif req.kind == IORequest.POST_JSON:
+        url, data = req.args
+        return json.loads(pacedRequest("POST", url, json=data).text)
+    elif req.kind == IORequest.RESOLVE_URL:
+        resp = HttpTransport.instance().get(url=req.args[0], stream=True)
+        resp.close()
+        return resp.url
+    elif req.kind == IORequest.DOWNLOAD:
+        return downloadUrl(*req.args, **req.kwargs)
+    elif req.kind == IORequest.PACE:
+        return RateLimiter.instance().acquire(*req.args)
+    elif req.kind == IORequest.CALL:
+        func = req.args[0]
+        return func(*req.args[1:], **req.kwargs)
+    else:
+        raise ValueError(f"Unknown IORequest kind: {req.kind}")
+
+
+# api client registry
+# Api clients that need credentials (PixivAPI, TwitterAPI) are created by ClientRegistry instead of
+# the Singleton decorator, so there can be several named clients of one class (e.g. one per account).
+# Credentials of a client come from the first one of:
+#   1. credentials dict registered with ClientRegistry.register()
+#   2. environment variables (see ENV_VARS of client class), suffixed with "_{NAME}" for named clients
+#   3. "{token_key}" in apitoken.json (or apitoken.json.bak)
+# A client never prompts for missing credentials, it raises ValueError instead.
+
+def loadCredentials(token_key: str, env_vars: dict, required: tuple, credentials: dict = None, name: str = "default", token_path: str = "./apitoken.json") -> tuple:
+    """
+    Find credentials of a client, return (credentials dict, path of apitoken.json or None if not from file).
+    Raise ValueError if any of required keys is missing.
+    """
+    source_path = None
+    output = None
+    suffix = "" if name == "default" else "_" + re.sub(r"\W", '_', name).upper()
+    if credentials is not None:
+        output = dict(credentials.get(token_key, credentials))
+    elif all(os.environ.get(var + suffix) for key, var in env_vars.items() if key in required):
+        output = {key: os.environ[var + suffix] for key, var in env_vars.items() if os.environ.get(var + suffix)}
+    else:
+        for path in (token_path, token_path + ".bak"):
+            try:
+                with open(path, 'r') as file:
+                    output = dict(json.load(file).get(token_key, {}))
+                source_path = token_path
+                break
+            except (OSError, ValueError, AttributeError):
+                continue
+    
+    missing = [key for key in required if output is None or not output.get(key)]
+    if len(missing) > 0:
+        raise ValueError(
+            f"Missing {token_key} credentials of client \"{name}\": {', '.join(missing)}. "
+            f"Pass them to ClientRegistry.register(), set environment variables "
+            f"{', '.join(env_vars[key] + suffix for key in missing)}, or fill them under \"{token_key}\" in {token_path}."
+        )
+    return (output, source_path)
 
 @Singleton
+class ClientRegistry:
+    """
+    Singleton class of a thread-safe registry of named api clients.
+    A client is created on its first get() while holding a lock of its name,
+    so concurrent callers wait for and share one client, and it authenticates only once.
+    """
+    
+    # private members
+    __configs: dict = None
+    __clients: dict = None
+    __pools: dict = None
+    __locks: dict = None
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__configs = {}
+        self.__clients = {}
+        self.__pools = {}
+        self.__locks = {}
+    
+    # api features
+    def register(self, client_class: type, credentials: dict = None, name: str = "default", **kwargs) -> None:
+        """
+        Set credentials dict (and other constructor arguments) of client_class named name.
+        An existing client of that name is closed, and recreated with new credentials on next get().
+        """
+        key = (client_class, name)
+        with self.__lock:
+            self.__configs[key] = dict(kwargs, credentials=credentials)
+            client = self.__clients.pop(key, None)
+        self.__closeClient(client)
+    
+    def registerPool(self, client_class: type, credentials_list: list, name: str = "default", quota: int = None, window: float = 900.0, cooldown: float = None, **kwargs):
+        """
+        Register one client of client_class for each credentials dict in credentials_list (named "{name}#{idx}"),
+        and a ClientPool of them named name, so get() of name returns that pool. Return the pool.
+        quota is max calls of each account per window seconds (None for unknown).
+        """
+        names = []
+        for idx, credentials in enumerate(credentials_list):
+            names.append(f"{name}#{idx}")
+            self.register(client_class, credentials, names[-1], **kwargs)
+        if cooldown is None:
+            cooldown = getattr(client_class, "RATE_LIMIT_COOLDOWN", 60.0)
+        pool = ClientPool(client_class, names, quota, window, cooldown)
+        with self.__lock:
+            self.__pools[(client_class, name)] = pool
+        return pool
+    
+    def get(self, client_class: type, name: str = "default"):
+        """Get client (or ClientPool) of client_class named name, create it on first call"""
+        key = (client_class, name)
+        pool = self.__pools.get(key)
+        if pool is not None:
+            return pool
+        client = self.__clients.get(key)
+        if client is not None:
+            return client
+        with self.__lock:
+            lock = self.__locks.setdefault(key, threading.Lock())
+        with lock:
+            client = self.__clients.get(key)
+            if client is None:
+                config = self.__configs.get(key, {})
+                client = client_class(name=name, **config)
+                with self.__lock:
+                    self.__clients[key] = client
+        return client
+    
+    def remove(self, client_class: type, name: str = "default") -> None:
+        """Close & remove client and credentials of client_class named name"""
+        key = (client_class, name)
+        with self.__lock:
+            self.__configs.pop(key, None)
+            client = self.__clients.pop(key, None)
+            pool = self.__pools.pop(key, None)
+        self.__closeClient(client)
+        if pool is not None:
+            for account in pool.getNames():
+                self.remove(client_class, account)
+    
+    
+    # getters
+    def getNames(self, client_class: type) -> list:
+        """Get names of registered or created clients of client_class"""
+        with self.__lock:
+            keys = list(self.__configs.keys()) + list(self.__clients.keys()) + list(self.__pools.keys())
+        return list(dict.fromkeys(name for cls, name in keys if cls is client_class))
+    
+    def isCreated(self, client_class: type, name: str = "default") -> bool:
+        return (client_class, name) in self.__clients
+    
+    
+    # helper functions
+    def __closeClient(self, client) -> None:
+        if client is not None and hasattr(client, "close"):
+            client.close()
+
+
+class ClientPool:
+    """
+    Thread-safe pool of named clients of one api class (one per account), used like a single client.
+    Each api call is run by the healthy account with most remaining quota (least recently used first on ties).
+    An account that gets rate limited is rotated out for cooldown seconds (doubled while it keeps
+    getting rate limited) and the call is retried by another account. If every account is
+    rotated out or out of quota, calls wait for the first one to come back.
+    Api features listed in COMPOSITE_METHODS of client class (e.g. paging through a timeline) are run
+    with the pool as self, so each request they send is scheduled, charged & retried on its own.
+    """
+    
+    # private members
+    __client_class: type = None
+    __names: list = None
+    __quota: int = None
+    __window: float = 900.0
+    __cooldown: float = 60.0
+    __accounts: dict = None
+    __lock: threading.Lock = None
+    
+    # constructor
+    def __init__(self, client_class: type, names: list, quota: int = None, window: float = 900.0, cooldown: float = 60.0):
+        """names are names of clients in ClientRegistry, quota is max calls of each account per window seconds"""
+        if len(names) <= 0:
+            raise ValueError("ClientPool needs at least one client.")
+        self.__lock = threading.Lock()
+        self.__client_class = client_class
+        self.__names = list(names)
+        self.__quota = quota
+        self.__window = float(window)
+        self.__cooldown = float(cooldown)
+        self.__accounts = {
+            name: {
+                "calls": 0, "errors": 0, "throttles": 0,
+                "window_start": 0.0, "window_calls": 0,
+                "consecutive_throttles": 0, "consecutive_errors": 0,
+                "blocked_until": 0.0, "last_used": 0.0
+            }
+            for name in self.__names
+        }
+    
+    # api features
+    def __getattr__(self, attr: str):
+        """Api features of client class, every call is scheduled on an account of the pool"""
+        if attr.startswith('_') or not callable(getattr(self.__client_class, attr, None)):
+            return getattr(self.client(), attr)
+        if attr in getattr(self.__client_class, "COMPOSITE_METHODS", ()):
+            return functools.partial(getattr(self.__client_class, attr), self)
+        return functools.partial(self.call, attr)
+    
+    def call(self, method: str, *args, **kwargs):
+        """Call api feature method on an account of the pool"""
+        for attempt in range(len(self.__names) * (MAX_THROTTLE_RETRIES + 1)):
+            name = self.__acquire()
+            client = ClientRegistry.instance().get(self.__client_class, name)
+            try:
+                result = getattr(client, method)(*args, **kwargs)
+            except Exception as err:
+                if self.__isRateLimited(error=err):
+                    self.__reportThrottle(name)
+                    continue
+                self.__report(name, error=True)
+                raise err
+            if self.__isRateLimited(result=result):
+                self.__reportThrottle(name)
+                continue
+            self.__report(name, error=False)
+            return result
+        raise ValueError(f"Every account of {self.__client_class.__name__} pool keeps getting rate limited.")
+    
+    def client(self, name: str = None):
+        """Get client of account name, or the account that would run next call"""
+        if name is None:
+            name = self.__acquire(reserve=False)
+        return ClientRegistry.instance().get(self.__client_class, name)
+    
+    
+    # getters
+    def getNames(self) -> list:
+        return list(self.__names)
+    
+    def getStats(self) -> dict:
+        """Get usage of each account: calls, errors, throttles, remaining quota & seconds until it is back in rotation"""
+        now = time.monotonic()
+        with self.__lock:
+            return {
+                name: {
+                    "calls": account["calls"],
+                    "errors": account["errors"],
+                    "throttles": account["throttles"],
+                    "remaining": self.__remaining(account, now),
+                    "blocked_for": max(0.0, account["blocked_until"] - now)
+                }
+                for name, account in self.__accounts.items()
+            }
+    
+    
+    # helper functions
+    def __remaining(self, account: dict, now: float) -> float:
+        if self.__quota is None:
+            return float("inf")
+        if now - account["window_start"] >= self.__window:
+            return float(self.__quota)
+        return float(self.__quota - account["window_calls"])
+    
+    def __acquire(self, reserve: bool = True) -> str:
+        """pick account for next call, wait if no account is available"""
+        while True:
+            now = time.monotonic()
+            with self.__lock:
+                best = None
+                wake_at = None
+                for name in self.__names:
+                    account = self.__accounts[name]
+                    remaining = self.__remaining(account, now)
+                    if account["blocked_until"] > now or remaining <= 0:
+                        back_at = max(account["blocked_until"], account["window_start"] + self.__window if remaining <= 0 else 0.0)
+                        wake_at = back_at if wake_at is None else min(wake_at, back_at)
+                        continue
+                    rank = (remaining, -account["last_used"])
+                    if best is None or rank > best[0]:
+                        best = (rank, name)
+                if best is not None:
+                    name = best[1]
+                    if reserve:
+                        account = self.__accounts[name]
+                        if now - account["window_start"] >= self.__window:
+                            account["window_start"] = now
+                            account["window_calls"] = 0
+                        account["window_calls"] += 1
+                        account["calls"] += 1
+                        account["last_used"] = now
+                    return name
+            time.sleep(max(0.01, wake_at - now))
+    
+    def __report(self, name: str, error: bool) -> None:
+        with self.__lock:
+            account = self.__accounts[name]
+            if error:
+                account["errors"] += 1
+                account["consecutive_errors"] += 1
+                # unhealthy account, rest it like a rate limited one
+                if account["consecutive_errors"] >= 3:
+                    account["blocked_until"] = time.monotonic() + self.__cooldown
+                    account["consecutive_errors"] = 0
+            else:
+                account["consecutive_errors"] = 0
+                account["consecutive_throttles"] = 0
+    
+    def __reportThrottle(self, name: str) -> None:
+        with self.__lock:
+            account = self.__accounts[name]
+            account["throttles"] += 1
+            backoff = self.__cooldown * (2 ** min(account["consecutive_throttles"], 6))
+            account["consecutive_throttles"] += 1
+            account["blocked_until"] = time.monotonic() + backoff * random.uniform(1.0, 1.25)
+    
+    def __isRateLimited(self, result = None, error: Exception = None) -> bool:
+        checker = getattr(self.__client_class, "isRateLimited", None)
+        return checker is not None and checker(result=result, error=error)
+
+
+# API Classes
+
 class PixivAPI:
-    """Singleton class to create & manage pixivpy3 api instance and auth"""
+    """Class to create & manage pixivpy3 api instance and auth, get clients with PixivAPI.instance(name)"""
+    
+    # environment variables of credentials
+    ENV_VARS = {"refresh_token": "PIXIV_REFRESH_TOKEN"}
+    # seconds a rate limited account is rotated out of a ClientPool
+    RATE_LIMIT_COOLDOWN = 60.0
+    # seconds close() waits for refresher thread to finish a refresh in flight
+    CLOSE_TIMEOUT = 10.0
+    # api features sending several requests, a ClientPool schedules each of their requests (see ClientPool)
+    COMPOSITE_METHODS = ("getUserIllustList",)
     
     # private members
-    __api: AppPixivAPI = None
+    __name: str = "default"
+    __api: "pixivpy3.AppPixivAPI" = None
     __auto_refresh_flag: bool = False
-    __apitoken_life: int = None
-    __last_update_life: int = None
+    __detail_cache: MemoCache = None
+    # token state, only kept in memory and written behind to apitoken.json by refresher thread
+    __token_path: str = None
+    __refresh_token: str = None
+    __expires_in: int = 0
+    __expires_at: float = 0.0
+    __refresh_margin: float = 300.0
+    __token_dirty: bool = False
+    __token_lock: threading.Lock = None
+    __flush_lock: threading.Lock = None
+    __refresher: threading.Thread = None
+    __refresher_wakeup: threading.Event = None
+    __closed: bool = False
     
     # constructor
-    def __init__(self, enable_autoRefreshToken: bool = True):
-        apitoken_dict = {}
-        # check whether apitoken.json exist
-        if not os.path.isfile("./apitoken.json"): # file does not exist, create a new one
-            if not os.path.isfile("./apitoken.json.bak"): # no backup file
-                file = open("./apitoken.json", 'w')
-                file.write(apitoken_template)
-                file.close()
-            else: # has backup file
-                shutil.copyfile("./apitoken.json.bak", "./apitoken.json")
-        # file exist
-        file = open("./apitoken.json", 'r')
-        apitoken_dict = json.load(file)
-        file.close()
-        
-        # checking apitoken.json
-        while not self.__has_valid_pixiv_token(apitoken_dict): # prompt user to fill in tokens
-            input("Please fill in all values under \"pixiv_token\" in \"apitoken.json\" under current directory.\nPress any key to refresh.\n\n")
-            file = open("./apitoken.json", 'r')
-            apitoken_dict = json.load(file)
-            file.close()
-        
-        # backup apitoken.json
-        file = open("./apitoken.json.bak", 'w')
-        json.dump(apitoken_dict, file)
-        file.close()
+    def __init__(self, credentials: dict = None, name: str = "default", enable_autoRefreshToken: bool = True, token_path: str = "./apitoken.json"):
+        """
+        Authorize with refresh_token from credentials dict, environment variables or token_path (see loadCredentials()).
+        Refreshed tokens are only written back if they came from token_path.
+        Use PixivAPI.instance(name) to share one client between threads.
+        """
+        self.__name = name
+        self.__detail_cache = MemoCache(ttl=600.0, max_entries=4096)
+        self.__token_lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+        self.__refresher_wakeup = threading.Event()
+        token, self.__token_path = loadCredentials(
+            "pixiv_token", PixivAPI.ENV_VARS, ("refresh_token",),
+            credentials, name, token_path
+        )
         
-        # authorize api
-        self.__api = AppPixivAPI()
+        # authorize api, auth with refresh_token gives a fresh access_token
+        self.__api = pixivpy3.AppPixivAPI()
+        HttpTransport.instance().mount(getattr(self.__api, "requests", None))
         try:
-            self.__api.auth(refresh_token=apitoken_dict["pixiv_token"]["refresh_token"])
+            self.__authorize(token["refresh_token"])
         except Exception as err:
             self.__api = None
             raise err
         
-        # get current apitoken life time
-        self.__apitoken_life = apitoken_dict["pixiv_token"]["expires_in"]
-        self.__last_update_life = self.__apitoken_life
-        
-        # setting __auto_refresh_flag
+        # setting __auto_refresh_flag & start refresher thread
+        self.__refresher = threading.Thread(target=self.__refreshLoop, name=f"PixivTokenRefresher-{name}", daemon=True)
+        self.__refresher.start()
+        atexit.register(self.flushApiToken)
         self.setAutoRefreshToken(enable_autoRefreshToken)
     
+    @classmethod
+    def instance(cls, name: str = "default"):
+        """Get shared client (or ClientPool) named name from ClientRegistry, create it on first call"""
+        return ClientRegistry.instance().get(PixivAPI, name)
+    
+    @classmethod
+    def registerPool(cls, credentials_list: list, name: str = "default", quota: int = None, window: float = 900.0, **kwargs):
+        """Use a pool of accounts (one credentials dict each) as PixivAPI.instance(name), see ClientPool"""
+        return ClientRegistry.instance().registerPool(PixivAPI, credentials_list, name, quota, window, **kwargs)
+    
+    @staticmethod
+    def isRateLimited(result = None, error: Exception = None) -> bool:
+        """Whether result or error of an api call means pixiv is rate limiting this account"""
+        if error is not None:
+            return "rate limit" in str(error).lower()
+        if isinstance(result, dict) and result.get("error"):
+            return "rate limit" in json.dumps(result["error"]).lower()
+        return False
+    
+    def close(self) -> None:
+        """Stop refresher thread, wait for a refresh in flight and write pending token changes"""
+        self.__closed = True
+        self.__refresher_wakeup.set()
+        if self.__refresher is not None and self.__refresher is not threading.current_thread():
+            self.__refresher.join(timeout=self.CLOSE_TIMEOUT)
+        # closed client is flushed here, exit hook would keep it alive & write its token again
+        atexit.unregister(self.flushApiToken)
+        self.flushApiToken()
+    
     def refreshApiToken(self):
-        # load apitoken from file
-        file = open("./apitoken.json", 'r')
-        apitoken_dict = json.load(file)
-        file.close()
-        # refresh token
-        res = refresh_returnDict(apitoken_dict["pixiv_token"]["refresh_token"])
-        # update token
-        apitoken_dict["pixiv_token"]["access_token"] = res["access_token"]
-        apitoken_dict["pixiv_token"]["refresh_token"] = res["refresh_token"]
-        apitoken_dict["pixiv_token"]["expires_in"] = res["expires_in"]
-        # write to apitoken.json
-        file = open("./apitoken.json", 'w')
-        json.dump(apitoken_dict, file)
-        file.close()
-        # backup apitoken.json
-        file = open("./apitoken.json.bak", 'w')
-        json.dump(apitoken_dict, file)
-        file.close()
-    
-    def updateApiTokenLifetime(self, new_lifetime: int):
-        if self.__auto_refresh_flag and new_lifetime <= 100: # refresh apitoken as needed
-            self.refreshApiToken()
-            self.__last_update_life = self.__apitoken_life
-        else: # healthy token, update lifetime
-            # modify lifetime
-            self.__apitoken_life = new_lifetime
-            if abs(self.__apitoken_life - self.__last_update_life) > 30: # minimize file writing
-                # load apitoken from file
-                file = open("./apitoken.json", 'r')
-                apitoken_dict = json.load(file)
-                file.close()
-                # update token
-                apitoken_dict["pixiv_token"]["expires_in"] = self.__apitoken_life
-                # write to file
-                file = open("./apitoken.json", 'w')
-                json.dump(apitoken_dict, file)
-                file.close()
-                # update last_update_life
-                self.__last_update_life = self.__apitoken_life
+        """Refresh api token now, new token is written to apitoken.json in background"""
+        with self.__token_lock:
+            self.__authorize(self.__refresh_token)
+    
+    def flushApiToken(self) -> None:
+        """Write pending token changes to apitoken.json now, other values in the file are kept"""
+        with self.__flush_lock:
+            with self.__token_lock:
+                if not self.__token_dirty:
+                    return
+                self.__token_dirty = False
+                if self.__token_path is None: # credentials are not from a file
+                    return
+                refresh_token = self.__refresh_token
+                access_token = self.__api.access_token
+                expires_in = self.__expires_in
+                expires_at = self.__expires_at
+            try:
+                with open(self.__token_path, 'r') as file:
+                    apitoken_dict = json.load(file)
+            except (OSError, ValueError): # missing or broken file, rewrite it
+                apitoken_dict = json.loads(apitoken_template)
+            apitoken_dict.setdefault("pixiv_token", {})
+            apitoken_dict["pixiv_token"]["access_token"] = access_token
+            apitoken_dict["pixiv_token"]["refresh_token"] = refresh_token
+            apitoken_dict["pixiv_token"]["expires_in"] = expires_in
+            apitoken_dict["pixiv_token"]["expires_at"] = expires_at
+            data = json.dumps(apitoken_dict).encode()
+            try:
+                _atomicWrite(self.__token_path, data)
+                _atomicWrite(self.__token_path + ".bak", data)
+            except OSError as err:
+                self.__token_dirty = True # write again on next flush
+                raise err
+    
+    def updateApiTokenLifetime(self, new_lifetime: int = None):
+        """
+        Deprecated, token lifetime is tracked by wall-clock from "expires_in" now.
+        Only refresh token if it is already expired.
+        """
+        self.__ensureToken()
     
     def setAutoRefreshToken(self, flag):
-        """Whether Enable or Disable auto refreshing pixiv api token"""
+        """Whether Enable or Disable auto refreshing pixiv api token in background"""
         self.__auto_refresh_flag = flag
+        self.__refresher_wakeup.set()
+    
+    def getName(self) -> str:
+        return self.__name
     
     def getApiTokenLifetime(self) -> int:
-        return self.__apitoken_life
+        """Get seconds until api token expires"""
+        return max(0, int(self.__expires_at - time.time()))
+    
+    def getRefreshMargin(self) -> float:
+        return self.__refresh_margin
+    
+    def setRefreshMargin(self, margin: float) -> None:
+        """Set how many seconds before expiry the refresher thread renews api token"""
+        self.__refresh_margin = float(margin)
+        self.__refresher_wakeup.set()
+    
+    def getDetailCache(self) -> MemoCache:
+        """Get MemoCache of getIllustDetail() & getUserDetail(), for getStats() or clear()"""
+        return self.__detail_cache
+    
+    def setDetailCache(self, ttl: float = None, max_entries: int = None) -> None:
+        """Set TTL in seconds and max number of entries of detail cache"""
+        if ttl is not None:
+            self.__detail_cache.setTTL(ttl)
+        if max_entries is not None:
+            self.__detail_cache.setMaxEntries(max_entries)
     
     # api features
     def getIllustDetail(self, pid: int) -> dict:
-        self.updateApiTokenLifetime(self.__apitoken_life-1)
-        return self.__api.illust_detail(pid)
+        """Get illust detail, memoized in detail cache (do not modify returned dict)"""
+        return self.__detail_cache.get(
+            ("illust", str(pid)),
+            lambda: self.__fetchDetail(self.__api.illust_detail, pid),
+            self.__isValidDetail
+        )
     
     def getUserDetail(self, pid: int) -> dict:
-        self.updateApiTokenLifetime(self.__apitoken_life-1)
-        return self.__api.user_detail(pid)
+        """Get user detail, memoized in detail cache (do not modify returned dict)"""
+        return self.__detail_cache.get(
+            ("user", str(pid)),
+            lambda: self.__fetchDetail(self.__api.user_detail, pid),
+            self.__isValidDetail
+        )
+    
+    def getUserIllustPage(self, pid: int, offset: int = None) -> dict:
+        """Get one page of user illustrations, offset of next page can be parsed from "next_url" with api().parse_qs()"""
+        self.__ensureToken()
+        return self.__api.user_illusts(pid, offset=offset)
     
     def getUserIllustList(self, pid: int, count: int) -> dict:
+        """Get up to count illustrations of user, one getUserIllustPage() request per page"""
         output: list = []
         counter = 0
-        cur_page = self.__api.user_illusts(pid)
-        next_url = ""
+        cur_page = self.getUserIllustPage(pid)
         while "next_url" in cur_page:
             for item in cur_page["illusts"]:
                 output.append(item)
@@ -281,10 +2000,8 @@ class PixivAPI:
             if cur_page["next_url"] == None:
                 return output
             # move to next page
-            next = self.__api.parse_qs(cur_page["next_url"])
-            cur_page = self.__api.user_illusts(user_id=pid, offset=next["offset"])
-        # update apitoken lifetime
-        self.updateApiTokenLifetime(self.__apitoken_life-len(output))
+            next = pixivpy3.AppPixivAPI.parse_qs(cur_page["next_url"])
+            cur_page = self.getUserIllustPage(pid, offset=next["offset"])
         return output
     
     def searchIllust(
@@ -293,13 +2010,12 @@ class PixivAPI:
             sort='date_desc', duration=None,
             start_date=None, end_date=None,
             filter='for_ios', offset=None):
+        self.__ensureToken()
         output = self.__api.search_illust(
                 word, search_target=search_target,
                 sort=sort, duration=duration,
                 start_date=start_date, end_date=end_date,
                 filter=filter, offset=offset)
-        # update apitoken lifetime
-        self.updateApiTokenLifetime(self.__apitoken_life-len(output))
         return output
     
     def searchUser(
@@ -308,91 +2024,150 @@ class PixivAPI:
             duration=None,
             filter='for_ios',
             offset=None):
+        self.__ensureToken()
         output = self.__api.search_user(
                 word, sort=sort,
                 duration=duration,
                 filter=filter, offset=offset)
-        # update apitoken lifetime
-        self.updateApiTokenLifetime(self.__apitoken_life-len(output))
         return output
     
     def downloadIllust(self, url: str, path: str=os.path.curdir, name: str=None) -> bool:
-        self.updateApiTokenLifetime(self.__apitoken_life-1)
+        self.__ensureToken()
         return self.__api.download(url=url, path=path, name=name)
     
     def followUser(self, pid: int):
-        self.updateApiTokenLifetime(self.__apitoken_life-1)
+        self.__ensureToken()
         self.__api.user_follow_add(user_id=pid)
     
     def unfollowUser(self, pid: int):
-        self.updateApiTokenLifetime(self.__apitoken_life-1)
+        self.__ensureToken()
         self.__api.user_follow_delete(user_id=pid)
     
-    def api(self) -> AppPixivAPI:
+    def api(self) -> "pixivpy3.AppPixivAPI":
         return self.__api
     
     # helper functions
-    def __has_valid_pixiv_token(self, apitoken_dict: dict) -> bool:
-        return (
-            len(apitoken_dict["pixiv_token"]["code"]) > 0 and
-            len(apitoken_dict["pixiv_token"]["access_token"]) > 0 and
-            len(apitoken_dict["pixiv_token"]["refresh_token"]) > 0 and
-            apitoken_dict["pixiv_token"]["expires_in"] > 0 
-        )
+    def __authorize(self, refresh_token: str) -> None:
+        """auth with refresh_token and keep new token state in memory, caller holds __token_lock if needed"""
+        token = self.__api.auth(refresh_token=refresh_token)
+        self.__refresh_token = self.__api.refresh_token
+        self.__expires_in = int(token.get("expires_in") or token.get("response", {}).get("expires_in", 3600))
+        self.__expires_at = time.time() + self.__expires_in
+        self.__token_dirty = True
+        self.__refresher_wakeup.set()
+    
+    def __ensureToken(self) -> None:
+        """Refresh api token on calling thread only if it is already expired (refresher fell behind)"""
+        if time.time() < self.__expires_at:
+            return
+        with self.__token_lock:
+            if time.time() >= self.__expires_at:
+                self.__authorize(self.__refresh_token)
+    
+    def __refreshLoop(self) -> None:
+        """Refresher thread, renew api token refresh_margin seconds before it expires & write it behind"""
+        while not self.__closed:
+            self.__refresher_wakeup.clear()
+            delay = None
+            if self.__auto_refresh_flag:
+                delay = self.__expires_at - self.__refresh_margin - time.time()
+                if delay <= 0:
+                    try:
+                        self.refreshApiToken()
+                        delay = self.__expires_at - self.__refresh_margin - time.time()
+                    except Exception: # retry later, callers refresh by themselves once token expires
+                        delay = 60.0
+                delay = max(1.0, delay)
+            try:
+                self.flushApiToken()
+            except OSError:
+                pass # keep token in memory, write again on next change or at exit
+            self.__refresher_wakeup.wait(delay)
+    
+    def __fetchDetail(self, api_func, pid: int) -> dict:
+        self.__ensureToken()
+        return api_func(pid)
+    
+    def __isValidDetail(self, detail: dict) -> bool:
+        """error responses (e.g. rate limited, expired token) are not cached"""
+        return detail is not None and "error" not in detail
     
 
 
 
-@Singleton
 class TwitterAPI:
-    """Singleton class to create & manage tweepy api instance and auth"""
+    """Class to create & manage tweepy api instance and auth, get clients with TwitterAPI.instance(name)"""
+    
+    # environment variables of credentials
+    ENV_VARS = {
+        "consumer_api_key": "TWITTER_CONSUMER_API_KEY",
+        "consumer_secret": "TWITTER_CONSUMER_SECRET",
+        "bearer_token": "TWITTER_BEARER_TOKEN",
+        "access_token": "TWITTER_ACCESS_TOKEN",
+        "access_token_secret": "TWITTER_ACCESS_TOKEN_SECRET"
+    }
+    # seconds a rate limited account is rotated out of a ClientPool (one twitter rate limit window)
+    RATE_LIMIT_COOLDOWN = 900.0
+    # api features sending several requests, a ClientPool schedules each of their requests (see ClientPool)
+    COMPOSITE_METHODS = ("iterUserTimeline", "getUserTimeline")
     
     # private members
-    __api: tweepy.API = None
+    __name: str = "default"
+    __api: "tweepy.API" = None
+    __timeline_page_size: int = 200 # max count of user_timeline
     
     # constructor
-    def __init__(self):
-        apitoken_dict = {}
-        # check whether apitoken.json exist
-        if not os.path.isfile("./apitoken.json"): # file does not exist, create a new one
-            if not os.path.isfile("./apitoken.json.bak"): # no backup file
-                file = open("./apitoken.json", 'w')
-                file.write(apitoken_template)
-                file.close()
-            else: # has backup file
-                shutil.copyfile("./apitoken.json.bak", "./apitoken.json")
-        # file exist
-        file = open("./apitoken.json", 'r')
-        apitoken_dict = json.load(file)
-        file.close()
-        
-        # checking apitoken.json
-        while not self.__has_valid_twitter_token(apitoken_dict): # prompt user to fill in tokens
-            input("Please fill in all values under \"twitter_token\" in \"apitoken.json\" under current directory.\nPress any key to refresh.\n\n")
-            file = open("./apitoken.json", 'r')
-            apitoken_dict = json.load(file)
-            file.close()
-        
-        # backup apitoken.json
-        file = open("./apitoken.json.bak", 'w')
-        json.dump(apitoken_dict, file)
-        file.close()
+    def __init__(self, credentials: dict = None, name: str = "default", token_path: str = "./apitoken.json"):
+        """
+        Authorize with credentials dict, environment variables or token_path (see loadCredentials()).
+        Use TwitterAPI.instance(name) to share one client between threads.
+        """
+        self.__name = name
+        token, token_path = loadCredentials(
+            "twitter_token", TwitterAPI.ENV_VARS,
+            ("consumer_api_key", "consumer_secret", "access_token", "access_token_secret"),
+            credentials, name, token_path
+        )
         
         # authorize api
         try:
             auth = tweepy.OAuthHandler(
-                consumer_key=apitoken_dict["twitter_token"]["consumer_api_key"],
-                consumer_secret=apitoken_dict["twitter_token"]["consumer_secret"]
+                consumer_key=token["consumer_api_key"],
+                consumer_secret=token["consumer_secret"]
             )
             auth.set_access_token(
-                apitoken_dict["twitter_token"]["access_token"],
-                apitoken_dict["twitter_token"]["access_token_secret"]
+                token["access_token"],
+                token["access_token_secret"]
             )
-            self.__api: tweepy.API = tweepy.API(auth)
+            self.__api = tweepy.API(auth)
+            HttpTransport.instance().mount(getattr(self.__api, "session", None))
         except Exception as err:
             self.__api = None
             raise err
     
+    @classmethod
+    def instance(cls, name: str = "default"):
+        """Get shared client (or ClientPool) named name from ClientRegistry, create it on first call"""
+        return ClientRegistry.instance().get(TwitterAPI, name)
+    
+    @classmethod
+    def registerPool(cls, credentials_list: list, name: str = "default", quota: int = None, window: float = 900.0, **kwargs):
+        """Use a pool of accounts (one credentials dict each) as TwitterAPI.instance(name), see ClientPool"""
+        return ClientRegistry.instance().registerPool(TwitterAPI, credentials_list, name, quota, window, **kwargs)
+    
+    @staticmethod
+    def isRateLimited(result = None, error: Exception = None) -> bool:
+        """Whether error of an api call means twitter is rate limiting this account"""
+        if error is None:
+            return False
+        if type(error).__name__ in ("RateLimitError", "TooManyRequests"):
+            return True
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None) == 429
+    
+    def getName(self) -> str:
+        return self.__name
+    
     # api features
     def getStatusJson(self, status_id: str) -> dict:
         try:
@@ -409,24 +2184,71 @@ class TwitterAPI:
         except Exception as err:
             raise err
     
+    def getUserTimelinePage(
+            self, user_id: int = None,
+            screen_name: str = None,
+            max_id: int = None,
+            since_id: int = None,
+            media_only: bool = False
+        ) -> tuple:
+        """
+        Get one page of user timeline with one request of 200 tweets (the api maximum),
+        tweets are older than or equal to max_id and newer than since_id.
+        Return (list of tweet json, max_id of next older page or None after last page).
+        With media_only, tweets without extended_entities.media are dropped.
+        """
+        statuses = self.__api.user_timeline(
+            user_id=user_id,
+            screen_name=screen_name,
+            max_id=max_id,
+            since_id=since_id,
+            count=self.__timeline_page_size,
+            tweet_mode="extended"
+        )
+        tweets = [status._json for status in statuses]
+        
+        # twitter may return less than count tweets before the end, only an empty page is the end
+        next_max_id = None
+        if len(tweets) > 0:
+            next_max_id = min(tweet["id"] for tweet in tweets) - 1
+        if media_only:
+            tweets = [tweet for tweet in tweets if self.hasMedia(tweet)]
+        return (tweets, next_max_id)
+    
+    def iterUserTimeline(
+            self, user_id: int = None,
+            screen_name: str = None,
+            max_id: int = None,
+            since_id: int = None,
+            media_only: bool = False
+        ):
+        """Yield tweet json of user timeline from newest to oldest, 200 tweets per request"""
+        while True:
+            tweets, max_id = self.getUserTimelinePage(user_id, screen_name, max_id, since_id, media_only)
+            for tweet in tweets:
+                yield tweet
+            if max_id is None:
+                break
+    
     def getUserTimeline(
             self, user_id: int = None,
             screen_name: str = None,
-            count: int = None
+            count: int = None,
+            media_only: bool = False,
+            max_id: int = None,
+            since_id: int = None
         ) -> list:
-        
+        """
+        Get up to count tweets (None for all tweets twitter keeps, about 3200) of user timeline,
+        paging stops as soon as count tweets are found
+        """
         output = []
-        counter = 0
-        for item in tweepy.Cursor(
-                    self.__api.user_timeline,
-                    user_id=user_id,
-                    screen_name=screen_name,
-                    tweet_mode="extended", count=1).items():
-            if counter >= count:
+        if count is not None and count <= 0:
+            return output
+        for tweet in self.iterUserTimeline(user_id, screen_name, max_id, since_id, media_only):
+            output.append(tweet)
+            if count is not None and len(output) >= count:
                 break
-            counter += 1
-            output.append(item._json)
-        
         return output
     
     def searchTweets(self, keyword: str, max_count: int = 10):
@@ -457,20 +2279,204 @@ class TwitterAPI:
         except Exception as err:
             raise err
     
-    def api(self) -> tweepy.API:
+    def api(self) -> "tweepy.API":
         return self.__api
     
-    # helper functions
-    def __has_valid_twitter_token(self, apitoken_dict: dict) -> bool:
-        return (
-            len(apitoken_dict["twitter_token"]["consumer_api_key"]) > 0 and
-            len(apitoken_dict["twitter_token"]["consumer_secret"]) > 0 and
-            len(apitoken_dict["twitter_token"]["bearer_token"]) > 0 and
-            len(apitoken_dict["twitter_token"]["access_token"]) > 0 and
-            len(apitoken_dict["twitter_token"]["access_token_secret"]) > 0 
-        )
+    # booleans
+    @staticmethod
+    def hasMedia(tweet: dict) -> bool:
+        """Whether tweet json carries pictures or videos (extended_entities.media)"""
+        return len(tweet.get("extended_entities", {}).get("media", [])) > 0
+
+
+
+@Singleton
+class DanbooruAPI:
+    """Singleton class to request from danbooru.donmai.us json api"""
+    
+    # private members
+    __base_url: str = "https://danbooru.donmai.us"
+    __page_limit: int = 200
+    
+    # api features
+    # each feature has a generator version ending with "IO" (see IORequest), used by asyncwebpicapi.py
+    def getPost(self, post_id: int) -> dict:
+        """Get a post as dict via /posts/{post_id}.json"""
+        return runIO(self.getPostIO(post_id))
+    
+    def getPosts(self, tags: str = "", limit: int = 200, page: str = None, only: str = None) -> list:
+        """
+        Get a page of posts matching tags via /posts.json, return list of dict.
+        page can be a page number, or "b{post_id}" for posts before post_id (it is not limited to 1000 pages).
+        only limits returned fields (e.g. "id,tag_string").
+        """
+        return runIO(self.getPostsIO(tags, limit, page, only))
+    
+    def getArtist(self, name: str = None, artist_id: int = None) -> dict:
+        """Get an artist with its urls via /artists.json by name or artist_id, return None if not found"""
+        return runIO(self.getArtistIO(name, artist_id))
+    
+    
+    # api features as generators
+    def getPostIO(self, post_id: int):
+        j_dict = yield ioUrlJson(f"{self.__base_url}/posts/{int(post_id)}.json")
+        if not isinstance(j_dict, dict) or "id" not in j_dict:
+            raise ValueError(f"Cannot find danbooru post: {post_id}")
+        return j_dict
+    
+    def getPostsIO(self, tags: str = "", limit: int = 200, page: str = None, only: str = None):
+        params = {"limit": max(1, min(int(limit), self.__page_limit))}
+        if tags != None and len(tags) > 0:
+            params["tags"] = tags
+        if page != None:
+            params["page"] = page
+        if only != None:
+            params["only"] = only
+        j_list = yield ioUrlJson(f"{self.__base_url}/posts.json?" + urllib.parse.urlencode(params))
+        if not isinstance(j_list, list):
+            raise ValueError(f"Cannot search danbooru posts with tags: {tags}")
+        return j_list
+    
+    def getArtistIO(self, name: str = None, artist_id: int = None):
+        only = "id,name,other_names,urls"
+        if artist_id != None:
+            url = f"{self.__base_url}/artists/{int(artist_id)}.json?only={only}"
+        elif name != None and len(name) > 0:
+            url = f"{self.__base_url}/artists.json?" + urllib.parse.urlencode({"search[name]": name, "only": only})
+        else:
+            return None
+        result = yield ioUrlJson(url)
+        if isinstance(result, list): # search result
+            result = result[0] if len(result) > 0 else None
+        if not isinstance(result, dict) or "name" not in result:
+            return None
+        return result
+    
+    
+    # getters
+    def getBaseUrl(self) -> str:
+        return self.__base_url
+    
+    def getPageLimit(self) -> int:
+        """Get max number of posts in one /posts.json request"""
+        return self.__page_limit
+    
+    
+    # setters
+    def setBaseUrl(self, base_url: str) -> None:
+        """Set url of danbooru server (e.g. a mirror), without tailing '/'"""
+        self.__base_url = base_url.rstrip('/')
+
+
+class MoebooruAPI:
+    """
+    Class to request from json api of a moebooru site (yande.re, konachan.com).
+    Use singletons YandereAPI or KonachanAPI instead of creating it directly.
+    """
+    
+    # private members
+    __base_url: str = ""
+    __page_limit: int = 1000
+    
+    # constructor
+    def __init__(self, base_url: str) -> None:
+        self.__base_url = base_url.rstrip('/')
+    
+    # api features
+    # each feature has a generator version ending with "IO" (see IORequest), used by asyncwebpicapi.py
+    def getPosts(self, tags: str = "", limit: int = 1000, page: int = None, include_tags: bool = False):
+        """
+        Get a page of posts matching tags via /post.json.
+        Return list of dict, or a dict with "posts" & "tags" ({tag: tag_type}) if include_tags is True.
+        """
+        return runIO(self.getPostsIO(tags, limit, page, include_tags))
+    
+    def getPool(self, pool_id: int, page: int = None) -> dict:
+        """Get a pool with a page of its posts via /pool/show.json"""
+        return runIO(self.getPoolIO(pool_id, page))
+    
+    def getTags(self, name: str, limit: int = 10) -> list:
+        """Get tags whose name matches name via /tag.json, return list of dict"""
+        return runIO(self.getTagsIO(name, limit))
+    
+    def getArtists(self, name: str) -> list:
+        """Get artists whose name matches name via /artist.json, return list of dict"""
+        return runIO(self.getArtistsIO(name))
+    
+    
+    # api features as generators
+    def getPostsIO(self, tags: str = "", limit: int = 1000, page: int = None, include_tags: bool = False):
+        params = {"limit": max(1, min(int(limit), self.__page_limit))}
+        if tags != None and len(tags) > 0:
+            params["tags"] = tags
+        if page != None:
+            params["page"] = int(page)
+        if include_tags:
+            params["api_version"] = 2
+            params["include_tags"] = 1
+        result = yield ioUrlJson(f"{self.__base_url}/post.json?" + urllib.parse.urlencode(params))
+        if include_tags:
+            if not isinstance(result, dict) or "posts" not in result:
+                raise ValueError(f"Cannot search posts of {self.__base_url} with tags: {tags}")
+            result.setdefault("tags", {})
+        elif not isinstance(result, list):
+            raise ValueError(f"Cannot search posts of {self.__base_url} with tags: {tags}")
+        return result
+    
+    def getPoolIO(self, pool_id: int, page: int = None):
+        params = {"id": int(pool_id)}
+        if page != None:
+            params["page"] = int(page)
+        result = yield ioUrlJson(f"{self.__base_url}/pool/show.json?" + urllib.parse.urlencode(params))
+        if not isinstance(result, dict) or "id" not in result:
+            raise ValueError(f"Cannot find pool {pool_id} of {self.__base_url}")
+        if result.get("posts", None) == None:
+            result["posts"] = []
+        return result
+    
+    def getTagsIO(self, name: str, limit: int = 10):
+        params = {"name": name, "limit": int(limit)}
+        result = yield ioUrlJson(f"{self.__base_url}/tag.json?" + urllib.parse.urlencode(params))
+        return result if isinstance(result, list) else []
+    
+    def getArtistsIO(self, name: str):
+        params = {"name": name}
+        result = yield ioUrlJson(f"{self.__base_url}/artist.json?" + urllib.parse.urlencode(params))
+        return result if isinstance(result, list) else []
+    
+    
+    # getters
+    def getBaseUrl(self) -> str:
+        return self.__base_url
+    
+    def getPageLimit(self) -> int:
+        """Get max number of posts in one /post.json request"""
+        return self.__page_limit
+    
+    
+    # setters
+    def setBaseUrl(self, base_url: str) -> None:
+        """Set url of moebooru server (e.g. a mirror), without tailing '/'"""
+        self.__base_url = base_url.rstrip('/')
 
 
+@Singleton
+class YandereAPI(MoebooruAPI):
+    """Singleton class to request from yande.re json api"""
+    
+    # constructor
+    def __init__(self) -> None:
+        MoebooruAPI.__init__(self, "https://yande.re")
+
+
+@Singleton
+class KonachanAPI(MoebooruAPI):
+    """Singleton class to request from konachan.com json api"""
+    
+    # constructor
+    def __init__(self) -> None:
+        MoebooruAPI.__init__(self, "https://konachan.com")
+
 
 @Singleton
 class EHentaiAPI:
@@ -478,20 +2484,81 @@ class EHentaiAPI:
     
     # private members
     __api_url: str = "https://api.e-hentai.org/api.php"
+    __domain: str = "e-hentai.org"
     __min_delay: float = 5.0
     __max_delay: float = 7.5
+    __batch_size: int = 25 # max entries of gidlist & pagelist in one api call
+    
+    # constructor
+    def __init__(self):
+        self.__updateRate()
     
     # api features
+    # each feature has a generator version ending with "IO" (see IORequest), used by asyncwebpicapi.py
     def searchKeyword(self, keyword: str, max_galleries: int) -> list:
         """Search specific gallery or tag with keyword in E-Hentai, return list of galleries"""
+        return runIO(self.searchKeywordIO(keyword, max_galleries))
+    
+    def getGalleryInfo(self, url: str) -> dict:
+        """Get basic Gallery Info via E-Hentai API, return json as dict."""
+        return runIO(self.getGalleryInfoIO(url))
+    
+    def findParentGallery(self, url: str) -> dict:
+        """Find parent Gallery Identities (gallery_id & gallery_token) with a picture url."""
+        return runIO(self.findParentGalleryIO(url))
+    
+    def getGalleryInfoBatch(self, urls: list) -> list:
+        """
+        Get basic Gallery Info of many gallery urls via E-Hentai API, up to 25 galleries per api call.
+        Return list of gallery metadata dict (item of "gmetadata") for each url, None for invalid urls & errors.
+        """
+        return runIO(self.getGalleryInfoBatchIO(urls))
+    
+    def findParentGalleryBatch(self, urls: list) -> list:
+        """
+        Find parent Gallery Identities of many picture urls via E-Hentai API, up to 25 pictures per api call.
+        Return list of dict {"gid", "token"} for each url, None for invalid urls & errors.
+        """
+        return runIO(self.findParentGalleryBatchIO(urls))
+    
+    def findParentGalleryUrl(self, url: str) -> str:
+        """Find parent Gallery url with a Picture url."""
+        return runIO(self.findParentGalleryUrlIO(url))
+    
+    def getPicUrl(self, url: str) -> str:
+        """Get picture file url from a picture url. (https://e-hentai.org/s/{page_token}/{gallery_id}-{pagenumber}"""
+        return runIO(self.getPicUrlIO(url))
+    
+    def getPicsInGallery(self, url: str, max_pics: int) -> list:
+        """Get url of pictures from a gallery url. (https://e-hentai.org/g/{gallery_id}/{gallery_token}/"""
+        return runIO(self.getPicsInGalleryIO(url, max_pics))
+    
+    def getGalleryPageCount(self, url: str) -> int:
+        """Get number of pages (40 pictures per page) of a gallery url."""
+        return runIO(self.getGalleryPageCountIO(url))
+    
+    def getPicsInGalleryPage(self, url: str, page: int) -> list:
+        """Get url of pictures in one page of a gallery url, page starts from 0."""
+        return runIO(self.getPicsInGalleryPageIO(url, page))
+    
+    def getGalleriesFromSearch(self, url: str, max_galleries: int) -> list:
+        """Get Galleries from an E-Hentai search url or any E-Hentai pages without /g/ or /s/ until reaches max_galleries."""
+        return runIO(self.getGalleriesFromSearchIO(url, max_galleries))
+    
+    def getGalleriesFromSearchPage(self, url: str, page: int) -> list:
+        """Get Galleries in one page of an E-Hentai search url, page starts from 0, empty list after last page."""
+        return runIO(self.getGalleriesFromSearchPageIO(url, page))
+    
+    
+    # api features as generators
+    def searchKeywordIO(self, keyword: str, max_galleries: int):
         if keyword is None or len(keyword) <= 0 or max_galleries <= 0:
             return None
         
         search_url = "https://e-hentai.org/?f_search=" + urllib.parse.quote(keyword)
-        return self.getGalleriesFromSearch(search_url, max_galleries=max_galleries)
+        return (yield from self.getGalleriesFromSearchIO(search_url, max_galleries=max_galleries))
     
-    def getGalleryInfo(self, url: str) -> dict:
-        """Get basic Gallery Info via E-Hentai API, return json as dict."""
+    def getGalleryInfoIO(self, url: str):
         if not self.isValidGallery(url):
             return None
         
@@ -503,12 +2570,9 @@ class EHentaiAPI:
             ],
             "namespace": 1
         }
-        randDelay(self.__min_delay, self.__max_delay)
-        resp = requests.post(url=self.__api_url, json=param, headers=HEADERS)
-        return json.loads(resp.text)
+        return (yield ioPostJson(self.__api_url, param))
     
-    def findParentGallery(self, url: str) -> dict:
-        """Find parent Gallery Identities (gallery_id & gallery_token) with a picture url."""
+    def findParentGalleryIO(self, url: str):
         if not self.isValidPicture(url):
             return None
         
@@ -519,68 +2583,134 @@ class EHentaiAPI:
                 [tmp_dict["gallery_id"], tmp_dict["page_token"], tmp_dict["pagenumber"]]
             ]
         }
-        randDelay(self.__min_delay, self.__max_delay)
-        resp = requests.post(url=self.__api_url, json=param, headers=HEADERS)
-        return json.loads(resp.text)
-    
-    def findParentGalleryUrl(self, url: str) -> str:
-        """Find parent Gallery url with a Picture url."""
+        return (yield ioPostJson(self.__api_url, param))
+    
+    def getGalleryInfoBatchIO(self, urls: list):
+        urls = list(urls)
+        # same gallery is only requested once
+        keys = []
+        for url in urls:
+            key = None
+            if self.isValidGallery(url):
+                tmp_dict = self.__getGalleryIdentities(url)
+                key = (tmp_dict["gallery_id"], tmp_dict["gallery_token"])
+            keys.append(key)
+        gidlist = [list(key) for key in dict.fromkeys(k for k in keys if k is not None)]
+        
+        results = {}
+        for idx in range(0, len(gidlist), self.__batch_size):
+            param = {
+                "method": "gdata",
+                "gidlist": gidlist[idx:idx+self.__batch_size],
+                "namespace": 1
+            }
+            j_dict = yield ioPostJson(self.__api_url, param)
+            for entry in j_dict.get("gmetadata", []):
+                if "error" not in entry:
+                    results[(int(entry["gid"]), entry["token"])] = entry
+        return [results.get(key) for key in keys]
+    
+    def findParentGalleryBatchIO(self, urls: list):
+        urls = list(urls)
+        # same picture is only requested once
+        keys = []
+        for url in urls:
+            key = None
+            if self.isValidPicture(url):
+                tmp_dict = self.__getPictureIdentities(url)
+                key = (tmp_dict["gallery_id"], tmp_dict["page_token"], tmp_dict["pagenumber"])
+            keys.append(key)
+        pagelist = [list(key) for key in dict.fromkeys(k for k in keys if k is not None)]
+        
+        # tokenlist is in same order as pagelist
+        results = {}
+        for idx in range(0, len(pagelist), self.__batch_size):
+            chunk = pagelist[idx:idx+self.__batch_size]
+            param = {
+                "method": "gtoken",
+                "pagelist": chunk
+            }
+            j_dict = yield ioPostJson(self.__api_url, param)
+            for page, entry in zip(chunk, j_dict.get("tokenlist", [])):
+                if "token" in entry:
+                    results[tuple(page)] = {"gid": int(entry["gid"]), "token": entry["token"]}
+        return [results.get(key) for key in keys]
+    
+    def findParentGalleryUrlIO(self, url: str):
         if not self.isValidPicture(url):
             return None
         
-        tmp_dict = self.findParentGallery(url)["tokenlist"][0]
+        tmp_dict = (yield from self.findParentGalleryIO(url))["tokenlist"][0]
         return f"https://e-hentai.org/g/{tmp_dict['gid']}/{tmp_dict['token']}/"
     
-    def getPicUrl(self, url: str) -> str:
-        """Get picture file url from a picture url. (https://e-hentai.org/s/{page_token}/{gallery_id}-{pagenumber}"""
+    def getPicUrlIO(self, url: str):
         if not self.isValidPicture(url):
             return None
         
-        soup = BeautifulSoup(self.__reqGet(url=url), 'lxml')
+        soup = BeautifulSoup((yield from self.__reqGetIO(url=url)), 'lxml')
         return self.__picUrlFromHTML(soup=soup)
     
-    def getPicsInGallery(self, url: str, max_pics: int) -> list:
-        """Get url of pictures from a gallery url. (https://e-hentai.org/g/{gallery_id}/{gallery_token}/"""
+    def getPicsInGalleryIO(self, url: str, max_pics: int):
         if not self.isValidGallery(url) or max_pics <= 0:
             return None
         
+        total_pages = yield from self.getGalleryPageCountIO(url)
+        output = []
+        for i in range(total_pages):
+            output += yield from self.getPicsInGalleryPageIO(url, i)
+            if len(output) >= max_pics:
+                return output[:max_pics]
+        return output
+    
+    def getGalleryPageCountIO(self, url: str):
+        if not self.isValidGallery(url):
+            return None
+        
         # get gallery info via api
-        j_dict = self.getGalleryInfo(url)
+        j_dict = yield from self.getGalleryInfoIO(url)
         
         # get total page of this gallery
         # assuming each page has 40 img (default setting)
         total_files = int(j_dict["gmetadata"][0]["filecount"])
         # add an extra page if "tmp" has decimal value
         tmp: float = float(total_files / 40.0)
-        total_pages = int(tmp + 1) if ((tmp-int(tmp)) > 0) else int(tmp)
-        pic_counter = 0
-        output = []
+        return int(tmp + 1) if ((tmp-int(tmp)) > 0) else int(tmp)
+    
+    def getPicsInGalleryPageIO(self, url: str, page: int):
+        if not self.isValidGallery(url):
+            return None
         
-        for i in range(total_pages):
-            # get page src
-            page_url = url + f"?p={i}"
-            soup = BeautifulSoup(self.__reqGet(page_url), "lxml")
-            divs = soup.find_all(class_ = "gdtm")
-            
-            # get img src
-            for div in divs:
-                loc_url = div.a.get("href")
-                if loc_url != None:
-                    output.append(loc_url)
-                    pic_counter += 1
-                    if pic_counter >= max_pics:
-                        return output
+        # get page src
+        page_url = url + f"?p={page}"
+        soup = BeautifulSoup((yield from self.__reqGetIO(page_url)), "lxml")
+        divs = soup.find_all(class_ = "gdtm")
+        
+        # get img src
+        output = []
+        for div in divs:
+            loc_url = div.a.get("href")
+            if loc_url != None:
+                output.append(loc_url)
         return output
     
-    def getGalleriesFromSearch(self, url: str, max_galleries: int) -> list:
-        """Get Galleries from an E-Hentai search url or any E-Hentai pages without /g/ or /s/ until reaches max_galleries."""
+    def getGalleriesFromSearchIO(self, url: str, max_galleries: int):
         if self.isValidGallery(url) or self.isValidPicture(url) or max_galleries <= 0:
             return None
         
-        # setup vars
         output = []
         page_count = 0
-        gallery_count = 0
+        while len(output) < max_galleries:
+            galleries = yield from self.getGalleriesFromSearchPageIO(url, page_count)
+            if len(galleries) <= 0: # reaches end of pages
+                break
+            output += galleries
+            page_count += 1
+        return output[:max_galleries]
+    
+    def getGalleriesFromSearchPageIO(self, url: str, page: int):
+        if self.isValidGallery(url) or self.isValidPicture(url):
+            return None
+        
         # extra pure url with search keyword
         parse = urllib.parse.urlparse(url)
         cur1 = parse.query.find("f_search=")
@@ -590,25 +2720,15 @@ class EHentaiAPI:
         else: # has other query, ignore them
             base_url = parse.scheme+"://" + parse.netloc + parse.path + '?'+parse.query[cur1:cur2]
         
-        while gallery_count < max_galleries:
-            # generate search url
-            search_url = base_url + f"&page={page_count}"
-            
-            # make request
-            src = self.__reqGet(search_url)
-            
-            # parse html
-            soup = BeautifulSoup(src, 'lxml')
-            
-            # get all galleries in current page
-            galleries = soup.find_all(class_="gl3c glname")
-            
-            for gallery in galleries:
-                gallery_count += 1
-                output.append(gallery.a.get("href"))
-                if gallery_count >= max_galleries:
-                    break
-        return output
+        # make request
+        src = yield from self.__reqGetIO(base_url + f"&page={page}")
+        
+        # parse html
+        soup = BeautifulSoup(src, 'lxml')
+        
+        # get all galleries in current page
+        galleries = soup.find_all(class_="gl3c glname")
+        return [gallery.a.get("href") for gallery in galleries]
     
     
     # booleans
@@ -650,25 +2770,64 @@ class EHentaiAPI:
     def getMaxDelay(self) -> float:
         return self.__max_delay
     
+    def getBatchSize(self) -> int:
+        """Get max number of galleries or pictures in one api call"""
+        return self.__batch_size
+    
+    def getEffectiveRate(self) -> float:
+        """Get current request rate (requests per second) to e-hentai.org, 0.0 while backing off"""
+        return RateLimiter.instance().getEffectiveRate(self.__domain)
+    
     
     # setters
     def setMinDelay(self, delay: float) -> None:
         """Set self.__min_delay for request"""
         self.__min_delay = round(float(delay), 2)
+        self.__updateRate()
     
     def setMaxDelay(self, delay: float) -> None:
         """Set self.__max_delay for request"""
         self.__max_delay = round(float(delay), 2)
+        self.__updateRate()
     
     
     # helper functions
-    def __reqGet(self, url: str) -> str:
-        """Private HTTP request GET method, contains auto delay"""
+    def __updateRate(self) -> None:
+        """
+        Pace e-hentai.org starting at one request per average delay.
+        While e-hentai is healthy, delay shrinks down to half of min_delay,
+        and it grows far beyond max_delay when e-hentai pushes back.
+        """
+        avg_delay = (self.__min_delay + self.__max_delay) / 2.0
+        if self.__min_delay > 0 and self.__max_delay > 0:
+            RateLimiter.instance().setRate(
+                self.__domain, 1.0 / avg_delay, 1,
+                max_rate = 2.0 / self.__min_delay,
+                min_rate = 1.0 / (self.__max_delay * 8.0)
+            )
+    
+    def __reqGetIO(self, url: str):
+        """Private HTTP request GET method as generator, paced by RateLimiter"""
         if not isValidUrl(url):
             return None
         
-        randDelay(self.__min_delay, self.__max_delay)
-        return getUrlSrc(url)
+        src = yield ioUrlSrc(url)
+        self.__checkBanned(url, src)
+        return src
+    
+    def __checkBanned(self, url: str, src: str) -> None:
+        """Raise ValueError and back off e-hentai.org if src is e-hentai's ban page"""
+        if src is None or "temporarily banned" not in src[:1024]:
+            return
+        # ban page looks like: "The ban expires in 1 hour, 5 minutes and 30 seconds"
+        ban_seconds = 0
+        cur = src.find("expires in")
+        if cur != -1:
+            for num, unit in re.findall(r"(\d+) (day|hour|minute|second)", src[cur:cur+100]):
+                ban_seconds += int(num) * {"day": 86400, "hour": 3600, "minute": 60, "second": 1}[unit]
+        ResponseCache.instance().discard(url)
+        blocked = RateLimiter.instance().reportThrottle(self.__domain, ban_seconds if ban_seconds > 0 else None)
+        raise ValueError(f"IP temporarily banned by e-hentai.org, requests are paused for {int(blocked)} seconds.")
     
     def __picUrlFromHTML(self, soup: BeautifulSoup) -> str:
         """Get url of a single picture from a picture url, input BeautifulSoup of a image page"""
@@ -0,0 +1,505 @@
+#! /bin/python3
+
+# ##################################################################
+# 
+# Asyncio counterpart of webpicapi.py
+# Site analysis in webpicapi.py is written as generators of IORequest,
+# here they are driven with aiohttp and asyncio.sleep() based pacing,
+# so one event loop can keep many lookups in flight across sites.
+# 
+# Author: Gavin1937
+# GitHub: https://github.com/Gavin1937/WebPicAPI
+# 
+# ##################################################################
+
+
+# libs
+import os
+import time
+import json
+import asyncio
+import functools
+import weakref
+import aiohttp
+from webpicapi import *
+from ApiManager import _parseRetryAfter, _downloadFilepath, _openDownloadFile, _closeDownloadFile, _commitDownloadFile, _loadPartInfo, _contentRangeStart, _isContentEncoded
+
+
+# async http transport
+
+@Singleton
+class AsyncHttpTransport:
+    """
+    Singleton class to share keep-alive aiohttp connections for all async HTTP requests.
+    aiohttp.ClientSession is bound to the event loop it is created in,
+    so each running event loop gets its own session.
+    """
+    
+    # private members
+    __limit: int = 100
+    __limit_per_host: int = 8
+    __sessions: weakref.WeakKeyDictionary = None
+    
+    # constructor
+    def __init__(self):
+        self.__sessions = weakref.WeakKeyDictionary()
+    
+    # api features
+    def session(self) -> aiohttp.ClientSession:
+        """Get aiohttp.ClientSession of running event loop"""
+        loop = asyncio.get_running_loop()
+        sess = self.__sessions.get(loop)
+        if sess is None or sess.closed:
+            connector = aiohttp.TCPConnector(limit=self.__limit, limit_per_host=self.__limit_per_host)
+            sess = aiohttp.ClientSession(headers=HEADERS, connector=connector)
+            self.__sessions[loop] = sess
+        return sess
+    
+    async def close(self) -> None:
+        """Close session of running event loop, call it before event loop finishes"""
+        loop = asyncio.get_running_loop()
+        sess = self.__sessions.pop(loop, None)
+        if sess is not None and not sess.closed:
+            await sess.close()
+    
+    
+    # getters
+    def getLimit(self) -> int:
+        return self.__limit
+    
+    def getLimitPerHost(self) -> int:
+        return self.__limit_per_host
+    
+    
+    # setters
+    def setLimit(self, limit: int = None, limit_per_host: int = None) -> None:
+        """
+        Set max number of connections (limit) and max connections to one host (limit_per_host).
+        Only affects sessions created afterward.
+        """
+        if limit is not None:
+            self.__limit = max(1, int(limit))
+        if limit_per_host is not None:
+            self.__limit_per_host = max(1, int(limit_per_host))
+
+
+class AsyncResponse:
+    """Fully read response of async_pacedRequest()"""
+    
+    # constructor
+    def __init__(self, status_code: int, url: str, headers, content: bytes, encoding: str):
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+# public functions
+
+async def async_close() -> None:
+    """Close async HTTP session of running event loop"""
+    await AsyncHttpTransport.instance().close()
+
+async def async_pace(url: str) -> float:
+    """Wait for RateLimiter of url (or domain) without blocking event loop, return seconds waited"""
+    wait = RateLimiter.instance().getBucket(url).reserve()
+    if wait > 0:
+        await asyncio.sleep(wait)
+    return wait
+
+async def async_pacedRequest(method: str, url: str, acquire: bool = True, **kwargs) -> AsyncResponse:
+    """Async version of pacedRequest(), return fully read AsyncResponse"""
+    limiter = RateLimiter.instance()
+    session = AsyncHttpTransport.instance().session()
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        if acquire or attempt > 0:
+            await async_pace(url)
+        async with session.request(method, url, **kwargs) as resp:
+            if resp.status in THROTTLE_STATUS_CODES:
+                limiter.reportThrottle(url, _parseRetryAfter(resp))
+                if attempt < MAX_THROTTLE_RETRIES:
+                    continue
+            else:
+                limiter.reportSuccess(url)
+            content = await resp.read()
+            try:
+                encoding = resp.get_encoding()
+            except RuntimeError:
+                encoding = "utf-8"
+            return AsyncResponse(resp.status, str(resp.url), resp.headers, content, encoding)
+
+async def async_getUrlSrc(url: str) -> str:
+    """Async version of getUrlSrc()"""
+    
+    if len(url) <= 0:
+        return
+    
+    content, encoding = await _async_fetchUrl(url)
+    return str(content, encoding or "utf-8", errors="replace")
+
+async def async_getUrlJson(url: str) -> str:
+    """Async version of getUrlJson()"""
+    
+    if len(url) <= 0:
+        return
+    
+    content, encoding = await _async_fetchUrl(url)
+    return json.loads(str(content, encoding or "utf-8", errors="replace"))
+
+async def _async_fetchUrl(url: str) -> tuple:
+    """Async version of _fetchUrl(), return (content, encoding)"""
+    cache = ResponseCache.instance()
+    entry = cache.lookup(url)
+    
+    # fresh cache hit, no request needed
+    if entry is not None and cache.isFresh(entry):
+        return (entry["content"], entry["encoding"])
+    
+    # build conditional request from stale entry
+    cond_headers = {}
+    if entry is not None and entry["etag"] is not None:
+        cond_headers["If-None-Match"] = entry["etag"]
+    if entry is not None and entry["last_modified"] is not None:
+        cond_headers["If-Modified-Since"] = entry["last_modified"]
+    
+    if len(cond_headers) <= 0: # plain request, wait for rate limit
+        resp = await async_pacedRequest("GET", url)
+    else: # revalidate first, only charge rate limit if server serves a full page
+        resp = await async_pacedRequest("GET", url, acquire=False, headers=cond_headers)
+        if resp.status_code == 304:
+            cache.refresh(entry)
+            return (entry["content"], entry["encoding"])
+        RateLimiter.instance().charge(url)
+    
+    if resp.status_code == 200 and cache.isEnabled():
+        entry = cache.store(url, resp.content, resp.headers, resp.encoding)
+        return (entry["content"], entry["encoding"])
+    return (resp.content, resp.encoding)
+
+async def async_resolveUrl(url: str) -> str:
+    """Follow redirects of url, return final url"""
+    session = AsyncHttpTransport.instance().session()
+    async with session.get(url) as resp:
+        return str(resp.url)
+
+async def async_downloadUrl(url, dest_filepath = os.path.curdir, headers: dict = None, chunk_size: int = 65536, resume: bool = True) -> dict:
+    """Async version of downloadUrl(), file is streamed and resumed the same way"""
+    
+    # check url & dest_filepath
+    if len(url) <= 0:
+        return
+    filepath = _downloadFilepath(url, dest_filepath)
+    if filepath is None:
+        return
+    part_path = filepath + ".part"
+    # file I/O runs in default executor, so a large download never blocks event loop
+    loop = asyncio.get_running_loop()
+    
+    # resume from unfinished part file
+    req_headers = dict(headers) if headers is not None else {}
+    offset = 0
+    if resume:
+        offset, validator = await loop.run_in_executor(None, _loadPartInfo, url, part_path)
+        if offset > 0:
+            req_headers["Range"] = f"bytes={offset}-"
+            req_headers["If-Range"] = validator
+    
+    start_time = time.perf_counter()
+    resp = await _async_pacedStream(url, req_headers)
+    if offset > 0 and (
+        resp.status == 416 or
+        (resp.status == 206 and (_contentRangeStart(resp) != offset or _isContentEncoded(resp)))
+        ): # part file cannot be continued, fetch whole file instead
+        resp.release()
+        offset = 0
+        req_headers.pop("Range")
+        req_headers.pop("If-Range")
+        resp = await _async_pacedStream(url, req_headers)
+    try:
+        resp.raise_for_status()
+        first_byte_time = time.perf_counter()
+        # server ignored Range or file changed on server, start over
+        if resp.status != 206:
+            offset = 0
+        content_length = int(resp.headers.get("Content-Length", -1))
+        # body is decoded while streaming, Content-Length of an encoded body (e.g. gzip) says nothing
+        # about decoded size, and Range of it cannot be appended to decoded part file
+        encoded = _isContentEncoded(resp)
+        expected_length = -1 if encoded else content_length
+        
+        # open file to stream into
+        tmp_path, file = await loop.run_in_executor(
+            None, _openDownloadFile, url, filepath, resp, offset, resume and not encoded, expected_length
+        )
+        
+        try:
+            size = 0
+            try:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    if chunk:
+                        await loop.run_in_executor(None, file.write, chunk)
+                        size += len(chunk)
+            finally:
+                await loop.run_in_executor(None, _closeDownloadFile, file, offset + size)
+            if expected_length >= 0 and size != expected_length:
+                raise IOError(f"Incomplete download, got {size} of {expected_length} bytes from url: {url}")
+            await loop.run_in_executor(None, _commitDownloadFile, tmp_path, filepath, resume)
+        except BaseException as err:
+            # keep part file for next attempt, but never leave temp file behind
+            if tmp_path != part_path and os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+            raise err
+    finally:
+        resp.release()
+    end_time = time.perf_counter()
+    
+    return {
+        "url": url,
+        "filepath": filepath,
+        "bytes": size,
+        "resumed_from": offset,
+        "content_length": content_length,
+        "first_byte_latency": round(first_byte_time - start_time, 4),
+        "elapsed": round(end_time - start_time, 4)
+    }
+
+async def _async_pacedStream(url: str, headers: dict) -> aiohttp.ClientResponse:
+    """Send a paced GET like async_pacedRequest(), return response before its body is read"""
+    limiter = RateLimiter.instance()
+    session = AsyncHttpTransport.instance().session()
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        await async_pace(url)
+        resp = await session.get(url, headers=headers)
+        if resp.status not in THROTTLE_STATUS_CODES:
+            limiter.reportSuccess(url)
+            return resp
+        limiter.reportThrottle(url, _parseRetryAfter(resp))
+        if attempt < MAX_THROTTLE_RETRIES:
+            resp.release()
+    return resp
+
+async def asyncRunIO(gen):
+    """Drive an analysis generator with asyncio I/O, return its return value"""
+    result = None
+    error = None
+    while True:
+        try:
+            if error is not None:
+                req = gen.throw(error)
+            else:
+                req = gen.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result = None
+        error = None
+        try:
+            result = await _asyncDoIO(req)
+        except Exception as err: # hand error back to generator
+            error = err
+
+async def _asyncDoIO(req: IORequest):
+    """do asyncio I/O of req, return its result"""
+    if req.kind == IORequest.URL_SRC:
+        return await async_getUrlSrc(*req.args)
+    elif req.kind == IORequest.URL_JSON:
+        return await async_getUrlJson(*req.args)
+    elif req.kind == IORequest.POST_JSON:
+        url, data = req.args
+        return json.loads((await async_pacedRequest("POST", url, json=data)).text)
+    elif req.kind == IORequest.RESOLVE_URL:
+        return await async_resolveUrl(*req.args)
+    elif req.kind == IORequest.DOWNLOAD:
+        return await async_downloadUrl(*req.args, **req.kwargs)
+    elif req.kind == IORequest.PACE:
+        return await async_pace(*req.args)
+    elif req.kind == IORequest.CALL:
+        # pixivpy3 & tweepy are blocking, run them in default executor
+        func = functools.partial(req.args[0], *req.args[1:], **req.kwargs)
+        return await asyncio.get_running_loop().run_in_executor(None, func)
+    else:
+        raise ValueError(f"Unknown IORequest kind: {req.kind}")
+
+
+# API Classes
+
+@Singleton
+class AsyncEHentaiAPI:
+    """Singleton class of EHentaiAPI with async api features"""
+    
+    # private members
+    __api: EHentaiAPI = None
+    
+    # constructor
+    def __init__(self):
+        self.__api = EHentaiAPI.instance()
+    
+    # api features
+    async def searchKeyword(self, keyword: str, max_galleries: int) -> list:
+        return await asyncRunIO(self.__api.searchKeywordIO(keyword, max_galleries))
+    
+    async def getGalleryInfo(self, url: str) -> dict:
+        return await asyncRunIO(self.__api.getGalleryInfoIO(url))
+    
+    async def findParentGallery(self, url: str) -> dict:
+        return await asyncRunIO(self.__api.findParentGalleryIO(url))
+    
+    async def getGalleryInfoBatch(self, urls: list) -> list:
+        return await asyncRunIO(self.__api.getGalleryInfoBatchIO(urls))
+    
+    async def findParentGalleryBatch(self, urls: list) -> list:
+        return await asyncRunIO(self.__api.findParentGalleryBatchIO(urls))
+    
+    async def findParentGalleryUrl(self, url: str) -> str:
+        return await asyncRunIO(self.__api.findParentGalleryUrlIO(url))
+    
+    async def getPicUrl(self, url: str) -> str:
+        return await asyncRunIO(self.__api.getPicUrlIO(url))
+    
+    async def getPicsInGallery(self, url: str, max_pics: int) -> list:
+        return await asyncRunIO(self.__api.getPicsInGalleryIO(url, max_pics))
+    
+    async def getGalleryPageCount(self, url: str) -> int:
+        return await asyncRunIO(self.__api.getGalleryPageCountIO(url))
+    
+    async def getPicsInGalleryPage(self, url: str, page: int) -> list:
+        return await asyncRunIO(self.__api.getPicsInGalleryPageIO(url, page))
+    
+    async def getGalleriesFromSearch(self, url: str, max_galleries: int) -> list:
+        return await asyncRunIO(self.__api.getGalleriesFromSearchIO(url, max_galleries))
+    
+    async def getGalleriesFromSearchPage(self, url: str, page: int) -> list:
+        return await asyncRunIO(self.__api.getGalleriesFromSearchPageIO(url, page))
+    
+    
+    # getters
+    def getApi(self) -> EHentaiAPI:
+        return self.__api
+
+
+class AsyncWebPic:
+    """
+    Async wrapper of a WebPic derived object (PixivPic, TwitterPic, ...).
+    Getters are same as wrapped object, getChildrenUrls() & downloadPic() are coroutines.
+    """
+    
+    # private members
+    __webpic: WebPic = None
+    
+    # constructor
+    def __init__(self, webpic: WebPic):
+        self.__webpic = webpic
+    
+    def clear(self) -> None:
+        self.__webpic.clear()
+    
+    # getters
+    def getWebPic(self) -> WebPic:
+        """Get wrapped WebPic derived object"""
+        return self.__webpic
+    
+    def getUrl(self) -> str:
+        return self.__webpic.getUrl()
+    
+    def getWebPicType(self) -> WebPicType:
+        return self.__webpic.getWebPicType()
+    
+    def getFileUrl(self) -> tuple:
+        return self.__webpic.getFileUrl()
+    
+    def getFileName(self) -> tuple:
+        return self.__webpic.getFileName()
+    
+    def getSrcUrl(self) -> str:
+        return self.__webpic.getSrcUrl()
+    
+    def hasArtist(self) -> bool:
+        return self.__webpic.hasArtist()
+    
+    def getArtistInfo(self) -> ArtistInfo:
+        return self.__webpic.getArtistInfo()
+    
+    def getTags(self) -> tuple:
+        return self.__webpic.getTags()
+    
+    def isParent(self) -> bool:
+        return self.__webpic.isParent()
+    
+    def isChild(self) -> bool:
+        return self.__webpic.isChild()
+    
+    def getParentChildStatus(self) -> ParentChild:
+        return self.__webpic.getParentChildStatus()
+    
+    def getFields(self) -> WebPicField:
+        return self.__webpic.getFields()
+    
+    # api features
+    async def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """
+        Async version of resolve(), resolve lazy fields without blocking event loop.
+        Call it before accessing fields that were not requested in async_url2WebPic().
+        """
+        await asyncRunIO(self.__webpic.resolveIO(fields))
+    
+    async def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Async version of downloadPic()"""
+        return await asyncRunIO(self.__webpic.downloadPicIO(dest_filepath))
+    
+    async def getChildrenUrls(self, max_num: int = 30) -> list:
+        """Async version of getChildrenUrls()"""
+        return await asyncRunIO(self.__webpic.getChildrenUrlsIO(max_num))
+    
+    async def iterChildrenUrls(self, max_num: int = -1, prefetch: bool = True):
+        """Async version of iterChildrenUrls(), use it with "async for" """
+        
+        # only process if current obj is parent, and nothing is wanted from max_num 0
+        if not self.__webpic.isParent() or max_num == 0:
+            return
+        
+        count = 0
+        fetchPage = lambda cursor, limit: asyncio.ensure_future(asyncRunIO(self.__webpic.childrenPageIO(cursor, limit)))
+        page = fetchPage(None, max_num)
+        try:
+            while page is not None:
+                urls, cursor = await page
+                if max_num >= 0:
+                    urls = urls[:max_num-count]
+                count += len(urls)
+                limit = max_num - count if max_num >= 0 else -1
+                has_next = cursor is not None and limit != 0
+                
+                # fetch next page while caller consumes current page
+                page = None
+                if has_next and prefetch:
+                    page = fetchPage(cursor, limit)
+                for url in urls:
+                    yield url
+                if has_next and not prefetch:
+                    page = fetchPage(cursor, limit)
+        finally:
+            # caller may stop early, cancel unused prefetch
+            if page is not None and not page.done():
+                page.cancel()
+
+
+# public functions
+
+async def async_url2WebPic(url: str, fields: WebPicField = WebPicField.ALL) -> AsyncWebPic:
+    """Async version of url2WebPic(), return AsyncWebPic wrapping the WebPic object"""
+    webpic = getCachedWebPic(url)
+    if webpic is not None:
+        return AsyncWebPic(webpic)
+    webpic_class = WebPicType2Class(routeUrl(url).webpic_type)
+    if webpic_class is None: # Unknown
+        return None
+    webpic = webpic_class(url, analyze=False, fields=fields)
+    await asyncRunIO(webpic.analyzeIO())
+    if ResultCache.instance().isEnabled():
+        cacheWebPics([webpic])
+    return AsyncWebPic(webpic)
+
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# make webpicapi & ApiManager importable without installing them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
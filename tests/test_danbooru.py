@@ -0,0 +1,207 @@
+# tests of DanbooruAPI & DanbooruPic against a local stand-in of danbooru json api,
+# serving recorded posts & artists from fixtures/danbooru
+
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ApiManager import DanbooruAPI, RateLimiter
+from webpicapi import DanbooruPic, getArtistCache
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "danbooru")
+
+def loadFixture(name: str):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Answer /posts, /posts/{id} & /artists json requests the way danbooru does"""
+    
+    posts: list = loadFixture("posts.json")
+    artists: list = loadFixture("artists.json")
+    
+    def do_GET(self):
+        parse = urllib.parse.urlparse(self.path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(parse.query).items()}
+        self.server.requests.append((parse.path, query))
+        dirs = parse.path.strip('/').split('/')
+        
+        if parse.path == "/posts.json":
+            self.reply(200, self.searchPosts(query))
+        elif dirs[0] == "posts" and len(dirs) == 2:
+            post = self.findById(self.posts, dirs[1])
+            self.reply(*((200, post) if post else self.notFound()))
+        elif parse.path == "/artists.json":
+            name = query.get("search[name]", "")
+            self.reply(200, [self.pick(a, query) for a in self.artists if a["name"] == name])
+        elif dirs[0] == "artists" and len(dirs) == 2:
+            artist = self.findById(self.artists, dirs[1])
+            self.reply(*((200, self.pick(artist, query)) if artist else self.notFound()))
+        else:
+            self.reply(*self.notFound())
+    
+    def searchPosts(self, query: dict) -> list:
+        tags = query.get("tags", "").split()
+        posts = [p for p in self.posts if all(t in p["tag_string"].split() for t in tags if ':' not in t)]
+        if "order:score" in tags:
+            posts.sort(key=lambda p: p["score"], reverse=True)
+        limit = int(query.get("limit", 20))
+        page = query.get("page", "1")
+        if page.startswith('b'):
+            posts = [p for p in posts if p["id"] < int(page[1:])][:limit]
+        else:
+            posts = posts[(int(page)-1)*limit:int(page)*limit]
+        return [self.pick(p, query) for p in posts]
+    
+    def findById(self, items: list, item_id: str) -> dict:
+        item_id = item_id[:-len(".json")] if item_id.endswith(".json") else item_id
+        for item in items:
+            if str(item["id"]) == item_id:
+                return item
+        return None
+    
+    def pick(self, item: dict, query: dict) -> dict:
+        if "only" not in query:
+            return item
+        return {k: v for k, v in item.items() if k in query["only"].split(',')}
+    
+    def notFound(self) -> tuple:
+        return (404, {"success": False, "error": "ActiveRecord::RecordNotFound", "message": "That record was not found."})
+    
+    def reply(self, status: int, data) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    api = DanbooruAPI.instance()
+    old_base_url = api.getBaseUrl()
+    api.setBaseUrl(base_url + '/')
+    RateLimiter.instance().setRate(base_url, 1000.0, 1000.0)
+    try:
+        yield httpd
+    finally:
+        api.setBaseUrl(old_base_url)
+        httpd.shutdown()
+        httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def clearRequests(server):
+    server.requests.clear()
+
+
+# DanbooruAPI
+
+def test_getPost(server):
+    post = DanbooruAPI.instance().getPost(5004)
+    assert post["id"] == 5004
+    assert post["tag_string_artist"] == "kaede_(artist)"
+    assert server.requests == [("/posts/5004.json", {})]
+
+def test_getPost_notFound(server):
+    with pytest.raises(ValueError):
+        DanbooruAPI.instance().getPost(9999)
+
+def test_getPosts(server):
+    api = DanbooruAPI.instance()
+    posts = api.getPosts("kaede_(artist)", limit=2, only="id")
+    assert posts == [{"id": 5005}, {"id": 5004}]
+    posts = api.getPosts("kaede_(artist)", limit=2, page=f"b{posts[-1]['id']}", only="id")
+    assert posts == [{"id": 5002}, {"id": 5001}]
+    assert server.requests[-1] == ("/posts.json", {"limit": "2", "tags": "kaede_(artist)", "page": "b5004", "only": "id"})
+
+def test_getPosts_limitCap(server):
+    api = DanbooruAPI.instance()
+    api.getPosts(limit=5000)
+    assert server.requests[-1][1]["limit"] == str(api.getPageLimit())
+
+def test_getArtist(server):
+    api = DanbooruAPI.instance()
+    by_name = api.getArtist(name="kaede_(artist)")
+    by_id = api.getArtist(artist_id=301)
+    assert by_name == by_id
+    assert by_name["other_names"] == ["kaede", "楓"]
+    assert server.requests[0] == ("/artists.json", {"search[name]": "kaede_(artist)", "only": "id,name,other_names,urls"})
+    assert server.requests[1] == ("/artists/301.json", {"only": "id,name,other_names,urls"})
+
+def test_getArtist_notFound(server):
+    api = DanbooruAPI.instance()
+    assert api.getArtist(name="nobody") == None
+    assert api.getArtist(artist_id=404) == None
+    assert api.getArtist() == None
+
+
+# DanbooruPic
+
+def test_childPic(server):
+    pic = DanbooruPic("https://danbooru.donmai.us/posts/5004")
+    assert pic.isChild()
+    assert pic.getFileName() == ("aa04.jpg",)
+    assert pic.getSrcUrl() == "https://twitter.com/i/web/status/1400000000000000004"
+    assert pic.hasArtist()
+    artist = pic.getArtistInfo()
+    assert artist.getArtistNames() == ("kaede_(artist)", "kaede", "楓")
+    assert artist.getUrl_pixiv() == ("https://www.pixiv.net/users/1234567",)
+    assert artist.getUrl_twitter() == ("https://twitter.com/kaede_art",)
+
+def test_childPics_shareArtistFetch(server):
+    getArtistCache().clear()
+    post_ids = [5005, 5004, 5002, 5001] * 2
+    with ThreadPoolExecutor(max_workers=len(post_ids)) as pool:
+        pics = list(pool.map(lambda post_id: DanbooruPic(f"https://danbooru.donmai.us/posts/{post_id}"), post_ids))
+    assert all(pic.getArtistInfo().getArtistNames()[0] == "kaede_(artist)" for pic in pics)
+    # concurrent posts of one artist wait for a single artist request
+    assert [path for path, _ in server.requests].count("/artists.json") == 1
+
+def test_childrenUrls_beforeIdCursor(server, monkeypatch):
+    monkeypatch.setattr(DanbooruAPI.instance(), "getPageLimit", lambda: 2)
+    pic = DanbooruPic("https://danbooru.donmai.us/posts?tags=smile")
+    server.requests.clear() # drop requests of analyzing parent
+    urls = pic.getChildrenUrls(-1)
+    assert urls == [
+        "https://danbooru.donmai.us/posts/5005",
+        "https://danbooru.donmai.us/posts/5004",
+        "https://danbooru.donmai.us/posts/5001",
+    ]
+    assert [q.get("page") for _, q in server.requests] == [None, "b5004"]
+
+def test_childrenUrls_orderedSearchPages(server, monkeypatch):
+    monkeypatch.setattr(DanbooruAPI.instance(), "getPageLimit", lambda: 2)
+    pic = DanbooruPic("https://danbooru.donmai.us/posts?tags=solo+order%3Ascore")
+    server.requests.clear()
+    urls = pic.getChildrenUrls(-1)
+    assert urls == [
+        "https://danbooru.donmai.us/posts/5002",
+        "https://danbooru.donmai.us/posts/5005",
+        "https://danbooru.donmai.us/posts/5001",
+        "https://danbooru.donmai.us/posts/5003",
+    ]
+    # ordered searches cannot use "b{id}" cursors, they are paged by page number
+    assert [q.get("page") for _, q in server.requests] == ["1", "2", "3"]
+
+def test_iterChildrenUrls_zero(server):
+    pic = DanbooruPic("https://danbooru.donmai.us/posts?tags=smile")
+    server.requests.clear()
+    assert list(pic.iterChildrenUrls(0)) == []
+    assert server.requests == []
@@ -0,0 +1,28 @@
+# importing webpicapi must not load optional heavy dependencies,
+# they are imported lazily on first use (see LazyModule)
+
+
+import os
+import sys
+import time
+import subprocess
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ("bs4", "pixivpy3", "tweepy", "lxml")
+
+def test_importIsLazy():
+    code = (
+        "import sys, webpicapi\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR,
+        capture_output=True, text=True, timeout=60
+    )
+    elapsed = time.monotonic() - start
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    # generous bound, a cold import of the package alone takes well under a second
+    assert elapsed < 10.0
@@ -0,0 +1,47 @@
+# tests of offline url router (routeUrl, canonicalKey & dedupeUrls)
+
+
+from webpicapi import routeUrl, canonicalKey, dedupeUrls, _weiboMid2Id
+
+
+# weibo
+
+def test_weibo_numericStatus():
+    route = routeUrl("https://m.weibo.cn/status/4669008060350870")
+    assert route.canonical_url == "https://m.weibo.cn/detail/4669008060350870"
+    assert route.key == ("weibo", "status", "4669008060350870")
+
+def test_weibo_letterMid():
+    status_id = _weiboMid2Id("KxYzAbcD")
+    route = routeUrl("https://m.weibo.cn/status/KxYzAbcD")
+    assert route.canonical_url == "https://m.weibo.cn/detail/" + status_id
+    assert route.key == ("weibo", "status", status_id)
+
+def test_weibo_digitLeadingMid():
+    status_id = _weiboMid2Id("4KxYzAbcD")
+    route = routeUrl("https://m.weibo.cn/status/4KxYzAbcD")
+    assert route.canonical_url == "https://m.weibo.cn/detail/" + status_id
+    assert route.key == ("weibo", "status", status_id)
+    assert status_id != "4"
+
+def test_weibo_midAndIdShareKey():
+    status_id = _weiboMid2Id("4KxYzAbcD")
+    assert canonicalKey("https://weibo.com/1833651020/4KxYzAbcD") == canonicalKey("https://m.weibo.cn/detail/" + status_id)
+    assert len(dedupeUrls([
+        "https://m.weibo.cn/status/4KxYzAbcD",
+        "https://m.weibo.cn/status/4LmNoPqR",
+    ])) == 2
+
+
+# twitter
+
+def test_twitter_statusFormsShareCanonicalUrl():
+    urls = [
+        "https://twitter.com/MySportsUpdate/status/1428422991269044227",
+        "https://x.com/mysportsupdate/status/1428422991269044227?s=20",
+        "https://mobile.twitter.com/i/web/status/1428422991269044227",
+    ]
+    routes = [routeUrl(url) for url in urls]
+    assert {route.canonical_url for route in routes} == {"https://twitter.com/i/web/status/1428422991269044227"}
+    assert {route.key for route in routes} == {("twitter", "status", "1428422991269044227")}
+    assert routes[0].ids["screen_name"] == "MySportsUpdate"
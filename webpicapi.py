@@ -13,11 +13,17 @@
 
 # libs
 import os
+import sys
 import ntpath
 import urllib.parse
-import requests
 import json
-from enum import IntEnum
+import threading
+import re
+import typing
+from functools import lru_cache
+from enum import IntEnum, IntFlag
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from ApiManager import *
 
 
@@ -39,6 +45,10 @@ def space2lowline(s: str) -> str:
         output += i + '_'
     return output[:-1]
 
+def internTags(tags) -> tuple:
+    """Convert tags to a tuple of interned strings, so equal tags of all objects share one string"""
+    return tuple(sys.intern(str(tag)) for tag in tags)
+
 def rmListDuplication(l: list) -> list:
     output = []
     for item in l:
@@ -76,6 +86,18 @@ class ParentChild(IntEnum):
     PARENT = 1,
     CHILD = 2
 
+class WebPicField(IntFlag):
+    """
+    Fields of a WebPic object, combine them with '|'.
+    Fields passed to constructor are analyzed up front, other fields that
+    need extra requests are resolved on first access (or with resolve()).
+    """
+    FILE   = 1   # getFileUrl() & getFileName()
+    SRC    = 2   # getSrcUrl()
+    TAGS   = 4   # getTags()
+    ARTIST = 8   # hasArtist() & getArtistInfo()
+    ALL    = 15
+
 def WebPicType2Str(webpic_type: WebPicType) -> str:
     """Convert WebPicType to String"""
     if webpic_type == WebPicType.PIXIV:
@@ -153,6 +175,17 @@ def DomainStr2WebPicType(domain_str: str) -> WebPicType:
     else: # Unknown
         return WebPicType.UNKNOWN
 
+def setSiteRate(webpic_type: WebPicType, rate: float, burst: float = 1.0, max_rate: float = None) -> None:
+    """
+    Set request rate (requests per second) and burst of a WebPicType's domain in RateLimiter,
+    rate speeds up to max_rate while site is healthy
+    """
+    RateLimiter.instance().setRate(WebPicType2DomainStr(webpic_type), rate, burst, max_rate)
+
+def setResultTTL(webpic_type: WebPicType, ttl: float) -> None:
+    """Set TTL in seconds of a WebPicType's results in ResultCache, 0 means its results are never cached"""
+    ResultCache.instance().setTTL(WebPicType2Str(webpic_type), ttl)
+
 def WebPicTypeMatch(src_type: WebPicType, dest_type: WebPicType) -> bool:
     """Check wether src_type is same as dest_type"""
     # handle String dest_type
@@ -164,71 +197,412 @@ def WebPicTypeMatch(src_type: WebPicType, dest_type: WebPicType) -> bool:
     return bool(src_type == loc_dest_type)
 
 
+# default request rate of each site (requests per second, burst, max requests per second)
+# e-hentai.org is paced by EHentaiAPI with its min & max delay
+setSiteRate(WebPicType.DANBOORU, 0.5, 2, max_rate=1.0)
+setSiteRate(WebPicType.YANDERE, 0.5, 2, max_rate=1.0)
+setSiteRate(WebPicType.KONACHAN, 0.5, 2, max_rate=1.0)
+setSiteRate(WebPicType.WEIBO, 0.25, 1, max_rate=0.5)
+RateLimiter.instance().setRate("www.weibo.com", 0.25, 1, max_rate=0.5)
+
+
+# url router
+# Every supported url is classified by one regex match of its host and one of its path,
+# routes of each host are tried in order and first match wins.
+# A route is (path regex, kind, ParentChild, canonical url template, key id template),
+# templates are filled with ids (named groups) of path regex.
+
+class UrlRoute:
+    """Result of routeUrl(), everything known about a url without any network request"""
+    
+    __slots__ = ("url", "webpic_type", "parent_child", "kind", "canonical_url", "ids", "key")
+    
+    # constructor
+    def __init__(self, url: str, webpic_type: WebPicType, parent_child: ParentChild, kind: str, canonical_url: str, ids: dict, key: tuple = None):
+        self.url = url
+        self.webpic_type = webpic_type
+        self.parent_child = parent_child
+        self.kind = kind
+        self.canonical_url = canonical_url
+        self.ids = ids
+        # (site, kind, id), same for all urls of one artwork/post/user
+        self.key = key if key != None else (WebPicType2Str(webpic_type), kind, url)
+
+_URL_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?//(?:[^@/?#]*@)?(?P<host>[^/?#:]+)(?::\d+)?(?P<path>[^?#]*)(?:\?(?P<query>[^#]*))?")
+
+_TWITTER_RESERVED = r"(?!(?:i|home|search|explore|settings|notifications|messages|hashtag|intent|share)(?:/|$))"
+
+# status canonical url is built from status_id alone, so every form of a tweet shares one ResultCache entry
+_TWITTER_ROUTES = (WebPicType.TWITTER, [
+    (re.compile(r"^/i/web/status(?:es)?/(?P<status_id>\d+)"), "status", ParentChild.CHILD, "https://twitter.com/i/web/status/{status_id}", "{status_id}"),
+    (re.compile(r"^/" + _TWITTER_RESERVED + r"(?P<screen_name>\w+)/status(?:es)?/(?P<status_id>\d+)"), "status", ParentChild.CHILD, "https://twitter.com/i/web/status/{status_id}", "{status_id}"),
+    (re.compile(r"^/" + _TWITTER_RESERVED + r"(?P<screen_name>\w+)(?:/(?:media|with_replies)?)?/?(?:\?|$)"), "user", ParentChild.PARENT, "https://twitter.com/{screen_name}", "{screen_name_lower}"),
+])
+
+def _moebooruRoutes(domain: str, webpic_type: WebPicType) -> tuple:
+    # yande.re & konachan.com share same url layout
+    return (webpic_type, [
+        (re.compile(r"^/post/show/(?P<post_id>\d+)"), "post", ParentChild.CHILD, "https://" + domain + "/post/show/{post_id}", "{post_id}"),
+        (re.compile(r"^/pool/show/(?P<pool_id>\d+)"), "pool", ParentChild.PARENT, "https://" + domain + "/pool/show/{pool_id}", "{pool_id}"),
+        (re.compile(r"^/post/?(?:\?|$)"), "search", ParentChild.PARENT, "https://" + domain + "/post{query}", "{tags}"),
+    ])
+
+_URL_ROUTES = {
+    "pixiv.net": (WebPicType.PIXIV, [
+        (re.compile(r"^/(?:[a-z]{2}/)?artworks/(?P<pid>\d+)"), "illust", ParentChild.CHILD, "https://www.pixiv.net/artworks/{pid}", "{pid}"),
+        (re.compile(r"^/member_illust\.php\?(?:.*&)?illust_id=(?P<pid>\d+)"), "illust", ParentChild.CHILD, "https://www.pixiv.net/artworks/{pid}", "{pid}"),
+        (re.compile(r"^/(?:[a-z]{2}/)?users/(?P<pid>\d+)"), "user", ParentChild.PARENT, "https://www.pixiv.net/users/{pid}", "{pid}"),
+        (re.compile(r"^/member(?:_illust)?\.php\?(?:.*&)?id=(?P<pid>\d+)"), "user", ParentChild.PARENT, "https://www.pixiv.net/users/{pid}", "{pid}"),
+    ]),
+    "pximg.net": (WebPicType.PIXIV, [
+        (re.compile(r"/(?P<pid>\d+)_(?:p\d+|ugoira|master)"), "illust", ParentChild.CHILD, "https://www.pixiv.net/artworks/{pid}", "{pid}"),
+    ]),
+    "twitter.com": _TWITTER_ROUTES,
+    "x.com": _TWITTER_ROUTES,
+    "twimg.com": (WebPicType.TWITTER, [
+        # media urls do not tell their status, they can only be deduplicated between each other
+        (re.compile(r"^/media/(?P<media_id>[\w-]+)"), "media", ParentChild.UNKNOWN, "https://pbs.twimg.com/media/{media_id}", "{media_id}"),
+    ]),
+    "danbooru.donmai.us": (WebPicType.DANBOORU, [
+        (re.compile(r"^/posts/(?P<post_id>\d+)"), "post", ParentChild.CHILD, "https://danbooru.donmai.us/posts/{post_id}", "{post_id}"),
+        (re.compile(r"^/pools/(?P<pool_id>\d+)"), "pool", ParentChild.PARENT, "https://danbooru.donmai.us/pools/{pool_id}", "{pool_id}"),
+        (re.compile(r"^/(?:posts)?/?(?:\?|$)"), "search", ParentChild.PARENT, "https://danbooru.donmai.us/posts{query}", "{tags}"),
+    ]),
+    "yande.re": _moebooruRoutes("yande.re", WebPicType.YANDERE),
+    "konachan.com": _moebooruRoutes("konachan.com", WebPicType.KONACHAN),
+    "weibo.cn": (WebPicType.WEIBO, [
+        # numeric id must end there, base62 mids may start with digits too
+        (re.compile(r"^/(?:detail|status)/(?P<status_id>\d+)(?=[/?]|$)"), "status", ParentChild.CHILD, "https://m.weibo.cn/detail/{status_id}", "{status_id}"),
+        (re.compile(r"^/(?:detail|status)/(?P<mid>[0-9a-zA-Z]+)"), "status", ParentChild.CHILD, "https://m.weibo.cn/detail/{status_id}", "{status_id}"),
+        (re.compile(r"^/(?:u|profile)/(?P<user_id>\d+)"), "user", ParentChild.PARENT, "https://m.weibo.cn/u/{user_id}", "{user_id}"),
+    ]),
+    "weibo.com": (WebPicType.WEIBO, [
+        (re.compile(r"^/(?:u/)?(?P<user_id>\d+)/?(?:\?|$)"), "user", ParentChild.PARENT, "https://m.weibo.cn/u/{user_id}", "{user_id}"),
+        (re.compile(r"^/\d+/(?P<mid>[0-9a-zA-Z]{8,10})/?(?:\?|$)"), "status", ParentChild.CHILD, "https://m.weibo.cn/detail/{status_id}", "{status_id}"),
+        # other "www.weibo.com" pages are assumed to be user pages, user_id is in their source
+        (re.compile(r"^/[^/?]+/?(?:\?|$)"), "page", ParentChild.PARENT, None, None),
+    ]),
+    "e-hentai.org": (WebPicType.EHENTAI, [
+        (re.compile(r"^/g/(?P<gallery_id>\d+)/(?P<gallery_token>[0-9a-f]+)"), "gallery", ParentChild.PARENT, "https://e-hentai.org/g/{gallery_id}/{gallery_token}/", "{gallery_id}"),
+        (re.compile(r"^/s/(?P<page_token>[0-9a-f]+)/(?P<gallery_id>\d+)-(?P<page>\d+)"), "picture", ParentChild.CHILD, "https://e-hentai.org/s/{page_token}/{gallery_id}-{page}", "{gallery_id}-{page}"),
+        (re.compile(r"^/"), "search", ParentChild.PARENT, None, None),
+    ]),
+}
+
+_BASE62 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def _weiboMid2Id(mid: str) -> str:
+    # weibo base62 mid encodes status id by 7 digits per 4 characters, from the end
+    output = ""
+    end = len(mid)
+    while end > 0:
+        start = max(end - 4, 0)
+        num = 0
+        for c in mid[start:end]:
+            num = num * 62 + _BASE62.index(c)
+        output = (str(num).zfill(7) if start > 0 else str(num)) + output
+        end = start
+    return output
+
+def _routeUrl(url: str) -> UrlRoute:
+    # split url & find routes of its host, "i.pximg.net" falls back to "pximg.net"
+    m = _URL_RE.match(url.strip())
+    if m is None:
+        return UrlRoute(url, WebPicType.UNKNOWN, ParentChild.UNKNOWN, None, None, {})
+    host = m.group("host").lower()
+    site = _URL_ROUTES.get(host)
+    cur = host.find('.')
+    while site is None and cur != -1:
+        site = _URL_ROUTES.get(host[cur+1:])
+        cur = host.find('.', cur+1)
+    if site is None:
+        return UrlRoute(url, WebPicType.UNKNOWN, ParentChild.UNKNOWN, None, None, {})
+    
+    # match path (with query) against routes of host
+    webpic_type, routes = site
+    path = m.group("path") or "/"
+    query = m.group("query")
+    target = path if query is None else path + '?' + query
+    for regex, kind, parent_child, canonical, key_id in routes:
+        found = regex.search(target)
+        if found is None:
+            continue
+        ids = found.groupdict()
+        if "mid" in ids: # base62 weibo status id
+            ids["status_id"] = _weiboMid2Id(ids["mid"])
+        if kind == "search" and canonical != None: # keep search tags of booru sites
+            tags = urllib.parse.parse_qs(query or "").get("tags", [""])[0].strip()
+            ids["tags"] = tags
+            canonical_url = canonical.format(query=("?tags=" + urllib.parse.quote_plus(tags)) if len(tags) > 0 else "")
+        elif canonical != None:
+            canonical_url = canonical.format(**ids)
+        else: # url is already canonical
+            canonical_url = url
+        # screen names are case insensitive
+        key_ids = dict(ids, screen_name_lower=ids.get("screen_name", "").lower())
+        key = (WebPicType2Str(webpic_type), kind, key_id.format(**key_ids) if key_id != None else canonical_url)
+        return UrlRoute(url, webpic_type, parent_child, kind, canonical_url, ids, key)
+    return UrlRoute(url, webpic_type, ParentChild.UNKNOWN, None, url, {})
+
+@lru_cache(maxsize=4096)
+def routeUrl(url: str) -> UrlRoute:
+    """
+    Classify a url without any network request, return UrlRoute with its
+    WebPicType, ParentChild, kind (e.g. "illust", "status", "post", "gallery"),
+    canonical url, ids parsed from url (e.g. pid, status_id, post_id, gallery_id & gallery_token)
+    and key (site, kind, id). Results are cached, do not modify them.
+    """
+    return _routeUrl(url)
+
+def routeUrls(urls):
+    """Classify many urls offline, yield UrlRoute of each url in order (results are not cached)"""
+    for url in urls:
+        yield _routeUrl(url)
+
+def canonicalUrl(url: str) -> str:
+    """Get canonical form of a url (e.g. pximg.net & /en/artworks/ urls become https://www.pixiv.net/artworks/{pid}), None if unsupported"""
+    return routeUrl(url).canonical_url
+
+def canonicalKey(url: str) -> tuple:
+    """Get (site, kind, id) of a url, it is same for all forms of one artwork/post/user"""
+    return routeUrl(url).key
+
+def groupUrls(urls) -> dict:
+    """Group urls by canonicalKey() offline, return dict of key: list of urls, keys keep order of their first url"""
+    output = {}
+    for route in routeUrls(urls):
+        if route.key not in output:
+            output[route.key] = []
+        output[route.key].append(route.url)
+    return output
+
+def dedupeUrls(urls, canonical: bool = False) -> list:
+    """Remove urls pointing to same artwork/post/user offline, keep first url of each (or its canonical url)"""
+    output = []
+    for key, group in groupUrls(urls).items():
+        route = routeUrl(group[0])
+        output.append(route.canonical_url if canonical and route.canonical_url != None else group[0])
+    return output
+
+# snapshots
+# A snapshot is a dict of plain data fields of ArtistInfo or a WebPic object (keyed by field name
+# without "__"), it can be restored without any I/O. Fields with other types (api handles, locks,
+# UrlRoute) are not saved, they are recreated by constructor. Bump SNAPSHOT_SCHEMA_VERSION when
+# meaning of saved fields changes.
+
+SNAPSHOT_SCHEMA_VERSION = 1
+
+@lru_cache(maxsize=None)
+def _snapshotFields(cls: type) -> tuple:
+    # (field name, mangled attribute name, type) of plain data fields of cls & its bases
+    output = []
+    for attr, typ in typing.get_type_hints(cls).items():
+        if attr.startswith('_') and "__" in attr and (typ in (str, int, bool, tuple, WebPicType, ParentChild, WebPicField) or typ is ArtistInfo):
+            output.append((attr.split("__", 1)[1], attr, typ))
+    return tuple(output)
+
+def _snapshotValue(value):
+    if isinstance(value, tuple):
+        return list(value)
+    elif isinstance(value, ArtistInfo):
+        return value.toDict()
+    elif isinstance(value, (IntEnum, IntFlag)):
+        return int(value)
+    return value
+
+def _restoreValue(name: str, typ: type, value):
+    if value is None:
+        return None
+    elif typ is tuple:
+        return internTags(value) if name == "tags" else tuple(value)
+    elif typ is ArtistInfo:
+        return ArtistInfo.fromDict(value)
+    elif typ in (WebPicType, ParentChild, WebPicField):
+        return typ(value)
+    return value
+
+def _checkSnapshot(snapshot: dict) -> None:
+    if not isinstance(snapshot, dict) or "url" not in snapshot or "webpic_type" not in snapshot:
+        raise ValueError("Invalid snapshot.")
+    if snapshot.get("schema_version", 0) > SNAPSHOT_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported snapshot schema version: {snapshot.get('schema_version')}")
+
+# artist cache
+# Analyzed artist info is shared by all WebPic objects as ArtistInfo snapshots keyed by
+# (WebPicType, artist url), so posts of the same artist only fetch that artist once.
+# Snapshots are kept in memory by a MemoCache, and are also persisted in ResultCache
+# under site ARTIST_RESULT_SITE if it is enabled.
+
+ARTIST_RESULT_SITE = "artist"
+_ARTIST_CACHE = MemoCache(ttl=3600.0, max_entries=4096)
+
+def getArtistCache() -> MemoCache:
+    """Get in-memory cache of artist info snapshots"""
+    return _ARTIST_CACHE
+
+def setArtistCache(ttl: float = None, max_entries: int = None) -> None:
+    """Set TTL in seconds & max entries of in-memory artist cache"""
+    if ttl is not None:
+        _ARTIST_CACHE.setTTL(ttl)
+    if max_entries is not None:
+        _ARTIST_CACHE.setMaxEntries(max_entries)
+
+def _artistResultKey(webpic_type: WebPicType, url: str) -> str:
+    # prefixed, so it never collides with canonical url of a WebPic (e.g. a twitter user page)
+    return f"artist:{WebPicType2Str(webpic_type)}:{url}"
+
+def _getArtist(webpic_type: WebPicType, url: str, analyze) -> dict:
+    # single-flight, concurrent analyses of one artist wait for the first one instead of fetching it again.
+    # analyze() is only called if artist is neither in memory nor in ResultCache, it returns a snapshot
+    def loader() -> dict:
+        cache = ResultCache.instance()
+        snapshot = None
+        if cache.isEnabled():
+            snapshot = cache.lookup(_artistResultKey(webpic_type, url), ARTIST_RESULT_SITE)
+        if snapshot is None:
+            snapshot = analyze()
+            if cache.isEnabled():
+                cache.store(_artistResultKey(webpic_type, url), ARTIST_RESULT_SITE, snapshot)
+        return snapshot
+    return _ARTIST_CACHE.get((webpic_type, url), loader)
+
+
 class ArtistInfo:
     """Process & Hold Artist Information"""
     
     # private variables
-    __artist_names: list = []
-    __pixiv_urls: list = []
-    __twitter_urls: list = []
+    __slots__ = ("__webpic_type", "__url", "__artist_names", "__pixiv_urls", "__twitter_urls", "__analyzed", "__lock")
+    __webpic_type: WebPicType
+    __url: str
+    __artist_names: tuple
+    __pixiv_urls: tuple
+    __twitter_urls: tuple
+    __analyzed: bool
+    __lock: threading.Lock
     
     # constructor
-    def __init__(self, webpic_type: WebPicType, url: str):
+    def __init__(self, webpic_type: WebPicType, url: str, analyze: bool = True):
+        """
+        Set analyze to False to skip analysis, artist info will be analyzed on first access
+        of getters, or drive analyzeIO() by yourself
+        """
+        self.__artist_names = ()
+        self.__pixiv_urls = ()
+        self.__twitter_urls = ()
+        self.__analyzed = False
+        self.__webpic_type = webpic_type
+        self.__url = url
+        self.__lock = threading.Lock()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def resolve(self) -> None:
+        """Analyze artist info if it has not been analyzed"""
+        if self.__analyzed:
+            return
+        with self.__lock:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze artist info as generator (see IORequest), does nothing if already analyzed"""
+        if self.__analyzed:
+            return None
+        webpic_type = self.__webpic_type
+        url = self.__url
+        # e-hentai artist info is parsed from url without any request, nothing to share
+        if webpic_type not in (WebPicType.EHENTAI, WebPicType.UNKNOWN):
+            # shared loader blocks while waiting for or running analysis, run it as a call
+            snapshot = yield ioCall(_getArtist, webpic_type, url, lambda: runIO(self.__analyzeInfoIO(webpic_type, url)))
+            self.__loadDict(snapshot)
+            self.__analyzed = True
+            return None
+        yield from self.__analyzeInfoIO(webpic_type, url)
+        self.__analyzed = True
+    
+    # clear obj
+    def clear(self) -> None:
+        self.__artist_names = ()
+        self.__pixiv_urls = ()
+        self.__twitter_urls = ()
+    
+    # private helper function
+    def __analyzeInfoIO(self, webpic_type: WebPicType, url: str):
+        """analyze artist info of url into current obj, return its snapshot"""
         if webpic_type == WebPicType.PIXIV:
-            self.__analyzeInfo_pixiv(url)
+            yield from self.__analyzeInfo_pixiv(url)
         elif webpic_type == WebPicType.TWITTER:
-            self.__analyzeInfo_twitter(url)
+            yield from self.__analyzeInfo_twitter(url)
         elif webpic_type == WebPicType.DANBOORU:
-            self.__analyzeInfo_danbooru(url)
+            yield from self.__analyzeInfo_danbooru(url)
         elif webpic_type == WebPicType.YANDERE:
-            self.__analyzeInfo_yandere(url)
+            yield from self.__analyzeInfo_moebooru(url, YandereAPI.instance())
         elif webpic_type == WebPicType.KONACHAN:
-            self.__analyzeInfo_konachan(url)
+            yield from self.__analyzeInfo_moebooru(url, KonachanAPI.instance())
         elif webpic_type == WebPicType.WEIBO:
-            self.__analyzeInfo_weibo(url)
+            yield from self.__analyzeInfo_weibo(url)
         elif webpic_type == WebPicType.EHENTAI:
             self.__analyzeInfo_ehentai(url)
-        else: # Unknown
-            return None
-    
-    # clear obj
-    def clear(self) -> None:
-        self.__artist_names.clear()
-        self.__pixiv_urls.clear()
-        self.__twitter_urls.clear()
+        return self.toDict()
     
     # getters
-    def getArtistNames(self) -> list:
+    def getArtistNames(self) -> tuple:
+        self.resolve()
         return self.__artist_names
         
-    def getUrl_pixiv(self) -> list:
+    def getUrl_pixiv(self) -> tuple:
+        self.resolve()
         return self.__pixiv_urls
     
-    def getUrl_twitter(self) -> list:
+    def getUrl_twitter(self) -> tuple:
+        self.resolve()
         return self.__twitter_urls
     
+    def isAnalyzed(self) -> bool:
+        return self.__analyzed
+    
+    # snapshots
+    def toDict(self) -> dict:
+        """Get a snapshot of current obj as dict of plain data"""
+        output = {"schema_version": SNAPSHOT_SCHEMA_VERSION}
+        for name, attr, typ in _snapshotFields(ArtistInfo):
+            output[name] = _snapshotValue(getattr(self, attr, None))
+        return output
+    
+    @classmethod
+    def fromDict(cls, snapshot: dict):
+        """Restore ArtistInfo from toDict() snapshot without any I/O"""
+        _checkSnapshot(snapshot)
+        obj = ArtistInfo(WebPicType(snapshot["webpic_type"]), snapshot["url"], analyze=False)
+        obj.__loadDict(snapshot)
+        return obj
+    
     # helper functions
+    def __loadDict(self, snapshot: dict) -> None:
+        for name, attr, typ in _snapshotFields(ArtistInfo):
+            if name in snapshot:
+                setattr(self, attr, _restoreValue(name, typ, snapshot[name]))
+    
     def __analyzeInfo_pixiv(self, url: str):
         # get uid from url
         uid = url[url.rfind('/')+1:]
         
         # setup api instance
-        api: PixivAPI = PixivAPI.instance()
+        api: PixivAPI = yield ioCall(PixivAPI.instance)
         
         # get user_res as python dict
-        user_res = api.getUserDetail(uid)
+        user_res = yield ioCall(api.getUserDetail, uid)
         
         # set artist name
-        self.__artist_names.append(user_res["user"]["name"])
+        self.__artist_names += (user_res["user"]["name"],)
         
         # set artist pixiv url
-        self.__pixiv_urls.append("https://pixiv.net/users/"+str(user_res["user"]["id"]))
+        self.__pixiv_urls += ("https://pixiv.net/users/"+str(user_res["user"]["id"]),)
         
         # set artist twitter url (if has one)
         possible_url = user_res["profile"]["twitter_url"]
         # user has twitter url in profile section
         if possible_url != None and len(possible_url) > 0:
-            self.__twitter_urls.append(possible_url)
+            self.__twitter_urls += (possible_url,)
         else: # try to find twitter url from comment
             possible_url = str(user_res["user"]["comment"])
             cur = possible_url.find("twitter.com/")
@@ -245,7 +619,7 @@ class ArtistInfo:
                         break
                 
                 if cur2 <= len(possible_url):
-                    self.__twitter_urls.append("https://twitter.com/" + possible_url[cur:cur2])
+                    self.__twitter_urls += ("https://twitter.com/" + possible_url[cur:cur2],)
     
     def __analyzeInfo_twitter(self, url: str):
         # get screen_name from url
@@ -254,14 +628,14 @@ class ArtistInfo:
         screen_name = parse2[1]
         
         # setup api instance
-        api: TwitterAPI = TwitterAPI.instance()
+        api: TwitterAPI = yield ioCall(TwitterAPI.instance)
         
         # get user_res as python dict
-        user_res = api.getUserJson(screen_name=screen_name)
+        user_res = yield ioCall(api.getUserJson, screen_name=screen_name)
         
         # set artist name
-        self.__artist_names.append(user_res["name"])
-        self.__artist_names.append(user_res["screen_name"])
+        self.__artist_names += (user_res["name"],)
+        self.__artist_names += (user_res["screen_name"],)
         
         # set artist pixiv url (if has one)
         # get all urls existing urls
@@ -292,152 +666,90 @@ class ArtistInfo:
         final_urls: list = []
         for loc_url in urls_founded:
             try:
-                req = requests.get(loc_url)
-                final_urls.append(req.url)
+                final_urls.append((yield ioResolveUrl(loc_url)))
             except Exception as err:
                 pass
         final_urls = rmListDuplication(final_urls)
         # search through all urls and finding pixiv id
         for loc_url in final_urls:
             if "pixiv.net/users/" in loc_url:
-                self.__pixiv_urls.append(loc_url)
+                self.__pixiv_urls += (loc_url,)
             elif ".fanbox.cc" in loc_url:
-                randDelay(1.0, 2.5)
-                src = getUrlSrc(loc_url)
+                src = yield ioUrlSrc(loc_url)
                 cur = src.find("fanbox/public/images/creator/")
                 if cur == -1:
                     break
                 cur += 29
-                self.__pixiv_urls.append("https://pixiv.net/users/"+src[cur:src.find("/cover", cur)])
+                self.__pixiv_urls += ("https://pixiv.net/users/"+src[cur:src.find("/cover", cur)],)
         
         # set artist twitter url
-        self.__twitter_urls.append(url)
+        self.__twitter_urls += (url,)
     
     def __analyzeInfo_danbooru(self, url: str):
-        cur = 0
-        
-        # get url source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(url)
+        # artist url is either ".../artists/show_or_new?name=xxx" or ".../artists/{id}"
+        parse1 = urllib.parse.urlparse(url)
+        query = urllib.parse.parse_qs(parse1.query)
+        dirs = parse1.path.strip('/').split('/')
+        
+        # get artist json
+        api: DanbooruAPI = DanbooruAPI.instance()
+        artist = None
+        if "name" in query:
+            artist = yield from api.getArtistIO(name=query["name"][0])
+            if artist == None: # artist without artist entry, only have a tag
+                self.__artist_names += (query["name"][0],)
+                return None
+        elif len(dirs) >= 2 and dirs[-1].isnumeric():
+            artist = yield from api.getArtistIO(artist_id=int(dirs[-1]))
+        if artist == None:
+            return None
         
         # finding artist names
-        cur = src.find("Other Names")
-        if cur != -1:
-            names_src = src[cur:src.find("/li", cur)]
-            cur = 0
-            while cur != -1:
-                cur = names_src.find("artist-other-name", cur)
-                if cur == -1:
-                    break
-                cur = names_src.find("any_name_matches%5D=", cur) + 20
-                tmp_str = names_src[cur:names_src.find('\"', cur)]
-                self.__artist_names.append(urllib.parse.unquote(tmp_str))
-                cur += 3
-        else:
-            cur = src.find("og:title\" content=\"") + 19
-            self.__artist_names.append(src[cur:src.find(" | Artist Profile", cur)])
+        self.__artist_names += (artist["name"],)
+        for name in artist.get("other_names", []):
+            if name not in self.__artist_names:
+                self.__artist_names += (name,)
         
         # finding pixiv & twitter url
-        tmp_url = ""
-        had_pixiv = False
-        had_twitter = False
-        cur = src.find("list-bulleted")
-        url_src = src[cur:src.find("/ul", cur)]
-        cur = 0
-        while cur != -1:
-            cur = url_src.find("href=\"", cur)
-            if cur == -1:
-                break
-            cur += 6
-            tmp_url = url_src[cur:url_src.find('\"', cur)]
+        for item in artist.get("urls", []):
+            tmp_url = item["url"] if isinstance(item, dict) else str(item)
             # checking url
             if ("pixiv.net/member.php?id=" in tmp_url or
                 "pixiv.net/users/" in tmp_url):
-                self.__pixiv_urls.append(tmp_url)
+                self.__pixiv_urls += (tmp_url,)
             elif "twitter.com/" in tmp_url:
                 tmp_str = tmp_url[tmp_url.find("twitter.com/")+12:]
                 if '/' not in tmp_str and '?' not in tmp_str:
-                    self.__twitter_urls.append(tmp_url)
+                    self.__twitter_urls += (tmp_url,)
     
-    def __analyzeInfo_yandere(self, url: str):
+    def __analyzeInfo_moebooru(self, url: str, api: MoebooruAPI):
         # get 1st name from url
-        tmp_name = url[url.find("title=")+6:]
-        self.__artist_names.append(urllib.parse.unquote(tmp_name))
-        
-        # get wiki page source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(url)
-        
-        # get urls
-        cur = 0
-        tmp_url = ""
-        while cur != -1:
-            cur = src.find("<th>URL</th>", cur)
-            if cur == -1:
-                break
-            cur = src.find("href=\"", cur) + 6
-            tmp_url = src[cur:src.find('\"', cur)]
-            # checking url
-            if ("pixiv.net/member.php?id=" in tmp_url or
-                "pixiv.net/users/" in tmp_url):
-                self.__pixiv_urls.append(tmp_url)
-            elif "twitter.com/" in tmp_url:
-                tmp_str = tmp_url[tmp_url.find("twitter.com/")+12:]
-                if '/' not in tmp_str and '?' not in tmp_str:
-                    self.__twitter_urls.append(tmp_url)
-                
-        # get artist names
-        cur = src.find("<th>Aliases</th>")
-        tmp_str = src[cur:src.find("</tr>", cur)]
-        cur = 0
-        while cur != -1:
-            cur = tmp_str.find("/wiki/show?title=", cur)
-            if cur == -1:
+        tmp_name = urllib.parse.unquote(url[url.find("title=")+6:])
+        self.__artist_names += (tmp_name,)
+        
+        # get artist json, aliases are artists whose alias_id is id of this artist
+        artists = yield from api.getArtistsIO(tmp_name)
+        artist = None
+        for item in artists:
+            if item.get("name", None) == tmp_name:
+                artist = item
                 break
-            cur += 17
-            self.__artist_names.append(
-                urllib.parse.unquote(tmp_str[cur:tmp_str.find('\"', cur)])
-            )
-    
-    def __analyzeInfo_konachan(self, url: str):
-        # get 1st name from url
-        tmp_name = url[url.find("title=")+6:]
-        self.__artist_names.append(urllib.parse.unquote(tmp_name))
-        
-        # get wiki page source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(url)
+        if artist == None:
+            return None
+        for item in artists:
+            if item.get("alias_id", None) == artist["id"] and item["name"] not in self.__artist_names:
+                self.__artist_names += (item["name"],)
         
         # get urls
-        cur = 0
-        tmp_url = ""
-        while cur != -1:
-            cur = src.find("<th>URL</th>", cur)
-            if cur == -1:
-                break
-            cur = src.find("href=\"", cur) + 6
-            tmp_url = src[cur:src.find('\"', cur)]
+        for tmp_url in artist.get("urls", None) or []:
             # checking url
             if ("pixiv.net/member.php?id=" in tmp_url or
                 "pixiv.net/users/" in tmp_url):
-                self.__pixiv_urls.append(tmp_url)
+                self.__pixiv_urls += (tmp_url,)
             elif "twitter.com/" in tmp_url:
                 tmp_str = tmp_url[tmp_url.find("twitter.com/")+12:]
                 if '/' not in tmp_str and '?' not in tmp_str:
-                    self.__twitter_urls.append(tmp_url)
-                
-        # get artist names
-        cur = src.find("<th>Aliases</th>")
-        tmp_str = src[cur:src.find("</tr>", cur)]
-        cur = 0
-        while cur != -1:
-            cur = tmp_str.find("/wiki/show?title=", cur)
-            if cur == -1:
-                break
-            cur += 17
-            self.__artist_names.append(
-                urllib.parse.unquote(tmp_str[cur:tmp_str.find('\"', cur)])
-            )
+                    self.__twitter_urls += (tmp_url,)
     
     def __analyzeInfo_weibo(self, url: str):
         # get user_id from url
@@ -448,8 +760,7 @@ class ArtistInfo:
         # get j_dict
         j_dict = {}
         try:
-            randDelay(2.5, 5.0)
-            j_dict = getUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&value={user_id}&containerid=100505{user_id}")
+            j_dict = yield ioUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&value={user_id}&containerid=100505{user_id}")
             if j_dict["ok"] != 1:
                 raise ValueError("Unable to fetch json data from weibo")
         except Exception as err:
@@ -466,7 +777,7 @@ class ArtistInfo:
                 desc_str[cur2] == '?' or
                 desc_str[cur2] == '/'):
                 cur2 += 1
-            self.__pixiv_urls.append("https://www." + desc_str[cur1:cur2])
+            self.__pixiv_urls += ("https://www." + desc_str[cur1:cur2],)
         elif "twitter.com" in desc_str:
             cur1 = desc_str.find("twitter.com")
             cur2 = cur1 + 9
@@ -476,14 +787,14 @@ class ArtistInfo:
                 desc_str[cur2] == '?' or
                 desc_str[cur2] == '/'):
                 cur2 += 1
-            self.__twitter_urls.append("https://www." + desc_str[cur1:cur2])
+            self.__twitter_urls += ("https://www." + desc_str[cur1:cur2],)
         
         # get artist names
-        self.__artist_names.append(j_dict["data"]["userInfo"]["screen_name"])
+        self.__artist_names += (j_dict["data"]["userInfo"]["screen_name"],)
         
     def __analyzeInfo_ehentai(self, json_str: str):
         """Takes a list of artists names in json string"""
-        self.__artist_names = json.loads(json_str)
+        self.__artist_names = tuple(json.loads(json_str))
         # assume e-hentai does not have pixiv & twitter url
     
 
@@ -492,31 +803,19 @@ class WebPic:
     """Online Picture/Wallpaper website template class"""
     
     # private variables
-    __url: str = ""
-    __webpic_type: WebPicType = WebPicType.UNKNOWN
+    __slots__ = ("__url", "__webpic_type", "__fields", "__route")
+    __url: str
+    __webpic_type: WebPicType
+    __fields: WebPicField
+    __route: UrlRoute
     
     # constructor
-    def __init__(self, url: str):
+    def __init__(self, url: str, fields: WebPicField = WebPicField.ALL):
         self.__url = url
+        self.__fields = WebPicField(fields)
         # identify __webpic_type
-        p = urllib.parse.urlparse(self.getUrl())
-        netloc = p.netloc
-        if "pixiv.net" in p.netloc:
-            self.__webpic_type = WebPicType.PIXIV
-        elif "twitter.com" in p.netloc or "twimg.com" in p.netloc:
-            self.__webpic_type = WebPicType.TWITTER
-        elif "danbooru.donmai.us" in p.netloc:
-            self.__webpic_type = WebPicType.DANBOORU
-        elif "yande.re" in p.netloc:
-            self.__webpic_type = WebPicType.YANDERE
-        elif "konachan.com" in p.netloc:
-            self.__webpic_type = WebPicType.KONACHAN
-        elif "weibo.c" in p.netloc:
-            self.__webpic_type = WebPicType.WEIBO
-        elif "e-hentai.org" in p.netloc:
-            self.__webpic_type = WebPicType.EHENTAI
-        else: # Unknown
-            self.__webpic_type = WebPicType.UNKNOWN
+        self.__route = routeUrl(url)
+        self.__webpic_type = self.__route.webpic_type
     
     # clear obj
     def clear(self) -> None:
@@ -529,83 +828,197 @@ class WebPic:
     
     def getWebPicType(self) -> WebPicType:
         return self.__webpic_type
+    
+    def getFields(self) -> WebPicField:
+        """Get fields analyzed up front"""
+        return self.__fields
+    
+    def getRoute(self) -> UrlRoute:
+        """Get UrlRoute of url, it has ParentChild status & ids parsed from url"""
+        return self.__route
+    
+    # snapshots
+    def toDict(self) -> dict:
+        """Get a snapshot of current obj as dict of plain data, lazy fields that are not resolved yet stay lazy"""
+        output = {"schema_version": SNAPSHOT_SCHEMA_VERSION}
+        for name, attr, typ in _snapshotFields(type(self)):
+            output[name] = _snapshotValue(getattr(self, attr, None))
+        return output
+    
+    @classmethod
+    def fromDict(cls, snapshot: dict):
+        """
+        Restore WebPic object from toDict() snapshot without any I/O.
+        WebPic.fromDict() returns object of the WebPic derived class of snapshot.
+        """
+        _checkSnapshot(snapshot)
+        webpic_class = WebPicType2Class(WebPicType(snapshot["webpic_type"]))
+        if webpic_class is None or not issubclass(webpic_class, cls):
+            raise ValueError(f"Snapshot is not a {cls.__name__}.")
+        obj = webpic_class(snapshot["url"], analyze=False, fields=snapshot.get("fields", WebPicField.ALL))
+        for name, attr, typ in _snapshotFields(webpic_class):
+            if name in snapshot:
+                setattr(obj, attr, _restoreValue(name, typ, snapshot[name]))
+        return obj
+    
+    def toSnapshot(self, format: str = "json"):
+        """Serialize toDict() snapshot as json string, or as msgpack bytes with format="msgpack" (needs msgpack)"""
+        if format == "json":
+            return json.dumps(self.toDict(), ensure_ascii=False)
+        elif format == "msgpack":
+            import msgpack # optional dependency, only needed for msgpack snapshots
+            return msgpack.packb(self.toDict(), use_bin_type=True)
+        raise ValueError(f"Unsupported snapshot format: {format}")
+    
+    @classmethod
+    def fromSnapshot(cls, data):
+        """Restore WebPic object from toSnapshot() output without any I/O, bytes are read as msgpack and str as json"""
+        if isinstance(data, (bytes, bytearray)):
+            import msgpack # optional dependency, only needed for msgpack snapshots
+            return cls.fromDict(msgpack.unpackb(data, raw=False))
+        return cls.fromDict(json.loads(data))
+    
+    # children urls
+    # derived classes implement childrenPageIO(cursor, limit) as generator (see IORequest)
+    # that returns (urls, next_cursor) of one page, cursor is None for first page
+    # and next_cursor is None after last page. limit is number of urls still wanted (-1 means no limit)
+    def getChildrenUrls(self, max_num: int = 30) -> list:
+        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
+        return runIO(self.getChildrenUrlsIO(max_num))
+    
+    def getChildrenUrlsIO(self, max_num: int = 30):
+        """Get children urls as generator (see IORequest)"""
+        output = []
+        
+        # only process if current obj is parent
+        if not self.isParent():
+            return output
+        
+        cursor = None
+        while max_num < 0 or len(output) < max_num:
+            urls, cursor = yield from self.childrenPageIO(cursor, max_num - len(output) if max_num >= 0 else -1)
+            output += urls
+            if cursor is None: # reaches end of pages
+                break
+        return output[:max_num] if max_num >= 0 else output
+    
+    def iterChildrenUrls(self, max_num: int = -1, prefetch: bool = True):
+        """
+        Yield children urls of a parent page by page until reaches max_num (-1 means no limit).
+        With prefetch, next page is fetched in background while current page is being consumed,
+        page requests are still paced by RateLimiter of the site.
+        """
+        
+        # only process if current obj is parent, and nothing is wanted from max_num 0
+        if not self.isParent() or max_num == 0:
+            return
+        
+        count = 0
+        executor = ThreadPoolExecutor(max_workers=1)
+        fetchPage = lambda cursor, limit: runIO(self.childrenPageIO(cursor, limit))
+        try:
+            page = executor.submit(fetchPage, None, max_num)
+            while page is not None:
+                urls, cursor = page.result()
+                if max_num >= 0:
+                    urls = urls[:max_num-count]
+                count += len(urls)
+                limit = max_num - count if max_num >= 0 else -1
+                has_next = cursor is not None and limit != 0
+                
+                # fetch next page while caller consumes current page
+                page = None
+                if has_next and prefetch:
+                    page = executor.submit(fetchPage, cursor, limit)
+                for url in urls:
+                    yield url
+                if has_next and not prefetch:
+                    page = executor.submit(fetchPage, cursor, limit)
+        finally:
+            # caller may stop early, do not wait for an unused prefetch
+            executor.shutdown(wait=False)
 
 
 class PixivPic(WebPic):
     """handle artist identifications & downloading for pixiv"""
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__api")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
     
     # api handles
-    __api: PixivAPI = None
+    __api: PixivAPI
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(PixivPic, self).__init__(url)
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(PixivPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__api = None
         # input url isn't a pixiv url
         if WebPicTypeMatch(self.getWebPicType(), WebPicType.PIXIV) == False:
             raise ValueError("Wrong url input. Input url must be under domain of \"pixiv.net\".")
-        self.__api: PixivAPI = PixivAPI.instance()
-        self.__analyzeUrl()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & WebPicField.ARTIST and self.__artist_info != None:
+            yield from self.__artist_info.analyzeIO()
     
     # clear obj
     def clear(self) -> None:
         super(PixivPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
         self.__api = None
     
     # private helper function
     def __analyzeUrl(self):
-        cur = 0
-        url = self.getUrl()
         j_dict = {}
         pid = 0
+        self.__api: PixivAPI = yield ioCall(PixivAPI.instance)
         
         # determine ParentChild status & grab pid
-        if "/users/" in url:
-            self.__parent_child = ParentChild.PARENT
-            cur = url.rfind('/')+1
-            pid = int(url[cur:findFirstNonNum(url, cur)])
-        elif "/member.php" in url:
-            self.__parent_child = ParentChild.PARENT
-            cur = url.find("member.php?id=") + 14
-            pid = int(url[cur:findFirstNonNum(url, cur)])
-        elif "/artworks/" in url:
-            self.__parent_child = ParentChild.CHILD
-            cur = url.rfind('/')+1
-            pid = int(url[cur:findFirstNonNum(url, cur)])
-        elif "/member_illust.php" in url:
-            self.__parent_child = ParentChild.CHILD
-            cur = url.find("member_illust.php?id=") + 21
-            pid = int(url[cur:findFirstNonNum(url, cur)])
-        elif "pximg.net/" in url:
-            self.__parent_child = ParentChild.CHILD
-            parse1 = urllib.parse.urlparse(url)
-            parse2 = ntpath.split(parse1.path)
-            cur = parse2[1].find('/')
-            pid = int(parse2[1][cur:parse2[1].rfind("_p")])
-        else:
-            self.__parent_child = ParentChild.UNKNOWN
+        route = self.getRoute()
+        self.__parent_child = route.parent_child
+        if "pid" in route.ids:
+            pid = int(route.ids["pid"])
         
         # check for bad url
         if self.isChild():
-            j_dict = self.__api.getIllustDetail(pid)
+            j_dict = yield ioCall(self.__api.getIllustDetail, pid)
         elif self.isParent():
-            j_dict = self.__api.getUserDetail(pid)
+            j_dict = yield ioCall(self.__api.getUserDetail, pid)
         else:
             raise ValueError(f"Cannot determine parent child state base on url: {self.getUrl()}")
         if "error" in j_dict:
@@ -618,47 +1031,52 @@ class PixivPic(WebPic):
         if self.isChild():
             # find parent
             parent_pid = j_dict["illust"]["user"]["id"]
-            tmp_dict = self.__api.getUserDetail(parent_pid)
+            tmp_dict = {}
+            if self.getFields() & WebPicField.ARTIST:
+                tmp_dict = yield ioCall(self.__api.getUserDetail, parent_pid)
             if "error" not in tmp_dict:
                 self.__has_artist_flag = True
                 tmp_str = "https://pixiv.net/users/" + str(parent_pid)
-                self.__artist_info = ArtistInfo(WebPicType.PIXIV, tmp_str)
+                self.__artist_info = ArtistInfo(WebPicType.PIXIV, tmp_str, analyze=False)
         elif self.isParent():
             self.__has_artist_flag = True
             tmp_str = "https://pixiv.net/users/" + str(pid)
-            self.__artist_info = ArtistInfo(WebPicType.PIXIV, tmp_str)
+            self.__artist_info = ArtistInfo(WebPicType.PIXIV, tmp_str, analyze=False)
         
         if self.isChild():
             # finding file_url & filename
             single_ori_url = j_dict["illust"]["meta_single_page"]
             if single_ori_url != None and len(single_ori_url) > 0:
-                self.__file_url.append(single_ori_url["original_image_url"])
+                self.__file_url += (single_ori_url["original_image_url"],)
                 parse1 = urllib.parse.urlparse(self.__file_url[-1])
                 parse2 = ntpath.split(parse1.path)
-                self.__filename.append(parse2[1])
+                self.__filename += (parse2[1],)
             else:
                 for img in j_dict["illust"]["meta_pages"]:
-                    self.__file_url.append(img["image_urls"]["original"])
+                    self.__file_url += (img["image_urls"]["original"],)
                     parse1 = urllib.parse.urlparse(self.__file_url[-1])
                     parse2 = ntpath.split(parse1.path)
-                    self.__filename.append(parse2[1])
+                    self.__filename += (parse2[1],)
                 
             # get tags
             for item in j_dict["illust"]["tags"]:
-                self.__tags.append(space2lowline(item["name"]))
-                self.__tags.append(space2lowline(item["translated_name"]))
+                self.__tags += (sys.intern(space2lowline(item["name"])),)
+                self.__tags += (sys.intern(space2lowline(item["translated_name"])),)
         
         # finding src_url
         if self.isChild():
             self.__src_url = "https://pixiv.net/artworks/" + str(j_dict["illust"]["id"])
         elif self.isParent():
-            self.__src_url = self.__artist_info.getUrl_pixiv()
+            self.__src_url = ["https://pixiv.net/users/" + str(pid)]
+        
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
     
     # getters 
-    def getFileUrl(self) -> list:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> list:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
@@ -670,7 +1088,7 @@ class PixivPic(WebPic):
     def getArtistInfo(self) -> ArtistInfo:
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
         return self.__tags
     
     def isParent(self) -> bool:
@@ -682,7 +1100,13 @@ class PixivPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = os.path.curdir):
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             for url in self.__file_url:
                 path = ""
@@ -695,98 +1119,121 @@ class PixivPic(WebPic):
                         path = os.path.curdir
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                self.__api.downloadIllust(url=url, path=path)
+                # pximg.net rejects requests without pixiv referer
+                stats.append((yield ioDownload(url, path, headers={"Referer": "https://app-api.pixiv.net/"})))
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
-        if not self.isParent():
-            return []
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """Get one page of children urls as generator (see IORequest), return (urls, next_cursor)"""
         
         # get user illustration list
+        yield from self.__artist_info.analyzeIO()
         tmp_str = self.__artist_info.getUrl_pixiv()[0]
         pid = int(tmp_str[tmp_str.rfind('/')+1:])
         
-        # get all illustrations of this user
-        j_list = self.__api.getUserIllustList(pid, max_num)
-        counter = 0
+        # get one page of illustrations of this user, cursor is offset of page
+        if self.__api == None: # restored from snapshot
+            self.__api: PixivAPI = yield ioCall(PixivAPI.instance)
+        j_dict = yield ioCall(self.__api.getUserIllustPage, pid, cursor)
         output = []
         
         # generate artwork urls
-        for item in j_list:
+        for item in j_dict["illusts"]:
             output.append("https://pixiv.net/artworks/"+str(item["id"]))
         
-        return output
-
+        # find offset of next page
+        next_cursor = None
+        if j_dict.get("next_url") != None:
+            next_cursor = self.__api.api().parse_qs(j_dict["next_url"])["offset"]
+        return (output, next_cursor)
 
 class TwitterPic(WebPic):
     """handle artist identifications & downloading for twitter"""
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__api")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
     
     # api handles
-    __api: TwitterAPI = None
+    __api: TwitterAPI
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(TwitterPic, self).__init__(url)
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(TwitterPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__api = None
         # input url isn't a pixiv url
         if WebPicTypeMatch(self.getWebPicType(), WebPicType.TWITTER) == False:
             raise ValueError("Wrong url input. Input url must be under domain of \"twitter.com\".")
-        self.__api: TwitterAPI = TwitterAPI.instance()
-        self.__analyzeUrl()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & WebPicField.ARTIST and self.__artist_info != None:
+            yield from self.__artist_info.analyzeIO()
     
     # clear obj
     def clear(self) -> None:
         super(TwitterPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
         self.__api = None
     
     # private helper function
     def __analyzeUrl(self):
-        cur = 0
         url = self.getUrl()
         j_dict = {}
         screen_name = ""
         status_id = ""
         
+        self.__api: TwitterAPI = yield ioCall(TwitterAPI.instance)
+        
         # determine ParentChild status & grab screen_name, status_id
-        parse1 = urllib.parse.urlparse(url)
-        cur = parse1.path.find("/status/")
-        if cur != -1: # found /status/ in url
-            self.__parent_child = ParentChild.CHILD
-            screen_name = parse1.path[1:cur]
-            status_id = parse1.path[cur+8:]
-        elif cur == -1: # not found /status in url
-            self.__parent_child = ParentChild.PARENT
-            screen_name = parse1.path[1:]
-        else:
-            self.__parent_child = ParentChild.UNKNOWN
+        route = self.getRoute()
+        self.__parent_child = route.parent_child
+        screen_name = route.ids.get("screen_name", None) or ""
+        status_id = route.ids.get("status_id", None) or ""
         if len(screen_name) <= 0 and len(status_id) <= 0:
             raise ValueError(f"Unable to determine ParentChild base on URL{url}.")
         
         # check for bad url
         try:
             if self.isChild():
-                j_dict = self.__api.getStatusJson(status_id=status_id)
+                j_dict = yield ioCall(self.__api.getStatusJson, status_id=status_id)
                 screen_name = j_dict["user"]["screen_name"]
             elif self.isParent():
-                j_dict = self.__api.getUserJson(screen_name=screen_name)
+                j_dict = yield ioCall(self.__api.getUserJson, screen_name=screen_name)
             else:
                 raise ValueError(f"Unable to fetch data from URL{url}")
         except Exception as err:
@@ -796,44 +1243,43 @@ class TwitterPic(WebPic):
         # whether has artist & init ArtistInfo
         tmp_str = ""
         if self.isChild():
-            try:
-                self.__api.getUserJson(screen_name=screen_name)
-            except Exception as err:
-                raise err
             self.__has_artist_flag = True
             tmp_str = "https://twitter.com/" + screen_name
-            self.__artist_info = ArtistInfo(WebPicType.TWITTER, tmp_str)
+            self.__artist_info = ArtistInfo(WebPicType.TWITTER, tmp_str, analyze=False)
         elif self.isParent():
             self.__has_artist_flag = True
             tmp_str = "https://twitter.com/" + screen_name
-            self.__artist_info = ArtistInfo(WebPicType.TWITTER, tmp_str)
+            self.__artist_info = ArtistInfo(WebPicType.TWITTER, tmp_str, analyze=False)
         
         if self.isChild():
             # finding file_url & filename
             if "extended_entities" in j_dict and "media" in j_dict["extended_entities"]:
                 for media in j_dict["extended_entities"]["media"]:
                     if len(media["media_url"]) > 0:
-                        self.__file_url.append(media["media_url"])
+                        self.__file_url += (media["media_url"],)
                         parse1 = urllib.parse.urlparse(self.__file_url[-1])
                         parse2 = ntpath.split(parse1.path)
-                        self.__filename.append(parse2[1])
+                        self.__filename += (parse2[1],)
             
             # get tags
-            self.__tags.append(space2lowline(screen_name))
+            self.__tags += (sys.intern(space2lowline(screen_name)),)
             for item in j_dict["entities"]["hashtags"]:
-                self.__tags.append(item["text"])
+                self.__tags += (sys.intern(item["text"]),)
         
         # finding src_url
         if self.isChild():
             self.__src_url = "https://twitter.com/" + screen_name + "/status/" + status_id
         elif self.isParent():
             self.__src_url = "https://twitter.com/" + screen_name
+        
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
     
     # getters 
-    def getFileUrl(self) -> list:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> list:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
@@ -845,7 +1291,7 @@ class TwitterPic(WebPic):
     def getArtistInfo(self) -> ArtistInfo:
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
         return self.__tags
     
     def isParent(self) -> bool:
@@ -857,7 +1303,13 @@ class TwitterPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = os.path.curdir):
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             count = 0
             for url, filename in zip(self.__file_url, self.__filename):
@@ -878,135 +1330,175 @@ class TwitterPic(WebPic):
                         name += f"_{count}.jpg"
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                downloadUrl(url+":orig", path+name)
+                stats.append((yield ioDownload(url+":orig", path+name)))
                 count += 1
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
-        if not self.isParent():
-            return []
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """Get one page of children urls as generator (see IORequest), return (urls, next_cursor)"""
         
         # get user illustration list
-        tmp_str = self.__artist_info.getUrl_twitter()[0]
-        
-        # get all illustrations of this user
-        j_list = self.__api.getUserTimeline(screen_name=self.__artist_info.getArtistNames()[1], count=max_num)
-        counter = 0
+        yield from self.__artist_info.analyzeIO()
+        screen_name = self.__artist_info.getArtistNames()[1]
+        
+        # one timeline page of 200 tweets per request, cursor is max_id of next older page
+        # only tweets with media are children, twitter api keeps about 3200 most recent tweets
+        if self.__api == None: # restored from snapshot
+            self.__api: TwitterAPI = yield ioCall(TwitterAPI.instance)
+        j_list, next_cursor = yield ioCall(self.__api.getUserTimelinePage, screen_name=screen_name, max_id=cursor, media_only=True)
         output = []
         for stat in j_list:
             output.append(
                 "https://twitter.com/" +
-                self.__artist_info.getArtistNames()[1] +
+                screen_name +
                 "/status/" + stat["id_str"])
-            if counter >= max_num:
-                break
-            counter += 1
         
-        return output
-
+        return (output, next_cursor)
 
 class DanbooruPic(WebPic):
     """handle artist identifications & downloading for danbooru"""
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__search_tags", "__api")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
+    __search_tags: str
+    
+    # api handles
+    __api: DanbooruAPI
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(DanbooruPic, self).__init__(url)
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(DanbooruPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__search_tags = ""
+        self.__api = None
         # input url is not a danbooru url
         if WebPicTypeMatch(self.getWebPicType(), WebPicType.DANBOORU) == False:
             raise ValueError("Wrong url input. Input url must be under domain of \"danbooru.donmai.us\".")
-        self.__analyzeUrl()
+        self.__api: DanbooruAPI = DanbooruAPI.instance()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & WebPicField.ARTIST and self.__artist_info != None:
+            yield from self.__artist_info.analyzeIO()
     
     # clear obj
     def clear(self) -> None:
         super(DanbooruPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
+        self.__search_tags = ""
     
     # private helper function
     def __analyzeUrl(self):
-        # determine ParentChild
-        cur = self.getUrl().find("/posts") + 6
-        
         # determine ParentChild status
-        if cur == -1:
-            self.__parent_child = ParentChild.UNKNOWN
-        elif self.getUrl()[cur] == '/':
-            self.__parent_child = ParentChild.CHILD
-        else:
-            self.__parent_child = ParentChild.PARENT
-        
-        # get url source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(self.getUrl())
-        
-        # whether has artist
+        # posts:    https://danbooru.donmai.us/posts/{id}
+        # searches: https://danbooru.donmai.us/posts?tags=xxx or https://danbooru.donmai.us/
+        # pools:    https://danbooru.donmai.us/pools/{id}
+        route = self.getRoute()
+        self.__parent_child = route.parent_child
+        if route.kind == "search":
+            self.__search_tags = route.ids["tags"]
+        elif route.kind == "pool":
+            self.__search_tags = "ordpool:" + route.ids["pool_id"]
+        elif route.kind != "post":
+            raise ValueError(f"Unsupported danbooru url: {self.getUrl()}")
+        
+        artist_name = None
         if self.isChild():
-            cur = src.find("artist-tag-list")
-            if cur != -1:
-                cur = src.find("class=\"wiki-link\"", cur)
+            # get post json
+            post = yield from self.__api.getPostIO(int(route.ids["post_id"]))
+            
+            # finding file_url & filename
+            if post.get("file_url", None) != None:
+                self.__file_url += (post["file_url"],)
+                parse2 = ntpath.split(urllib.parse.urlparse(post["file_url"]).path)
+                self.__filename += (parse2[1],)
+            
+            # finding src_url, prefer normalized pixiv url
+            if post.get("pixiv_id", None) != None:
+                self.__src_url = "https://www.pixiv.net/artworks/" + str(post["pixiv_id"])
+            elif str(post.get("source", "")).startswith("http"):
+                src_route = routeUrl(post["source"])
+                self.__src_url = src_route.canonical_url if src_route.parent_child != ParentChild.UNKNOWN else post["source"]
+            
+            # get tags
+            self.__tags = internTags(post.get("tag_string", "").split())
+            
+            # whether has artist
+            artists = post.get("tag_string_artist", "").split()
+            if len(artists) > 0:
+                artist_name = artists[0]
+        
         elif self.isParent():
-            cur = src.find("artist-excerpt-link")
+            # sample first posts of search for tags & artist
+            posts = yield from self.__api.getPostsIO(
+                self.__search_tags, limit=20, only="id,tag_string,tag_string_artist"
+            )
+            search_tags = self.__search_tags.split()
+            counter = Counter()
+            post_artists = set()
+            for post in posts:
+                counter.update(post.get("tag_string", "").split())
+                post_artists.update(post.get("tag_string_artist", "").split())
+            
+            # get tags
+            self.__tags = internTags(search_tags + [t for t, _ in counter.most_common(25) if t not in search_tags])
+            
+            # whether has artist, search is an artist search if one of its tags is an artist tag
+            for tag in search_tags:
+                if tag in post_artists:
+                    artist_name = tag
+                    break
+        
         # found artist
-        if cur != -1:
-            cur = src.find("href=\"", cur) + 6
-            tmp_url = src[cur:src.find('\"', cur)]
-            tmp_url = "https://" + WebPicType2DomainStr(self.getWebPicType()) + tmp_url
+        if artist_name != None:
+            tmp_url = "https://" + WebPicType2DomainStr(self.getWebPicType()) + "/artists/show_or_new?name=" + urllib.parse.quote(artist_name)
             # has artist
             self.__has_artist_flag = True
             # initialize ArtistInfo
-            self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_url)
-        
-        # finding file_url & filename
-        cur = src.find("post-info-size")
-        if cur != -1: # found file_url
-            cur = src.find("href=\"", cur) + 6
-            # set file url
-            self.__file_url.append(src[cur:src.find('\"', cur)])
-            # set filename
-            parse1 = urllib.parse.urlparse(self.__file_url[-1])
-            parse2 = ntpath.split(parse1.path)
-            self.__filename.append(parse2[1])
+            self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_url, analyze=False)
         
-        # finding src_url
-        cur = src.find("post-info-source", cur)
-        if cur != -1: # found source
-            cur = src.find("href=\"", cur) + 6
-            # set src_url
-            self.__src_url = src[cur:src.find('\"', cur)]
-        
-        # get tags
-        cur = 0
-        while cur > -1:
-            cur = src.find("data-tag-name=\"", cur)
-            if cur < 0:
-                break
-            cur += 15
-            tmp = src[cur:src.find('\"', cur)]
-            self.__tags.append(tmp)
-            cur += 3
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
     
     # getters 
-    def getFileUrl(self) -> list:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> list:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
@@ -1018,7 +1510,7 @@ class DanbooruPic(WebPic):
     def getArtistInfo(self) -> ArtistInfo:
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
         return self.__tags
     
     def isParent(self) -> bool:
@@ -1030,7 +1522,13 @@ class DanbooruPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = None) -> None:
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             count = 0
             for url, filename in zip(self.__file_url, self.__filename):
@@ -1051,492 +1549,227 @@ class DanbooruPic(WebPic):
                         name += f"_{count}.jpg"
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                downloadUrl(url, path+name)
+                stats.append((yield ioDownload(url, path+name)))
                 count += 1
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """
+        Get one page of children urls as generator (see IORequest), return (urls, next_cursor)
+        Posts are paged with "b{post_id}" cursors, except ordered searches which only support page numbers.
+        """
         if not self.isParent():
-            return []
+            return ([], None)
+        page_limit = self.__api.getPageLimit()
+        ordered = any(
+            tag.startswith(("order:", "ordpool:", "ordfav:", "random:"))
+            for tag in self.__search_tags.split()
+        )
+        if ordered:
+            page = cursor if cursor != None else 1
+            count = page_limit
+        else:
+            page = cursor
+            count = min(limit, page_limit) if limit > 0 else page_limit
         
-        counter = 0
-        # process url
-        url = self.getUrl()
-        parse1 = urllib.parse.urlparse(url)
-        if parse1.query == None:
-            url += "?page=#"
-        elif "page=" not in parse1.query: # no page indicator
-            url += "&page=#"
-        else: # "page=" in parse1.query
-            cur = url.find("page=")
-            cur2 = findFirstNonNum(url, cur+5)
-            url = url.replace(url[cur:cur2], "page=#")
-        
-        # fetching urls
+        # get one page of post ids
+        posts = yield from self.__api.getPostsIO(self.__search_tags, limit=count, page=page, only="id")
+        
+        # build post url w/ post id
         output = []
-        page_count = 1
-        while counter != max_num:
-            # generate url for current page
-            loc_url = url.replace("page=#", f"page={page_count}")
-            page_count += 1
-            
-            # get url source
-            randDelay(1.0, 2.5)
-            src = getUrlSrc(url)
-            cur = 0
-            if "data-id" not in src: # reaches end of pages
-                break
-            
-            # find post id from src & build post url w/ it
-            while cur != -1:
-                cur = src.find("data-id=\"", cur)
-                if cur == -1:
-                    break
-                cur += 9
-                post_id = src[cur:src.find('\"', cur)]
-                output.append("https://"+WebPicType2DomainStr(WebPicType.DANBOORU)+"/posts/"+post_id)
-                counter += 1
-                if counter == max_num:
-                    return output
-            
-        return output
+        for post in posts:
+            output.append("https://"+WebPicType2DomainStr(WebPicType.DANBOORU)+"/posts/"+str(post["id"]))
+        
+        # reaches end of pages
+        if len(posts) < count:
+            return (output, None)
+        if ordered:
+            return (output, page + 1)
+        return (output, f"b{posts[-1]['id']}")
 
-
-class YanderePic(WebPic):
-    """handle artist identifications & downloading for yande.re"""
+class MoebooruPic(WebPic):
+    """
+    handle artist identifications & downloading for moebooru sites through their json api,
+    YanderePic & KonachanPic are configurations of it
+    """
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__search_tags", "__pool_id", "__api")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
+    __search_tags: str
+    __pool_id: int
+    
+    # api handles
+    __api: MoebooruAPI
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(YanderePic, self).__init__(url)
-        # input url is not a yandere url
-        if WebPicTypeMatch(self.getWebPicType(), WebPicType.YANDERE) == False:
-            raise ValueError("Wrong url input. Input url must be under domain of \"yande.re\".")
-        self.__analyzeUrl()
+    def __init__(self, url: str, webpic_type: WebPicType, api: MoebooruAPI, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(MoebooruPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__search_tags = ""
+        self.__pool_id = None
+        self.__api = None
+        # input url is not a url of this site
+        if WebPicTypeMatch(self.getWebPicType(), webpic_type) == False:
+            raise ValueError(f"Wrong url input. Input url must be under domain of \"{WebPicType2DomainStr(webpic_type)}\".")
+        self.__api: MoebooruAPI = api
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & WebPicField.ARTIST and self.__artist_info != None:
+            yield from self.__artist_info.analyzeIO()
     
     # clear obj
     def clear(self) -> None:
-        super(YanderePic, self).clear()
+        super(MoebooruPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
+        self.__search_tags = ""
+        self.__pool_id = None
     
     # private helper function
     def __analyzeUrl(self):
-        # determine ParentChild
-        cur = self.getUrl().find("/post/show/")
-        
-        # determine ParentChild stcatus
-        if cur != -1: # found pattern
-            self.__parent_child = ParentChild.CHILD
-        elif "/post" in self.getUrl() or "/pool" in self.getUrl():
-            self.__parent_child = ParentChild.PARENT
+        # determine ParentChild status
+        # posts:    https://yande.re/post/show/{id}
+        # searches: https://yande.re/post?tags=xxx
+        # pools:    https://yande.re/pool/show/{id}
+        route = self.getRoute()
+        self.__parent_child = route.parent_child
+        if route.kind == "post":
+            self.__search_tags = "id:" + route.ids["post_id"]
+        elif route.kind == "search":
+            self.__search_tags = route.ids["tags"]
+        elif route.kind == "pool":
+            self.__pool_id = int(route.ids["pool_id"])
+            self.__search_tags = "pool:" + route.ids["pool_id"]
         else:
-            self.__parent_child = ParentChild.UNKNOWN
-        
-        # get url source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(self.getUrl())
-        
-        # get json data
-        j_dict = {}
-        tmp_str = "["
-        cur = 0
-        while cur != -1:
-            cur = src.find("Post.register", cur)
-            if cur == -1:
-                break
-            cur = src.find('(', cur) + 1
-            tmp_str += src[cur:src.find('\n', cur)]
-            tmp_str = tmp_str[:tmp_str.rfind(')')] + ','
-        if len(tmp_str) > 1:
-            tmp_str = tmp_str[:-1] + ']'
-            j_dict = json.loads(tmp_str)
-        else: # bad url
             raise ValueError(f"Cannot process url: {self.getUrl()}")
         
-        # whether has artist
-        tmp_str = ""
-        tmp_dict = {}
-        if "tags" in j_dict[0]:
-            tmp_dict = j_dict[0]["tags"]
-        elif self.isParent():
-            tmp_dict = j_dict[0]
-        # found artist name
-        for k, v in tmp_dict.items():
-            if v == "artist":
-                tmp_str = k
-                break
-        # get artist info
-        if len(tmp_str) > 0:
-            # generate artist wiki page
-            tmp_str = "https://" + WebPicType2DomainStr(WebPicType.YANDERE) + "/wiki/show?title=" + tmp_str
-            # has artist
-            self.__has_artist_flag = True
-            # initialize ArtistInfo
-            self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str)
+        # get posts json with types of their tags
+        # child only needs its post, parent samples first posts for tags & artist
+        result = yield from self.__api.getPostsIO(
+            self.__search_tags, limit=(1 if self.isChild() else 20), include_tags=True
+        )
+        posts = result["posts"]
+        tag_types = result["tags"]
+        artist_name = None
         
         if self.isChild():
+            if len(posts) <= 0: # bad url
+                raise ValueError(f"Cannot process url: {self.getUrl()}")
+            post = posts[0]
+            
             # finding file_url & filename
             
             # set file url
-            self.__file_url.append(j_dict[0]["posts"][0]["file_url"])
+            self.__file_url += (post["file_url"],)
             # set filename
             parse1 = urllib.parse.urlparse(self.__file_url[-1])
             parse2 = ntpath.split(parse1.path)
-            self.__filename.append(parse2[1])
+            self.__filename += (parse2[1],)
             
-            # finding src_url
-            tmp_str = str(j_dict[0]["posts"][0]["source"])
-            parse1 = urllib.parse.urlparse(tmp_str)
-            if DomainStr2WebPicType(parse1.netloc) == WebPicType.PIXIV:
-                # use pixiv id for pixiv source
-                # handle new url
-                cur = tmp_str.find("pixiv.net/artworks/")
-                if cur != -1: 
-                    self.__src_url = tmp_str
-                # handle new url with /en/
-                cur = tmp_str.find("pixiv.net/en/artworks/")
-                if cur != -1:
-                    parse2 = ntpath.split(parse1.path)
-                    pid = parse2[1]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                # handle old page url
-                cur = tmp_str.find("illust_id=")
-                if cur != -1: 
-                    cur += 10
-                    loc_cur = cur
-                    for i in range(len(tmp_str)-cur):
-                        loc_cur += i
-                        if loc_cur >= len(tmp_str) or tmp_str[loc_cur].isalpha():
-                            break
-                    pid = tmp_str[cur:loc_cur]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                # handle raw img url
-                cur = tmp_str.find("pximg.net")
-                if cur != -1: 
-                    parse2 = ntpath.split(parse1.path)
-                    pid = parse2[1]
-                    pid = pid[:pid.find('_')]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                pass
-            elif len(parse1.netloc) > 0: # twitter and other
+            # finding src_url, use canonical url for pixiv source
+            tmp_str = str(post.get("source", ""))
+            src_route = routeUrl(tmp_str)
+            if src_route.webpic_type == WebPicType.PIXIV:
+                if src_route.kind == "illust":
+                    self.__src_url = src_route.canonical_url
+            elif src_route.parent_child != ParentChild.UNKNOWN: # twitter and other supported sites
+                self.__src_url = src_route.canonical_url
+            elif len(urllib.parse.urlparse(tmp_str).netloc) > 0:
                 self.__src_url = tmp_str
-        
-        # get tags
-        tmp_dict = {}
-        if self.isChild():
-            tmp_dict = j_dict[0]["tags"]
-        elif self.isParent():
-            tmp_dict = j_dict[0]
-        for k, v in tmp_dict.items():
-            self.__tags.append(k)
-    
-    
-    # getters 
-    def getFileUrl(self) -> list:
-        return self.__file_url
-    
-    def getFileName(self) -> list:
-        return self.__filename
-    
-    def getSrcUrl(self) -> str:
-        return self.__src_url
-    
-    def hasArtist(self) -> bool:
-        return self.__has_artist_flag
-    
-    def getArtistInfo(self) -> ArtistInfo:
-        return self.__artist_info
-    
-    def getTags(self) -> list:
-        return self.__tags
-    
-    def isParent(self) -> bool:
-        return bool(self.__parent_child == ParentChild.PARENT)
-    
-    def isChild(self) -> bool:
-        return bool(self.__parent_child == ParentChild.CHILD)
-    
-    def getParentChildStatus(self) -> ParentChild:
-        return self.__parent_child
-    
-    def downloadPic(self, dest_filepath = None) -> None:
-        if self.isChild():
-            count = 0
-            for url, filename in zip(self.__file_url, self.__filename):
-                path = ""
-                name = ""
-                if os.path.isdir(dest_filepath): # dest_filepath is all path without filename
-                    path = dest_filepath
-                    name = filename
-                else: # dest_filepath is a path to file or is invalid
-                    # assume dest_filepath is a path to file
-                    path, name = ntpath.split(dest_filepath)
-                    if not os.path.isdir(path): # not specify path, assume dest_filepath is filename
-                        path = os.path.curdir
-                    # add number indicator to the end of specified filename
-                    if '.' in name: # filename has extension
-                        name.replace('.', f"_{count}.", 1)
-                    else: # filename does not has extension
-                        name += f"_{count}.jpg"
-                if path[-1] != '/' or path[-1] != '\\':
-                    path += '/'
-                downloadUrl(url, path+name)
-                count += 1
-    
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
-        if not self.isParent():
-            return []
-        
-        # process url
-        url = self.getUrl()
-        parse1 = urllib.parse.urlparse(url)
-        if parse1.query == None:
-            url += "?page=#"
-        elif "page=" not in parse1.query: # no page indicator
-            url += "&page=#"
-        else: # "page=" in parse1.query
-            cur = url.find("page=")
-            cur2 = findFirstNonNum(url, cur+5)
-            url = url.replace(url[cur:cur2], "page=#")
-        
-        counter = 0
-        page_count = 1
-        last_post_id = 0
-        output = []
-        while counter != max_num:
-            # generate loc_url
-            loc_url = url.replace("page=#", f"page={page_count}")
-            page_count += 1
             
-            # get url source
-            randDelay(1.0, 2.5)
-            src = getUrlSrc(loc_url)
+            # get tags
+            self.__tags = internTags(post.get("tags", "").split())
             
-            # get json data
-            j_dict = {}
-            tmp_str = "["
-            cur = 0
-            # ignore bad url from pool
-            if "/pool" in self.getUrl() and "var thumb = $(\"hover-thumb\");" in src:
-                return 
-            while cur != -1:
-                cur = src.find("Post.register", cur)
-                if cur == -1:
+            # whether has artist
+            for tag in self.__tags:
+                if tag_types.get(tag, None) == "artist":
+                    artist_name = tag
                     break
-                cur = src.find('(', cur) + 1
-                tmp_str += src[cur:src.find('\n', cur)]
-                tmp_str = tmp_str[:tmp_str.rfind(')')] + ','
-            if len(tmp_str) > 1:
-                tmp_str = tmp_str[:-1] + ']'
-                j_dict = json.loads(tmp_str)
-            else: # bad url
-                return []
+        
+        elif self.isParent():
+            # skip metatags (e.g. "rating:s", "order:score")
+            search_tags = [
+                t for t in self.__search_tags.split()
+                if t.split(':')[0] not in ("id", "pool", "order", "rating", "user", "vote", "score", "md5", "source", "date", "parent", "width", "height", "mpixels", "holds")
+            ]
+            counter = Counter()
+            post_artists = set()
+            for post in posts:
+                post_tags = post.get("tags", "").split()
+                counter.update(post_tags)
+                post_artists.update(t for t in post_tags if tag_types.get(t, None) == "artist")
             
-            # make sure we didn't reaches end of pages
-            if "/post" in loc_url and len(j_dict[0]) == 0:
-                break # reaches end of page
-            elif "/pool/" in loc_url and j_dict[0]["posts"] == None:
-                break # reaches end of page
-            elif "/pool/" in loc_url:
-                for item in j_dict[0]["posts"]:
-                    if last_post_id == item["id"]:
-                        return output
+            # get tags
+            self.__tags = internTags(search_tags + [t for t, _ in counter.most_common(25) if t not in search_tags])
             
-            # find post id from j_dict & build post url w/ it
-            if len(j_dict) == 1 and "/pool/" in loc_url: # current parent is like "/pool/show/"
-                for item in j_dict[0]["posts"]:
-                    post_id = str(item["id"])
-                    output.append("https://"+WebPicType2DomainStr(WebPicType.YANDERE)+"/post/show/"+post_id)
-                    counter += 1
-                    last_post_id = item["id"]
-                    if counter == max_num:
-                        return output
-            elif len(j_dict) > 1 and "/post" in loc_url: # current parent is like "/post?tags="
-                for item in j_dict[1:]:
-                    post_id = str(item["id"])
-                    output.append("https://"+WebPicType2DomainStr(WebPicType.YANDERE)+"/post/show/"+post_id)
-                    counter += 1
-                    last_post_id = item["id"]
-                    if counter == max_num:
-                        return output
-            if counter == max_num:
-                return output
-        
-        return output
-
-
-class KonachanPic(WebPic):
-    """handle artist identifications & downloading for konachan"""
-    
-    # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
-    
-    # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(KonachanPic, self).__init__(url)
-        # input url is not a konachan url
-        if WebPicTypeMatch(self.getWebPicType(), WebPicType.KONACHAN) == False:
-            raise ValueError("Wrong url input. Input url must be under domain of \"konachan\".")
-        self.__analyzeUrl()
-    
-    # clear obj
-    def clear(self) -> None:
-        super(KonachanPic, self).clear()
-        self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
-        self.__src_url = 0
-        self.__has_artist_flag = False
-        if self.__artist_info != None:
-            self.__artist_info.clear()
-        self.__tags.clear()
-    
-    # private helper function
-    def __analyzeUrl(self):
-        # determine ParentChild
-        cur = self.getUrl().find("/post/show/")
-        
-        # determine ParentChild status
-        if cur != -1: # found pattern
-            self.__parent_child = ParentChild.CHILD
-        elif "/post" in self.getUrl() or "/pool" in self.getUrl():
-            self.__parent_child = ParentChild.PARENT
-        else:
-            self.__parent_child = ParentChild.UNKNOWN
-        
-        # get url source
-        randDelay(1.0, 2.5)
-        src = getUrlSrc(self.getUrl())
-        
-        # get json data
-        j_dict = {}
-        tmp_str = "["
-        cur = 0
-        # ignore bad url from pool
-        if "/pool" in self.getUrl() and "var thumb = $(\"hover-thumb\");" in src:
-            raise ValueError(f"Bad konachan pool. Url: {self.getUrl()}")
-        while cur != -1:
-            cur = src.find("Post.register", cur)
-            if cur == -1:
-                break
-            cur = src.find('(', cur) + 1
-            tmp_str += src[cur:src.find('\n', cur)]
-            tmp_str = tmp_str[:tmp_str.rfind(')')] + ','
-        if len(tmp_str) > 1:
-            tmp_str = tmp_str[:-1] + ']'
-            j_dict = json.loads(tmp_str)
-        else: # bad url
-            raise ValueError(f"Cannot process url: {self.getUrl()}")
+            # whether has artist
+            # search is an artist search if one of its tags is an artist tag,
+            # look up tags missing in sampled posts with /tag.json
+            for tag in search_tags:
+                if tag not in tag_types:
+                    found = yield from self.__api.getTagsIO(tag)
+                    for item in found:
+                        if item.get("name", None) == tag:
+                            tag_types[tag] = "artist" if item.get("type", None) == 1 else "other"
+                if tag_types.get(tag, None) == "artist":
+                    artist_name = tag
+                    break
+            # otherwise pools or searches drawn by only one artist
+            if artist_name == None and len(post_artists) == 1:
+                artist_name = post_artists.pop()
         
-        # whether has artist
-        tmp_str = ""
-        tmp_dict = {}
-        if "tags" in j_dict[0]:
-            tmp_dict = j_dict[0]["tags"]
-        elif self.isParent():
-            tmp_dict = j_dict[0]
-        # found artist name
-        for k, v in tmp_dict.items():
-            if v == "artist":
-                tmp_str = k
-                break
-        # get artist info
-        if len(tmp_str) > 0:
+        # found artist
+        if artist_name != None:
             # generate artist wiki page
-            tmp_str = "https://" + WebPicType2DomainStr(WebPicType.KONACHAN) + "/wiki/show?title=" + tmp_str
+            tmp_str = "https://" + WebPicType2DomainStr(self.getWebPicType()) + "/wiki/show?title=" + urllib.parse.quote(artist_name)
             # has artist
             self.__has_artist_flag = True
             # initialize ArtistInfo
-            self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str)
+            self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str, analyze=False)
         
-        if self.isChild():
-            # finding file_url & filename
-            
-            # set file url
-            self.__file_url.append(j_dict[0]["posts"][0]["file_url"])
-            # set filename
-            parse1 = urllib.parse.urlparse(self.__file_url[-1])
-            parse2 = ntpath.split(parse1.path)
-            self.__filename.append(parse2[1])
-            
-            # finding src_url
-            tmp_str = str(j_dict[0]["posts"][0]["source"])
-            parse1 = urllib.parse.urlparse(tmp_str)
-            if DomainStr2WebPicType(parse1.netloc) == WebPicType.PIXIV:
-                # use pixiv id for pixiv source
-                # handle new url
-                cur = tmp_str.find("pixiv.net/artworks/")
-                if cur != -1: 
-                    self.__src_url = tmp_str
-                # handle new url with /en/
-                cur = tmp_str.find("pixiv.net/en/artworks/")
-                if cur != -1:
-                    parse2 = ntpath.split(parse1.path)
-                    pid = parse2[1]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                # handle old page url
-                cur = tmp_str.find("illust_id=")
-                if cur != -1: 
-                    cur += 10
-                    loc_cur = cur
-                    for i in range(len(tmp_str)-cur):
-                        loc_cur += i
-                        if loc_cur >= len(tmp_str) or tmp_str[loc_cur].isalpha():
-                            break
-                    pid = tmp_str[cur:loc_cur]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                # handle raw img url
-                cur = tmp_str.find("pximg.net")
-                if cur != -1: 
-                    parse2 = ntpath.split(parse1.path)
-                    pid = parse2[1]
-                    pid = pid[:pid.find('_')]
-                    self.__src_url = "https://www.pixiv.net/artworks/" + pid
-                pass
-            elif len(parse1.netloc) > 0: # twitter and other
-                self.__src_url = tmp_str
-        
-        # get tags
-        tmp_dict = {}
-        if self.isChild():
-            tmp_dict = j_dict[0]["tags"]
-        elif self.isParent():
-            tmp_dict = j_dict[0]
-        for k, v in tmp_dict.items():
-            self.__tags.append(k)
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
     
     
     # getters 
-    def getFileUrl(self) -> list:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> list:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
@@ -1548,7 +1781,7 @@ class KonachanPic(WebPic):
     def getArtistInfo(self) -> ArtistInfo:
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
         return self.__tags
     
     def isParent(self) -> bool:
@@ -1560,7 +1793,13 @@ class KonachanPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = None) -> None:
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             count = 0
             for url, filename in zip(self.__file_url, self.__filename):
@@ -1581,187 +1820,175 @@ class KonachanPic(WebPic):
                         name += f"_{count}.jpg"
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                downloadUrl(url, path+name)
+                stats.append((yield ioDownload(url, path+name)))
                 count += 1
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """
+        Get one page of children urls as generator (see IORequest), return (urls, next_cursor)
+        Searches are paged by /post.json with up to 1000 posts per page, pools by /pool/show.json.
+        """
         if not self.isParent():
-            return []
-        
-        # process url
-        url = self.getUrl()
-        parse1 = urllib.parse.urlparse(url)
-        if parse1.query == None:
-            url += "?page=#"
-        elif "page=" not in parse1.query: # no page indicator
-            url += "&page=#"
-        else: # "page=" in parse1.query
-            cur = url.find("page=")
-            cur2 = findFirstNonNum(url, cur+5)
-            url = url.replace(url[cur:cur2], "page=#")
-        
-        counter = 0
-        page_count = 1
-        last_post_id = 0
+            return ([], None)
+        
+        if self.__pool_id != None:
+            page_count, last_post_id = cursor if cursor != None else (1, 0)
+            pool = yield from self.__api.getPoolIO(self.__pool_id, page_count)
+            posts = pool["posts"]
+            # server returns last page again after end of pages
+            if len(posts) <= 0 or any(item["id"] == last_post_id for item in posts):
+                return ([], None)
+            next_cursor = (page_count + 1, posts[-1]["id"])
+        else:
+            # keep page size of first page, so page numbers stay aligned
+            if cursor != None:
+                page_count, page_size = cursor
+            else:
+                page_limit = self.__api.getPageLimit()
+                page_count, page_size = 1, (min(limit, page_limit) if limit > 0 else page_limit)
+            posts = yield from self.__api.getPostsIO(self.__search_tags, limit=page_size, page=page_count)
+            next_cursor = (page_count + 1, page_size)
+            if len(posts) < page_size: # reaches end of pages
+                next_cursor = None
+        
+        # build post url w/ post id
         output = []
-        while counter != max_num:
-            # generate loc_url
-            loc_url = url.replace("page=#", f"page={page_count}")
-            page_count += 1
-            
-            # get url source
-            randDelay(1.0, 2.5)
-            src = getUrlSrc(loc_url)
-            
-            # get json data
-            j_dict = {}
-            tmp_str = "["
-            cur = 0
-            # ignore bad url from pool
-            if "/pool" in self.getUrl() and "var thumb = $(\"hover-thumb\");" in src:
-                return 
-            while cur != -1:
-                cur = src.find("Post.register", cur)
-                if cur == -1:
-                    break
-                cur = src.find('(', cur) + 1
-                tmp_str += src[cur:src.find('\n', cur)]
-                tmp_str = tmp_str[:tmp_str.rfind(')')] + ','
-            if len(tmp_str) > 1:
-                tmp_str = tmp_str[:-1] + ']'
-                j_dict = json.loads(tmp_str)
-            else: # bad url
-                return []
-            
-            # make sure we didn't reaches end of pages
-            if "/post" in loc_url and len(j_dict[0]) == 0:
-                break # reaches end of page
-            elif "/pool/" in loc_url and j_dict[0]["posts"] == None:
-                break # reaches end of page
-            elif "/pool/" in loc_url:
-                for item in j_dict[0]["posts"]:
-                    if last_post_id == item["id"]:
-                        return output
-            
-            # find post id from j_dict & build post url w/ it
-            if len(j_dict) == 1 and "/pool/" in loc_url: # current parent is like "/pool/show/"
-                for item in j_dict[0]["posts"]:
-                    post_id = str(item["id"])
-                    last_post_id = item["id"]
-                    output.append("https://"+WebPicType2DomainStr(WebPicType.KONACHAN)+"/post/show/"+post_id)
-                    counter += 1
-                    if counter == max_num:
-                        return output
-            elif len(j_dict) > 1 and "/post" in loc_url: # current parent is like "/post?tags="
-                for item in j_dict[1:]:
-                    post_id = str(item["id"])
-                    last_post_id = item["id"]
-                    output.append("https://"+WebPicType2DomainStr(WebPicType.KONACHAN)+"/post/show/"+post_id)
-                    counter += 1
-                    if counter == max_num:
-                        return output
-            if counter == max_num:
-                return output
-        
-        return output
+        for item in posts:
+            output.append("https://"+WebPicType2DomainStr(self.getWebPicType())+"/post/show/"+str(item["id"]))
+        return (output, next_cursor)
 
+class YanderePic(MoebooruPic):
+    """handle artist identifications & downloading for yande.re"""
+    
+    __slots__ = ()
+    
+    # constructor
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(YanderePic, self).__init__(url, WebPicType.YANDERE, YandereAPI.instance(), analyze, fields)
+
+class KonachanPic(MoebooruPic):
+    """handle artist identifications & downloading for konachan"""
+    
+    __slots__ = ()
+    
+    # constructor
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(KonachanPic, self).__init__(url, WebPicType.KONACHAN, KonachanAPI.instance(), analyze, fields)
 
 class WeiboPic(WebPic):
     """handle artist identifications & downloading for weibo"""
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__user_id")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
+    __user_id: int
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(WeiboPic, self).__init__(url)
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(WeiboPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__user_id = 0
         # input url is not a konachan url
         if WebPicTypeMatch(self.getWebPicType(), WebPicType.WEIBO) == False:
             raise ValueError("Wrong url input. Input url must be under domain of \"weibo\".")
-        self.__analyzeUrl()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & WebPicField.ARTIST and self.__artist_info != None:
+            yield from self.__artist_info.analyzeIO()
     
     # clear obj
     def clear(self) -> None:
         super(WeiboPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
+        self.__user_id = 0
     
     # private helper function
     def __analyzeUrl(self):
         
         # loc var
-        url = self.getUrl()
         user_id = 0
         status_id = 0
         
-        # determine domain type
-        cur = url.find(WebPicType2DomainStr(WebPicType.WEIBO))
-        
-        if cur == -1:
-            # input weibo url is "www.weibo.com" domain
-            # assume input url is parent
-            self.__parent_child = ParentChild.PARENT
-            
+        # determine ParentChild status
+        route = self.getRoute()
+        self.__parent_child = route.parent_child
+        if route.kind == "status":
+            status_id = int(route.ids["status_id"])
+        elif route.kind == "user":
+            user_id = int(route.ids["user_id"])
+        elif route.kind == "page":
+            # input weibo url is a "www.weibo.com" page, assume it is a user page
             # get user_id
-            randDelay(2.5, 5.0)
-            src = getUrlSrc(self.getUrl())
+            src = yield ioUrlSrc(self.getUrl())
             cur = src.find("$CONFIG[\'oid\']=\'")
             if cur != -1:
                 cur += 16
                 user_id = int(src[cur:src.find("\'", cur)])
-            
-        else: # input weibo url is "m.weibo.cn"
-            parse1 = urllib.parse.urlparse(url)
-            parse2 = ntpath.split(parse1.path)
-            
-            # determine ParentChild status for "m.weibo.cn"
-            if "/detail/" in url or "/status/" in url: # found pattern
-                self.__parent_child = ParentChild.CHILD
-                # set status_id
-                status_id = int(parse2[1])
-            elif "/u/" in url:
-                self.__parent_child = ParentChild.PARENT
-                # set user_id
-                user_id = int(parse2[1])
-            else:
-                self.__parent_child = ParentChild.UNKNOWN
+        
+        self.__user_id = user_id
         
         # get json data
         j_dict = {}
         tmp_str = ""
         try:
-            randDelay(2.5, 5.0)
             if self.__parent_child == ParentChild.PARENT:
-                j_dict = getUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&value={user_id}&containerid=100505{user_id}")
+                j_dict = yield ioUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&value={user_id}&containerid=100505{user_id}")
             elif self.__parent_child == ParentChild.CHILD:
-                j_dict = getUrlJson(f"https://m.weibo.cn/statuses/show?id={status_id}")
+                j_dict = yield ioUrlJson(f"https://m.weibo.cn/statuses/show?id={status_id}")
             if j_dict["ok"] != 1:
                 raise ValueError("Unable to fetch json data from weibo")
         except Exception as err:
             raise err
         
         if self.isParent():
-                parse1 = urllib.parse.urlparse(self.getUrl())
-                tmp_str = "https://" + parse1.netloc + parse1.path
+                tmp_str = "https://m.weibo.cn/u/" + str(user_id)
                 # has artist
                 self.__has_artist_flag = True
                 # initialize ArtistInfo
-                self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str)
+                self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str, analyze=False)
         elif self.isChild():
             # whether has artist & get artistInfo
             if "user" in j_dict["data"]:
@@ -1770,30 +1997,33 @@ class WeiboPic(WebPic):
                 # has artist
                 self.__has_artist_flag = True
                 # initialize ArtistInfo
-                self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str)
+                self.__artist_info = ArtistInfo(self.getWebPicType(), tmp_str, analyze=False)
             
             # finding file_url & filename
             for pic in j_dict["data"]["pics"]:
-                self.__file_url.append(pic["large"]["url"])
+                self.__file_url += (pic["large"]["url"],)
                 parse1 = urllib.parse.urlparse(pic["large"]["url"])
                 parse2 = ntpath.split(parse1.path)
-                self.__filename.append(parse2[1])
+                self.__filename += (parse2[1],)
             
             # assume weibo as a source, set src_url
             self.__src_url = "https://m.weibo.cn/status/" + j_dict["data"]["id"]
         
         # get tags
         if self.isParent():
-            self.__tags.append(j_dict["data"]["userInfo"]["screen_name"])
+            self.__tags += (sys.intern(j_dict["data"]["userInfo"]["screen_name"]),)
         elif self.isChild():
-            self.__tags.append(j_dict["data"]["user"]["screen_name"])
+            self.__tags += (sys.intern(j_dict["data"]["user"]["screen_name"]),)
+        
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
     
     
     # getters 
-    def getFileUrl(self) -> str:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> str:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
@@ -1805,7 +2035,7 @@ class WeiboPic(WebPic):
     def getArtistInfo(self) -> ArtistInfo:
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
         return self.__tags
     
     def isParent(self) -> bool:
@@ -1817,7 +2047,13 @@ class WeiboPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = None) -> None:
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             count = 0
             for url, filename in zip(self.__file_url, self.__filename):
@@ -1838,90 +2074,142 @@ class WeiboPic(WebPic):
                         name += f"_{count}.jpg"
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                downloadUrl(url, path+name)
+                stats.append((yield ioDownload(url, path+name)))
                 count += 1
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
-        if not self.isParent():
-            return []
-        
-        # loc var
-        user_id = 0
-        page_count = 1
-        item_count = 0
-        j_dict = {}
-        output = []
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """Get one page of children urls as generator (see IORequest), return (urls, next_cursor)"""
+        page_count = cursor if cursor != None else 1
         
         # get urser_id
-        parse1 = urllib.parse.urlparse(self.getUrl())
-        parse2 = ntpath.split(parse1.path)
-        user_id = int(parse2[1])
+        user_id = self.__user_id
         
-        # getting children urls
-        while item_count < max_num:
-            # get user timeline
-            try:
-                randDelay(2.5, 5.0)
-                j_dict = getUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&page={page_count}&containerid=107603{user_id}")
-                if j_dict["ok"] != 1:
-                    break
-            except Exception as err:
-                raise err
-            
-            # record each status with image
-            for status in j_dict["data"]["cards"]:
-                if ("mblog" in status and
-                    "pics" in status["mblog"] and
-                    len(status["mblog"]["pics"]) > 0
-                    ): # status has image
-                    
-                    output.append("https://m.weibo.cn/status/"+status["mblog"]["id"])
-                    item_count += 1
-                if item_count >= max_num:
-                    break
-            page_count += 1
+        # get user timeline
+        j_dict = yield ioUrlJson(f"https://m.weibo.cn/api/container/getIndex?uid={user_id}&type=uid&page={page_count}&containerid=107603{user_id}")
+        if j_dict["ok"] != 1:
+            return ([], None)
         
-        return output
-
+        # record each status with image
+        output = []
+        for status in j_dict["data"]["cards"]:
+            if ("mblog" in status and
+                "pics" in status["mblog"] and
+                len(status["mblog"]["pics"]) > 0
+                ): # status has image
+                
+                output.append("https://m.weibo.cn/status/"+status["mblog"]["id"])
+        
+        if len(j_dict["data"]["cards"]) <= 0: # reaches end of pages
+            return (output, None)
+        return (output, page_count + 1)
 
 class EHentaiPic(WebPic):
     """handle artist identifications & downloading for e-hentai"""
     
     # private variables
-    __parent_child: ParentChild = ParentChild.UNKNOWN
-    __file_url: list = []
-    __filename: list = []
-    __src_url: str = ""
-    __has_artist_flag: bool = False
-    __artist_info: ArtistInfo = None
-    __tags: list = []
+    __slots__ = ("__parent_child", "__file_url", "__filename", "__src_url", "__has_artist_flag", "__artist_info", "__tags", "__gallery_analyzed", "__api")
+    __parent_child: ParentChild
+    __file_url: tuple
+    __filename: tuple
+    __src_url: str
+    __has_artist_flag: bool
+    __artist_info: ArtistInfo
+    __tags: tuple
+    __gallery_analyzed: bool
     
     # api handles
-    __api: EHentaiAPI = None
+    __api: EHentaiAPI
     
     # constructor
-    def __init__(self, url: str, super_class: WebPic = None):
-        super(EHentaiPic, self).__init__(url)
+    def __init__(self, url: str, super_class: WebPic = None, analyze: bool = True, fields: WebPicField = WebPicField.ALL):
+        """
+        Set analyze to False to skip url analysis, and drive analyzeIO() by yourself.
+        Only fields are analyzed up front, others are resolved on first access.
+        """
+        super(EHentaiPic, self).__init__(url, fields)
+        self.__parent_child = ParentChild.UNKNOWN
+        self.__file_url = ()
+        self.__filename = ()
+        self.__src_url = ""
+        self.__has_artist_flag = False
+        self.__artist_info = None
+        self.__tags = ()
+        self.__gallery_analyzed = False
+        self.__api = None
         # input url is not a konachan url
         if WebPicTypeMatch(self.getWebPicType(), WebPicType.EHENTAI) == False:
             raise ValueError("Wrong url input. Input url must be under domain of \"e-hentai\".")
         self.__api: EHentaiAPI = EHentaiAPI.instance()
-        self.__analyzeUrl()
+        if analyze:
+            runIO(self.analyzeIO())
+    
+    def analyzeIO(self):
+        """Analyze url as generator (see IORequest)"""
+        return self.__analyzeUrl()
+    
+    def resolve(self, fields: WebPicField = WebPicField.ALL) -> None:
+        """Resolve lazy fields now instead of on first access"""
+        runIO(self.resolveIO(fields))
+    
+    def resolveIO(self, fields: WebPicField = WebPicField.ALL):
+        """Resolve lazy fields as generator (see IORequest)"""
+        if fields & (WebPicField.TAGS | WebPicField.ARTIST) and not self.__gallery_analyzed:
+            yield from self.__analyzeGallery()
+    
+    @classmethod
+    def fromUrls(cls, urls: list, fields: WebPicField = WebPicField.ALL) -> list:
+        """
+        Get EHentaiPic objects of many urls. If fields need gallery info (TAGS or ARTIST),
+        it is fetched for all urls with batched api calls (25 galleries or pictures per call)
+        instead of two api calls per url.
+        """
+        return runIO(cls.fromUrlsIO(urls, fields))
+    
+    @classmethod
+    def fromUrlsIO(cls, urls: list, fields: WebPicField = WebPicField.ALL):
+        """fromUrls() as generator (see IORequest)"""
+        webpics = [cls(url, analyze=False, fields=fields) for url in urls]
+        if fields & (WebPicField.TAGS | WebPicField.ARTIST):
+            api: EHentaiAPI = EHentaiAPI.instance()
+            
+            # find parent gallery of pictures
+            gallery_urls = [webpic.getUrl() if api.isValidGallery(webpic.getUrl()) else None for webpic in webpics]
+            parents = yield from api.findParentGalleryBatchIO(
+                [webpic.getUrl() for webpic in webpics if api.isValidPicture(webpic.getUrl())])
+            parents = iter(parents)
+            for idx, webpic in enumerate(webpics):
+                if api.isValidPicture(webpic.getUrl()):
+                    parent = next(parents)
+                    if parent is not None:
+                        gallery_urls[idx] = f"https://e-hentai.org/g/{parent['gid']}/{parent['token']}/"
+            
+            # get gallery info, failed ones are left to be analyzed by themselves
+            infos = yield from api.getGalleryInfoBatchIO([url for url in gallery_urls if url is not None])
+            infos = iter(infos)
+            for webpic, gallery_url in zip(webpics, gallery_urls):
+                if gallery_url is None:
+                    continue
+                info = next(infos)
+                if info is not None:
+                    webpic.__loadGalleryInfo(info)
+        
+        for webpic in webpics:
+            yield from webpic.analyzeIO()
+        return webpics
     
     # clear obj
     def clear(self) -> None:
         super(EHentaiPic, self).clear()
         self.__parent_child = ParentChild.UNKNOWN
-        self.__file_url.clear()
-        self.__filename.clear()
+        self.__file_url = ()
+        self.__filename = ()
         self.__src_url = 0
         self.__has_artist_flag = False
         if self.__artist_info != None:
             self.__artist_info.clear()
-        self.__tags.clear()
+        self.__tags = ()
+        self.__gallery_analyzed = True
         self.__api = None
     
     # private helper function
@@ -1930,78 +2218,94 @@ class EHentaiPic(WebPic):
         url = self.getUrl()
         
         # determine ParentChild status
-        if self.__api.isValidPicture(url):
-            self.__parent_child = ParentChild.CHILD
-        elif self.__api.isValidGallery(url) or isValidUrl(url):
-            self.__parent_child = ParentChild.PARENT
-        else:
-            self.__parent_child = ParentChild.UNKNOWN
-        
-        # get parent json data
-        j_dict = {}
-        if self.isParent():
-            j_dict = self.__api.getGalleryInfo(url)
-        elif self.isChild():
-            j_dict = self.__api.getGalleryInfo(
-                self.__api.findParentGalleryUrl(url))
-        else:
+        self.__parent_child = self.getRoute().parent_child
+        if self.__parent_child == ParentChild.UNKNOWN:
             return
         
-        # finding tags & artist
-        if self.__api.isValidGallery(url) or self.__api.isValidPicture(url):
-            j_list = []
-            for tag in j_dict["gmetadata"][0]["tags"]:
-                cur = tag.find(':')
-                left = ""
-                right = ""
-                if cur >= 0:
-                    left = tag[:cur]
-                    right = tag[cur+1:]
-                else:
-                    left = ""
-                    right = tag
-                
-                # whether has artist in the gallery
-                if "artist" in left: 
-                    # has artist
-                    self.__has_artist_flag = True
-                    # store josn list of artist names for ArtistInfo
-                    j_list.append(right)
-                
-                # store tag
-                self.__tags.append(right)
-            
-            # initialize ArtistInfo
-            self.__artist_info = ArtistInfo(self.getWebPicType(), json.dumps(j_list, ensure_ascii=False))
-        
         if self.isChild():
             # finding file_url & filename
-            self.__file_url.append(self.__api.getPicUrl(url))
+            self.__file_url += ((yield from self.__api.getPicUrlIO(url)),)
             # set filename
             parse1 = urllib.parse.urlparse(self.__file_url[-1])
             parse2 = ntpath.split(parse1.path)
-            self.__filename.append(parse2[1])
+            self.__filename += (parse2[1],)
             
             # assume e-hentai do not have src_url
+        
+        # resolve requested lazy fields
+        yield from self.resolveIO(self.getFields())
+    
+    def __analyzeGallery(self):
+        """find tags & artist from gallery info, it needs extra api requests"""
+        url = self.getUrl()
+        
+        # only galleries & pictures have gallery info
+        if not (self.__api.isValidGallery(url) or self.__api.isValidPicture(url)):
+            self.__gallery_analyzed = True
+            return
+        
+        # get parent json data
+        j_dict = {}
+        if self.isParent():
+            j_dict = yield from self.__api.getGalleryInfoIO(url)
+        elif self.isChild():
+            j_dict = yield from self.__api.getGalleryInfoIO(
+                (yield from self.__api.findParentGalleryUrlIO(url)))
+        self.__loadGalleryInfo(j_dict["gmetadata"][0])
+    
+    def __loadGalleryInfo(self, gmetadata: dict) -> None:
+        """find tags & artist from metadata of a gallery (item of "gmetadata" from api)"""
+        # finding tags & artist
+        j_list = []
+        for tag in gmetadata["tags"]:
+            cur = tag.find(':')
+            left = ""
+            right = ""
+            if cur >= 0:
+                left = tag[:cur]
+                right = tag[cur+1:]
+            else:
+                left = ""
+                right = tag
+            
+            # whether has artist in the gallery
+            if "artist" in left: 
+                # has artist
+                self.__has_artist_flag = True
+                # store josn list of artist names for ArtistInfo
+                j_list.append(right)
+            
+            # store tag
+            self.__tags += (sys.intern(right),)
+        
+        # initialize ArtistInfo
+        self.__artist_info = ArtistInfo(self.getWebPicType(), json.dumps(j_list, ensure_ascii=False))
+        self.__gallery_analyzed = True
     
     
     # getters 
-    def getFileUrl(self) -> list:
+    def getFileUrl(self) -> tuple:
         return self.__file_url
     
-    def getFileName(self) -> list:
+    def getFileName(self) -> tuple:
         return self.__filename
     
     def getSrcUrl(self) -> str:
         return self.__src_url
     
     def hasArtist(self) -> bool:
+        if not self.__gallery_analyzed:
+            self.resolve(WebPicField.ARTIST)
         return self.__has_artist_flag
     
     def getArtistInfo(self) -> ArtistInfo:
+        if not self.__gallery_analyzed:
+            self.resolve(WebPicField.ARTIST)
         return self.__artist_info
     
-    def getTags(self) -> list:
+    def getTags(self) -> tuple:
+        if not self.__gallery_analyzed:
+            self.resolve(WebPicField.TAGS)
         return self.__tags
     
     def isParent(self) -> bool:
@@ -2013,7 +2317,13 @@ class EHentaiPic(WebPic):
     def getParentChildStatus(self) -> ParentChild:
         return self.__parent_child
     
-    def downloadPic(self, dest_filepath = None) -> None:
+    def downloadPic(self, dest_filepath = os.path.curdir) -> list:
+        """Download image(s) of current obj, return list of download stats"""
+        return runIO(self.downloadPicIO(dest_filepath))
+    
+    def downloadPicIO(self, dest_filepath = os.path.curdir):
+        """Download image(s) of current obj as generator (see IORequest)"""
+        stats = []
         if self.isChild():
             count = 0
             for url, filename in zip(self.__file_url, self.__filename):
@@ -2034,50 +2344,205 @@ class EHentaiPic(WebPic):
                         name += f"_{count}.jpg"
                 if path[-1] != '/' or path[-1] != '\\':
                     path += '/'
-                randDelay(self.__api.getMinDelay(), self.__api.getMaxDelay())
-                downloadUrl(url, path+name)
+                yield ioPace(WebPicType2DomainStr(WebPicType.EHENTAI))
+                stats.append((yield ioDownload(url, path+name)))
                 count += 1
+        return stats
     
-    def getChildrenUrls(self, max_num: int = 30) -> list:
-        """Get all children urls of a parent until reaches max_num. Input -1 means get all children urls without limit"""
-        
-        # only process if current obj is parent
-        if not self.isParent():
-            return []
-        
+    def childrenPageIO(self, cursor = None, limit: int = -1):
+        """Get one page of children urls as generator (see IORequest), return (urls, next_cursor)"""
         url = self.getUrl()
         
-        if self.__api.isValidGallery(url):
-            return self.__api.getPicsInGallery(url, max_num)
-        else: # current url is a search page url
-            return self.__api.getGalleriesFromSearch(url, max_num)
+        if self.getRoute().kind == "gallery": # cursor is (page, total_pages)
+            if cursor == None:
+                cursor = (0, (yield from self.__api.getGalleryPageCountIO(url)))
+            page, total_pages = cursor
+            if page >= total_pages:
+                return ([], None)
+            output = yield from self.__api.getPicsInGalleryPageIO(url, page)
+            return (output, (page + 1, total_pages) if page + 1 < total_pages else None)
+        else: # current url is a search page url, cursor is page
+            page = cursor if cursor != None else 0
+            output = yield from self.__api.getGalleriesFromSearchPageIO(url, page)
+            return (output, page + 1 if len(output) > 0 else None)
 
-
-def url2WebPic(url: str) -> any:
-    """Get WebPic object from any supported url"""
-    webpic_type = DomainStr2WebPicType(url)
+def WebPicType2Class(webpic_type: WebPicType) -> type:
+    """Get WebPic derived class of webpic_type, None if Unknown"""
     if webpic_type == WebPicType.PIXIV:
-        return PixivPic(url)
+        return PixivPic
     elif webpic_type == WebPicType.TWITTER:
-        return TwitterPic(url)
+        return TwitterPic
     elif webpic_type == WebPicType.DANBOORU:
-        return DanbooruPic(url)
+        return DanbooruPic
     elif webpic_type == WebPicType.YANDERE:
-        return YanderePic(url)
+        return YanderePic
     elif webpic_type == WebPicType.KONACHAN:
-        return KonachanPic(url)
+        return KonachanPic
     elif webpic_type == WebPicType.WEIBO:
-        return WeiboPic(url)
+        return WeiboPic
     elif webpic_type == WebPicType.EHENTAI:
-        return EHentaiPic(url)
+        return EHentaiPic
     else: # Unknown
         return None
 
+def getCachedWebPic(url: str) -> any:
+    """
+    Get WebPic object of url restored from ResultCache by its canonical url without any I/O,
+    None if cache is disabled or has no fresh result of url
+    """
+    cache = ResultCache.instance()
+    route = routeUrl(url)
+    if not cache.isEnabled() or route.parent_child == ParentChild.UNKNOWN:
+        return None
+    snapshot = cache.lookup(route.canonical_url, WebPicType2Str(route.webpic_type))
+    if snapshot is None:
+        return None
+    try:
+        return WebPic.fromDict(snapshot)
+    except (ValueError, KeyError, TypeError): # result of an incompatible snapshot schema
+        cache.discard(route.canonical_url)
+        return None
+
+def cacheWebPics(webpics) -> int:
+    """
+    Store many analyzed WebPic objects in ResultCache in one transaction, keyed by canonical url,
+    return number of stored objects
+    """
+    items = []
+    for webpic in webpics:
+        route = webpic.getRoute()
+        if route.parent_child == ParentChild.UNKNOWN:
+            continue
+        items.append((route.canonical_url, WebPicType2Str(route.webpic_type), webpic.toDict()))
+    return ResultCache.instance().storeMany(items)
+
+def warmResultCache(urls = None, webpic_type: WebPicType = None) -> int:
+    """
+    Load stored results of urls (default all results, or all results of webpic_type) into memory
+    in one pass, so later lookups skip the database, return number of loaded results
+    """
+    cache = ResultCache.instance()
+    if urls is not None:
+        return cache.warmUp(keys=dedupeUrls(urls, canonical=True))
+    elif webpic_type is not None:
+        return cache.warmUp(site=WebPicType2Str(webpic_type))
+    return cache.warmUp()
+
+def _resolveWebPic(url: str, fields: WebPicField) -> any:
+    """Analyze url with network requests, and store result in ResultCache"""
+    webpic_class = WebPicType2Class(routeUrl(url).webpic_type)
+    if webpic_class is None: # Unknown
+        return None
+    webpic = webpic_class(url, fields=fields)
+    if ResultCache.instance().isEnabled():
+        cacheWebPics([webpic])
+    return webpic
+
+def url2WebPic(url: str, fields: WebPicField = WebPicField.ALL) -> any:
+    """
+    Get WebPic object from any supported url.
+    Only fields are analyzed up front, requests that other fields need
+    are skipped and only sent if those fields are accessed.
+    If ResultCache is enabled, a fresh stored result of url is returned without any network request.
+    """
+    webpic = getCachedWebPic(url)
+    if webpic is not None:
+        return webpic
+    return _resolveWebPic(url, fields)
+
+# default max concurrent url2WebPic() calls per site in url2WebPics()
+DEFAULT_SITE_CONCURRENCY = {
+    WebPicType.PIXIV:    4,
+    WebPicType.TWITTER:  4,
+    WebPicType.DANBOORU: 2,
+    WebPicType.YANDERE:  2,
+    WebPicType.KONACHAN: 2,
+    WebPicType.WEIBO:    1,
+    WebPicType.EHENTAI:  1
+}
+
+def url2WebPics(urls: list, max_workers: int = 8, per_site_limits: dict = None, fields: WebPicField = WebPicField.ALL, dedupe: bool = True):
+    """
+    Get WebPic objects from many urls concurrently, yield (url, webpic, error) as each url completes.
+    Urls are grouped by WebPicType, and each site never runs more than per_site_limits[webpic_type]
+    urls at once (default DEFAULT_SITE_CONCURRENCY), so a slow site cannot occupy all workers.
+    A failed url yields its exception as error instead of aborting the batch.
+    With dedupe, urls of the same artwork/post/user (same canonicalKey()) are resolved only once,
+    and all of them yield that WebPic object.
+    """
+    limits = dict(DEFAULT_SITE_CONCURRENCY)
+    if per_site_limits is not None:
+        limits.update(per_site_limits)
+    
+    # group urls by site, duplicates wait for first url of their key,
+    # urls with a result in ResultCache are yielded right away
+    queues = {}
+    duplicates = {}
+    cached = {}
+    for route in routeUrls(urls):
+        url = route.url
+        webpic_type = route.webpic_type
+        if webpic_type == WebPicType.UNKNOWN:
+            yield (url, None, ValueError(f"Unsupported url: {url}"))
+            continue
+        if dedupe and route.key in cached:
+            yield (url, cached[route.key], None)
+            continue
+        if dedupe and route.key in duplicates:
+            duplicates[route.key].append(url)
+            continue
+        webpic = getCachedWebPic(url)
+        if webpic is not None:
+            if dedupe:
+                cached[route.key] = webpic
+            yield (url, webpic, None)
+            continue
+        if dedupe:
+            duplicates[route.key] = []
+        if webpic_type not in queues:
+            queues[webpic_type] = deque()
+        queues[webpic_type].append(url)
+    
+    running = {}
+    active = {webpic_type: 0 for webpic_type in queues}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(queues) > 0 or len(running) > 0:
+            # fill free workers, taking turns between sites with spare capacity
+            submitted = True
+            while submitted and len(running) < max_workers:
+                submitted = False
+                for webpic_type in list(queues.keys()):
+                    if len(running) >= max_workers:
+                        break
+                    if active[webpic_type] >= max(1, limits.get(webpic_type, max_workers)):
+                        continue
+                    url = queues[webpic_type].popleft()
+                    if len(queues[webpic_type]) <= 0:
+                        del queues[webpic_type]
+                    running[executor.submit(_resolveWebPic, url, fields)] = (url, webpic_type)
+                    active[webpic_type] += 1
+                    submitted = True
+            
+            # report finished urls
+            done, not_done = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                url, webpic_type = running.pop(future)
+                active[webpic_type] -= 1
+                err = future.exception()
+                same_urls = [url]
+                if dedupe:
+                    same_urls += duplicates.pop(canonicalKey(url), [])
+                for same_url in same_urls:
+                    if err is not None:
+                        yield (same_url, None, err)
+                    else:
+                        yield (same_url, future.result(), None)
+
 def printInfo(webpic: any) -> None:
     """Printing all info of a supported WebPic"""
     try:
         if (webpic is None or
-            DomainStr2WebPicType(webpic.getUrl()) == WebPicType.UNKNOWN or
+            routeUrl(webpic.getUrl()).webpic_type == WebPicType.UNKNOWN or
             isEmptyWebPic(webpic)
             ):
             return